@@ -6,12 +6,16 @@ from pathlib import Path
 
 script_path = Path(__file__).resolve()
 project_root = script_path.parent.parent
-sys.path.append(str(project_root))
+if str(project_root) not in sys.path:  # The script reruns on every interaction
+    sys.path.append(str(project_root))
 
 # Now, use absolute imports from the project root
-from data.data_functions.data_loader import load_processed_data
+from app.utils.loaders import load_query_backend, load_sample_data
 from app.utils.data_summarizer import display_executive_summary 
+from app.utils.data_browser import display_data_browser
+from app.analytics.filters import filter_mask
 from app.themes import theming
+from app.utils import data_versions, perf, refinement
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -19,7 +23,8 @@ st.set_page_config(
     page_title="Big Box Retail Analysis & Exploration",
     page_icon="🛒"
 )
-theming.altair_theme()
+theming.enable_theme()
+perf.start_rerun("Main")
 
 # --- Page Header ---
 st.title("🛒 Big Box Retail Analysis & Exploration")
@@ -30,19 +35,24 @@ The analysis will dynamically update across all pages.
 """)
 
 # --- Data Loading ---
-master_df = load_processed_data()
+# The query backend (pandas in memory by default, or DuckDB over Parquet) is chosen with SOLIDCORE_QUERY_BACKEND.
+# Caches are keyed on the dataset version; a newly published version becomes active once it is warmed up.
+dataset_version = data_versions.active_version()
+with perf.span("load_query_backend", cached=True):
+    backend = load_query_backend(dataset_version)
 
-if master_df.empty:
+if backend is None:
     st.stop()
 
 # --- Sidebar & Global Filters ---
 st.sidebar.title("Global Filters ⚙️")
 
 # Prepare filter options
-min_date = master_df['Date'].min().date()
-max_date = master_df['Date'].max().date()
-all_store_types = sorted(master_df['Type'].unique())
-all_stores = sorted(master_df['Store'].unique())
+filter_options = backend.filter_options()
+min_date = filter_options['min_date']
+max_date = filter_options['max_date']
+all_store_types = filter_options['store_types']
+all_stores = filter_options['stores']
 
 # Date Filter
 st.sidebar.subheader("Date Range")
@@ -93,24 +103,47 @@ if not selected_types:
     st.sidebar.warning("Please select at least one store format.")
     st.stop()
 
+# Approximate mode: answer the summary, seasonality and holiday views from the stratified sample first
+st.sidebar.subheader("Speed")
+with perf.span("load_sample_data", cached=True):
+    sample_df = load_sample_data(dataset_version)
+approximate_mode = st.sidebar.toggle(
+    "⚡ Approximate mode",
+    value=st.session_state.get(refinement.APPROXIMATE_KEY, False),
+    disabled=sample_df.empty,
+    help="Show estimates with 95% confidence bounds from a stratified sample straight away, "
+         "then swap in exact figures once they are computed. Re-run the data preparation pipeline if this is disabled."
+)
+# Mirrored into a plain key so the Sales Analysis page sees the setting after a page switch
+st.session_state[refinement.APPROXIMATE_KEY] = approximate_mode and not sample_df.empty
 
-# --- Data Filtering ---
-query_parts = [
-    "@start_date <= Date.dt.date <= @end_date",
-    "Store in @selected_stores",
-    "Type in @selected_types"
-]
 
-query_string = " & ".join(query_parts)
-filtered_df = master_df.query(query_string)
+# --- Data Filtering ---
+st.session_state[refinement.FILTER_KEY] = (start_date, end_date, tuple(selected_stores), tuple(selected_types), dataset_version)
+refinement.cancel_stale()
+if st.session_state[refinement.APPROXIMATE_KEY]:
+    # The exact selection is left to the background refinements; the session keeps only a mask over the
+    # shared sample (the whole sample is used, as stratified error bounds need every sampled row)
+    with perf.span("filter_sample"):
+        in_domain = filter_mask(sample_df, start_date, end_date, selected_stores, selected_types).to_numpy()
+    selection = refinement.defer_selection(backend, start_date, end_date, selected_stores, selected_types, sample_df, in_domain)
+else:
+    refinement.disable()
+    # Pages query the selection for the aggregates they need; with DuckDB no rows are read here
+    with perf.span("select_master_data"):
+        selection = backend.select(start_date, end_date, selected_stores, selected_types)
 
 # --- Storing Data in Session State for other pages ---
-st.session_state['filtered_df'] = filtered_df
-st.session_state['master_df'] = master_df
+st.session_state['selection'] = selection
 
 # --- Page Content ---
-display_executive_summary(filtered_df)
+with perf.span("display_executive_summary"):
+    display_executive_summary(selection)
+
+with st.expander("Filtered Data Browser & Export"):
+    if refinement.is_pending(selection):
+        st.caption("⚡ The filtered rows are listed here once the exact figures above are ready.")
+    else:
+        display_data_browser(refinement.resolve(selection), st.session_state[refinement.FILTER_KEY])
 
-with st.expander("Filtered Data Preview"):
-    st.dataframe(filtered_df.head(100))
-    st.info(f"Displaying {len(filtered_df):,} rows based on your filters.")
\ No newline at end of file
+perf.finish_rerun()
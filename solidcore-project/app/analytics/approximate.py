@@ -0,0 +1,163 @@
+# app/analytics/approximate.py
+#
+# Approximate versions of the executive summary, seasonality and holiday aggregates, answered from the
+# stratified sample written by the prepare pipeline (one stratum per store, see
+# data/data_functions/sampling.py). They return the same frames as their exact counterparts, with
+# `<value>_lower` / `<value>_upper` columns holding 95% confidence bounds.
+#
+# The sample passed in is the *whole* sample with an `In_Domain` column marking the rows that pass the
+# sidebar filters: stratified variance estimates need every sampled row of a stratum, not only the
+# rows inside the selection. Totals use the expansion (Horvitz-Thompson) estimator; averages are ratio
+# estimators (estimated total / estimated row count) with linearized variances.
+
+import calendar
+import numpy as np
+import pandas as pd
+
+STRATUM = 'Store'
+WEIGHT = 'Sample_Weight'
+DOMAIN = 'In_Domain'
+VALUE = 'Weekly_Sales'
+CONFIDENCE_Z = 1.96  # Two-sided 95% normal interval
+_STRATUM_LEVEL = '_stratum'  # Index level name, distinct from 'Store' so stores can also be a group
+
+
+def _stratum_variance(sum_z: pd.Series, sum_z2: pd.Series, n: pd.Series, N: pd.Series) -> pd.Series:
+    """Variance contribution of each stratum to an estimated total: N^2 (1 - n/N) s^2 / n."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2 = (sum_z2 - sum_z ** 2 / n) / (n - 1)
+    # Strata sampled in full (n == N) or with a single row contribute no sampling variance
+    return (N ** 2 * (1 - n / N) * s2 / n).where(n > 1, 0.0).fillna(0.0)
+
+
+def _group_moments(sample: pd.DataFrame, by: list, value: str) -> pd.DataFrame:
+    """Per (stratum, group): sum, sum of squares and count of the in-domain values, plus stratum n and N."""
+    strata = sample.groupby(sample[STRATUM].rename(_STRATUM_LEVEL))[WEIGHT].agg(n='size', N='sum')
+    domain = sample[sample[DOMAIN]]
+    values = domain[value].astype(float)
+    moments = (
+        pd.DataFrame({'y': values, 'y2': values ** 2, 'count': 1.0})
+        .groupby([domain[STRATUM].rename(_STRATUM_LEVEL)] + [domain[col] for col in by])
+        .sum()
+    )
+    return moments.join(strata, on=_STRATUM_LEVEL)
+
+
+def _with_bounds(estimate: pd.Series, variance: pd.Series, value: str) -> pd.DataFrame:
+    half_width = CONFIDENCE_Z * np.sqrt(variance)
+    return pd.DataFrame({
+        value: estimate,
+        f'{value}_lower': estimate - half_width,
+        f'{value}_upper': estimate + half_width
+    })
+
+
+def domain_totals(sample: pd.DataFrame, by: list, value: str = VALUE) -> pd.DataFrame:
+    """Estimated totals of `value` per `by` group over the filtered rows, with 95% bounds."""
+    moments = _group_moments(sample, by, value)
+    weight = moments['N'] / moments['n']
+    estimate = (moments['y'] * weight).groupby(level=by).sum()
+    variance = _stratum_variance(moments['y'], moments['y2'], moments['n'], moments['N']).groupby(level=by).sum()
+    return _with_bounds(estimate, variance, value).reset_index()
+
+
+def domain_means(sample: pd.DataFrame, by: list, value: str = VALUE) -> pd.DataFrame:
+    """Estimated row averages of `value` per `by` group over the filtered rows, with 95% bounds."""
+    moments = _group_moments(sample, by, value)
+    weight = moments['N'] / moments['n']
+    total = (moments['y'] * weight).groupby(level=by).sum()
+    count = (moments['count'] * weight).groupby(level=by).sum()
+    mean = total / count
+
+    # Linearized residuals e = y - mean; their estimated total's variance, over count^2, is the mean's variance
+    row_mean = mean.reindex(moments.index.droplevel(_STRATUM_LEVEL)).to_numpy()
+    sum_e = moments['y'] - row_mean * moments['count']
+    sum_e2 = moments['y2'] - 2 * row_mean * moments['y'] + row_mean ** 2 * moments['count']
+    variance = _stratum_variance(sum_e, sum_e2, moments['n'], moments['N']).groupby(level=by).sum() / count ** 2
+    return _with_bounds(mean, variance, value).reset_index()
+
+
+def _overall_total(sample: pd.DataFrame, value: str = VALUE) -> tuple:
+    totals = domain_totals(sample.assign(_all=0), ['_all'], value)
+    if totals.empty:
+        return 0.0, 0.0, 0.0
+    row = totals.iloc[0]
+    return row[value], row[f'{value}_lower'], row[f'{value}_upper']
+
+
+def approximate_executive_summary(sample: pd.DataFrame) -> dict:
+    """`summary.executive_summary` from the sample; adds 'kpi_bounds' and bound columns to the frames."""
+    domain = sample[sample[DOMAIN]]
+    total_sales, total_lower, total_upper = _overall_total(sample)
+    num_stores = domain['Store'].nunique()
+    # Store sizes are constant per store, so they are known exactly from any sampled row
+    total_size = domain.drop_duplicates('Store')['Size'].sum()
+
+    def ratio_bounds(denominator):
+        return (total_lower / denominator, total_upper / denominator) if denominator else (0, 0)
+
+    sales_by_type = domain_totals(sample, ['Type']).sort_values(VALUE, ascending=False).reset_index(drop=True)
+    store_sales = domain_totals(sample, ['Store', 'Type']).sort_values(VALUE, ascending=False).reset_index(drop=True)
+    return {
+        'kpis': {
+            'total_sales': total_sales,
+            'num_stores': num_stores,
+            'avg_weekly_sales_per_store': total_sales / num_stores if num_stores > 0 else 0,
+            'avg_sales_per_sqft': total_sales / total_size if total_size > 0 else 0
+        },
+        'kpi_bounds': {
+            'total_sales': (total_lower, total_upper),
+            'avg_weekly_sales_per_store': ratio_bounds(num_stores),
+            'avg_sales_per_sqft': ratio_bounds(total_size)
+        },
+        'sales_over_time': domain_totals(sample, ['Date']),
+        'sales_by_type': sales_by_type,
+        'store_sales': store_sales,
+        'approximate': True,
+        'sample_rows': len(domain)
+    }
+
+
+def approximate_seasonality_profile(sample: pd.DataFrame) -> dict:
+    """`seasonality.seasonality_profile` from the sample, with bounds on the monthly and weekly averages."""
+    monthly_sales = domain_means(sample, ['Month'])
+    monthly_sales['MonthName'] = monthly_sales['Month'].apply(lambda m: calendar.month_abbr[m])
+    weekly_sales = domain_means(sample, ['WeekOfYear'])
+    return {
+        'monthly_sales': monthly_sales,
+        'weekly_sales': weekly_sales,
+        'top_3_weeks': weekly_sales.nlargest(3, VALUE),
+        'approximate': True,
+        'sample_rows': int(sample[DOMAIN].sum())
+    }
+
+
+def approximate_holiday_impact(sample: pd.DataFrame) -> dict:
+    """`holiday.holiday_impact` from the sample, with bounds on the averages and the weekly totals."""
+    holiday_impact_df = domain_means(sample, ['IsHoliday'])
+    holiday_impact_df['Week Type'] = holiday_impact_df['IsHoliday'].apply(
+        lambda x: 'Holiday Week' if x else 'Non-Holiday Week'
+    )
+    sales_over_time = domain_totals(sample, ['Date'])
+    domain = sample[sample[DOMAIN]]
+    holiday_data = sales_over_time[sales_over_time['Date'].isin(domain.loc[domain['IsHoliday'], 'Date'])]
+
+    averages = holiday_impact_df.set_index('Week Type')[VALUE]
+    uplift = None
+    if {'Holiday Week', 'Non-Holiday Week'} <= set(averages.index):
+        non_holiday_avg = averages['Non-Holiday Week']
+        holiday_avg = averages['Holiday Week']
+        uplift = {
+            'holiday_avg': holiday_avg,
+            'non_holiday_avg': non_holiday_avg,
+            'delta_pct': ((holiday_avg - non_holiday_avg) / non_holiday_avg) * 100
+        }
+
+    return {
+        'holiday_impact_df': holiday_impact_df,
+        'sales_over_time': sales_over_time,
+        'holiday_data': holiday_data,
+        'uplift': uplift,
+        'approximate': True,
+        'sample_rows': len(domain)
+    }
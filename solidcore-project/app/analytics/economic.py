@@ -0,0 +1,20 @@
+# app/analytics/economic.py
+
+from app.analytics.query import as_selection
+from data.data_functions.macro_factors import ECONOMIC_FACTORS
+NUMERIC_COLS_FOR_CORR = ['Weekly_Sales', 'Temperature', 'Fuel_Price', 'CPI', 'Unemployment', 'Size']
+SCATTER_SAMPLE_SIZE = 1000
+# Fixed so reruns with the same filters draw the same scatter sample (and hit the chart spec cache)
+SCATTER_SEED = 0
+
+
+def economic_drivers(df, sample_size: int = SCATTER_SAMPLE_SIZE, seed: int | None = SCATTER_SEED) -> dict:
+    """Long-format correlation matrix of the numeric drivers, and a row sample for the scatter plot."""
+    selection = as_selection(df)
+    corr_df = selection.corr(NUMERIC_COLS_FOR_CORR).stack().reset_index().rename(
+        columns={0: 'correlation', 'level_0': 'variable', 'level_1': 'variable2'}
+    )
+    return {
+        'corr_df': corr_df,
+        'scatter_sample': selection.sample(sample_size, seed)
+    }
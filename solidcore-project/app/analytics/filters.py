@@ -0,0 +1,22 @@
+# app/analytics/filters.py
+
+import pandas as pd
+
+
+def _filter_expression() -> str:
+    query_parts = [
+        "@start_date <= Date.dt.date <= @end_date",
+        "Store in @selected_stores",
+        "Type in @selected_types"
+    ]
+    return " & ".join(query_parts)
+
+
+def filter_master_data(df: pd.DataFrame, start_date, end_date, selected_stores, selected_types) -> pd.DataFrame:
+    """Applies the global sidebar filters (date range, stores, store formats) to the master dataset."""
+    return df.query(_filter_expression())
+
+
+def filter_mask(df: pd.DataFrame, start_date, end_date, selected_stores, selected_types) -> pd.Series:
+    """The sidebar filters as a boolean row mask, for frames (like the stratified sample) that must keep every row."""
+    return df.eval(_filter_expression())
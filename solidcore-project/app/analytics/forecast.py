@@ -0,0 +1,10 @@
+# app/analytics/forecast.py
+
+from app.analytics.query import as_selection
+
+
+def moving_average_forecast(df, window: int = 4) -> dict:
+    """Total weekly sales and a `window`-week moving average forecast of each week (from prior weeks only)."""
+    sales_over_time = as_selection(df).agg(['Date'], Weekly_Sales=('Weekly_Sales', 'sum')).set_index('Date')
+    sales_over_time['Forecast'] = sales_over_time['Weekly_Sales'].rolling(window, min_periods=1).mean().shift(1)
+    return {'sales_over_time': sales_over_time}
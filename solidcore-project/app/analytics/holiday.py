@@ -0,0 +1,40 @@
+# app/analytics/holiday.py
+
+from app.analytics.query import as_selection
+
+
+def holiday_impact(df) -> dict:
+    """
+    Average sales in holiday vs. non-holiday weeks, the weekly sales timeline and its holiday weeks.
+
+    Returns:
+        dict: 'holiday_impact_df', 'sales_over_time' and 'holiday_data' frames, and 'uplift'
+              (holiday average, non-holiday average and % delta), or None when either week type is missing.
+    """
+    selection = as_selection(df)
+    holiday_impact_df = selection.agg(['IsHoliday'], Weekly_Sales=('Weekly_Sales', 'mean'))
+    holiday_impact_df['Week Type'] = holiday_impact_df['IsHoliday'].apply(
+        lambda x: 'Holiday Week' if x else 'Non-Holiday Week'
+    )
+    # Holiday flags are per week, so the weekly totals carry them along
+    weekly = selection.agg(['Date'], Weekly_Sales=('Weekly_Sales', 'sum'), IsHoliday=('IsHoliday', 'max'))
+    sales_over_time = weekly[['Date', 'Weekly_Sales']]
+    holiday_data = sales_over_time[weekly['IsHoliday'].astype(bool)]
+
+    averages = holiday_impact_df.set_index('Week Type')['Weekly_Sales']
+    uplift = None
+    if {'Holiday Week', 'Non-Holiday Week'} <= set(averages.index):
+        non_holiday_avg = averages['Non-Holiday Week']
+        holiday_avg = averages['Holiday Week']
+        uplift = {
+            'holiday_avg': holiday_avg,
+            'non_holiday_avg': non_holiday_avg,
+            'delta_pct': ((holiday_avg - non_holiday_avg) / non_holiday_avg) * 100
+        }
+
+    return {
+        'holiday_impact_df': holiday_impact_df,
+        'sales_over_time': sales_over_time,
+        'holiday_data': holiday_data,
+        'uplift': uplift
+    }
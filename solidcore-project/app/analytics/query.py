@@ -0,0 +1,356 @@
+# app/analytics/query.py
+#
+# Query backends. Views never touch the filtered rows directly. Instead they ask a *selection* (the rows
+# that pass the sidebar filters) for small results:
+#
+#   selection.agg(by, **aggs)      one row per `by` group, sorted by `by`; aggs are name=(column, func)
+#   selection.corr(columns)        correlation matrix of `columns`
+#   selection.sample(n, seed)      up to `n` rows, for scatter plots
+#   selection.rows(limit, offset)  a page of the rows themselves, for the data browser
+#   selection.batches(n)           every row, as a stream of Arrow record batches of up to `n` rows, for exports
+#   len(selection), .empty
+#
+# Backends and their selections carry the dataset version, which cached results are keyed on.
+#
+# The macro factors (temperature, fuel price, CPI, unemployment) are not columns of the master dataset:
+# they are a separate per-store table at their own weekly cadence (macro_factors.parquet). A query that
+# names a factor column gets it attached by a sorted as-of join: each row takes its store's latest
+# reading on or before its date. `rows()` and `batches()` return the sales rows as stored.
+#
+# The pandas backend (the default) answers from the master DataFrame held in memory. The DuckDB backend
+# runs the same queries over master_data.parquet on disk, so the master dataset never has to fit in a
+# server process and only the result frames come back. Set SOLIDCORE_QUERY_BACKEND=duckdb to use it.
+# The shared backend (SOLIDCORE_QUERY_BACKEND=shared) is the pandas backend over a master DataFrame
+# memory-mapped from an Arrow file that every server process on the machine attaches to (see
+# data/data_functions/shared_dataset.py); its filter index finds the selected rows without a scan.
+
+import datetime as dt
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.analytics.filters import filter_master_data
+from data.data_functions.macro_factors import FACTOR_KEYS, attach_factors
+
+BACKENDS = ('pandas', 'duckdb', 'shared')
+SELECTIONS_KEPT = 4
+# pandas aggregation name -> DuckDB aggregate
+_SQL_AGGREGATES = {
+    'sum': 'coalesce(sum({}), 0)',  # pandas sums no values to 0, SQL to NULL
+    'mean': 'avg({})',
+    'min': 'min({})',
+    'max': 'max({})',
+    'count': 'count({})',
+    'first': 'first({0} ORDER BY "Date") FILTER (WHERE {0} IS NOT NULL)',  # Rows are stored by Store, then Date
+    'nunique': 'count(DISTINCT {})',
+}
+
+
+class FrameSelection:
+    """
+    A selection over an in-memory DataFrame of already-filtered rows. `key`, when given, identifies the
+    rows (the backend passes the dataset version and the filters), so caches need not hash the frame.
+    `factors` is the macro table (sorted by Date) that factor columns are attached from.
+    """
+
+    def __init__(self, df: pd.DataFrame, key: tuple | None = None, factors: pd.DataFrame | None = None):
+        self.df = df
+        self.key = key
+        self.factors = factors
+
+    def _frame(self, columns: list) -> pd.DataFrame:
+        """The rows, with any of `columns` that are macro factors (not columns of the rows) attached."""
+        columns = list(dict.fromkeys(columns))
+        missing = [column for column in columns if column not in self.df.columns]
+        if not missing or self.factors is None:
+            return self.df
+        own = [column for column in dict.fromkeys(FACTOR_KEYS + columns) if column in self.df.columns]
+        return attach_factors(self.df[own], self.factors, missing)[columns]
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    def agg(self, by: list, **aggs) -> pd.DataFrame:
+        frame = self._frame(by + [column for column, _ in aggs.values()])
+        if not by:
+            return pd.DataFrame({name: [frame[column].agg(func)] for name, (column, func) in aggs.items()})
+        return frame.groupby(by).agg(**aggs).reset_index()
+
+    def corr(self, columns: list) -> pd.DataFrame:
+        return self._frame(columns)[columns].corr()
+
+    def sample(self, n: int, seed: int | None = None) -> pd.DataFrame:
+        # Without replacement, like DuckDB's reservoir sample; a Generator draws `n` rows without permuting them all
+        sample = self.df.sample(n=n, random_state=np.random.default_rng(seed)) if len(self.df) > n else self.df
+        if self.factors is None:
+            return sample
+        # Factors are joined onto the sampled rows only
+        factor_columns = [column for column in self.factors.columns if column not in sample.columns]
+        return attach_factors(sample, self.factors, factor_columns)
+
+    def rows(self, limit: int | None = None, offset: int = 0) -> pd.DataFrame:
+        return self.df.iloc[offset:] if limit is None else self.df.iloc[offset:offset + limit]
+
+    def batches(self, batch_rows: int) -> pa.RecordBatchReader:
+        # One slice is converted at a time, all against the full frame's schema
+        schema = pa.Schema.from_pandas(self.df, preserve_index=False)
+        return pa.RecordBatchReader.from_batches(schema, (
+            pa.RecordBatch.from_pandas(self.df.iloc[start:start + batch_rows], schema=schema, preserve_index=False)
+            for start in range(0, len(self.df), batch_rows)
+        ))
+
+    def cache_key(self):
+        return self.df if self.key is None else self.key
+
+
+def as_selection(data) -> FrameSelection:
+    """Wraps a plain DataFrame (as passed by benchmarks and batch jobs) in a selection; selections pass through."""
+    return FrameSelection(data) if isinstance(data, pd.DataFrame) else data
+
+
+class PandasBackend:
+    """
+    The master dataset and the macro table in memory; selections are filtered copies of the master
+    dataset. The last few selections are kept, so sessions (and the warm-up worker) asking for the same
+    filters share one filtered frame. With a `store_index` (see data/data_functions/shared_dataset.py), the
+    selected rows are found from the index rather than by evaluating the filters on every row.
+    """
+
+    name = 'pandas'
+
+    def __init__(self, master_df: pd.DataFrame, version: str | None = None, factors: pd.DataFrame | None = None,
+                 store_index: pd.DataFrame | None = None):
+        self.master_df = master_df
+        self.version = version
+        self.store_index = store_index
+        # Stored per store; sorted by date once here for the as-of joins
+        self.factors = None if factors is None else factors.sort_values('Date', kind='stable', ignore_index=True)
+        self._filter_options = {
+            'min_date': master_df['Date'].min().date(),
+            'max_date': master_df['Date'].max().date(),
+            'store_types': sorted(master_df['Type'].unique()),
+            'stores': sorted(master_df['Store'].unique()),
+        }
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter_options(self) -> dict:
+        return self._filter_options
+
+    def _selects_everything(self, start_date, end_date, selected_stores, selected_types) -> bool:
+        options = self._filter_options
+        return (
+            start_date <= options['min_date'] and end_date >= options['max_date']
+            and set(selected_stores) >= set(options['stores']) and set(selected_types) >= set(options['store_types'])
+        )
+
+    def select(self, start_date, end_date, selected_stores, selected_types) -> FrameSelection:
+        key = (self.version, start_date, end_date, tuple(selected_stores), tuple(selected_types))
+        with self._lock:
+            selection = self._selections.get(key)
+            if selection is not None:
+                self._selections.move_to_end(key)
+                return selection
+        # The unfiltered selection is the master frame itself rather than a copy of it
+        if self._selects_everything(start_date, end_date, selected_stores, selected_types):
+            filtered = self.master_df
+        elif self.store_index is not None:
+            filtered = self.master_df.take(self._indexed_rows(start_date, end_date, selected_stores, selected_types))
+        else:
+            filtered = filter_master_data(self.master_df, start_date, end_date, selected_stores, selected_types)
+        selection = FrameSelection(filtered, key if self.version is not None else None, self.factors)
+        with self._lock:
+            self._selections[key] = selection
+            while len(self._selections) > SELECTIONS_KEPT:
+                self._selections.popitem(last=False)
+        return selection
+
+    def _indexed_rows(self, start_date, end_date, selected_stores, selected_types) -> np.ndarray:
+        """Positions of the rows passing the filters, in master order, from the store index."""
+        index = self.store_index
+        chosen = index[index['Store'].isin(selected_stores) & index['Type'].isin(selected_types)]
+        dates = self.master_df['Date'].to_numpy()
+        # Dates are compared by day, as in `filter_master_data`: the end date is included in full
+        bounds = np.array([pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1)], dtype=dates.dtype)
+        ranges = []
+        for start, stop in zip(chosen['Start'].to_numpy(), chosen['Stop'].to_numpy()):
+            first, last = start + np.searchsorted(dates[start:stop], bounds)
+            ranges.append(np.arange(first, last))
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+
+# One in-process DuckDB database per server; every query runs on its own cursor, so view threads and
+# background refinements can query concurrently.
+_duckdb_connection = None
+_duckdb_lock = threading.Lock()
+
+
+def _duckdb_cursor():
+    global _duckdb_connection
+    with _duckdb_lock:
+        if _duckdb_connection is None:
+            # Imported on first use: DuckDB is only needed when the backend is selected
+            import duckdb
+            _duckdb_connection = duckdb.connect()
+        return _duckdb_connection.cursor()
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+class DuckDBSelection:
+    """
+    A selection over a Parquet file, kept as a WHERE clause. Nothing is read until a query runs.
+
+    Instances hold only the paths, the dataset version (by default the file's modification time) and the
+    filter values, so they are cheap to pass to worker threads, and `st.cache_data` keys results on the
+    filters and the version. Queries naming one of `factor_columns` ASOF JOIN the macro table at `factors_path`.
+    """
+
+    def __init__(self, path: Path, start_date, end_date, selected_stores=None, selected_types=None, version=None,
+                 factors_path: Path | None = None, factor_columns: tuple = ()):
+        self.path = str(path)
+        self.version = Path(path).stat().st_mtime_ns if version is None else version
+        self.factors_path = None if factors_path is None else str(factors_path)
+        self.factor_columns = tuple(factor_columns)
+        self.start_date = start_date
+        self.end_date = end_date
+        # None means "all": no IN list for the common all-stores / all-formats selection
+        self.stores = None if selected_stores is None else [int(store) for store in selected_stores]
+        self.types = None if selected_types is None else [str(store_type) for store_type in selected_types]
+
+    def _where(self) -> tuple:
+        clauses = ['CAST("Date" AS DATE) BETWEEN ? AND ?']
+        params = [self.start_date, self.end_date]
+        if self.stores is not None:
+            clauses.append('list_contains(?, "Store")')
+            params.append(self.stores)
+        if self.types is not None:
+            clauses.append('list_contains(?, "Type")')
+            params.append(self.types)
+        return ' AND '.join(clauses), params
+
+    def _needs_factors(self, columns) -> bool:
+        return self.factors_path is not None and any(column in self.factor_columns for column in columns)
+
+    def _with_factors(self, sql: str, params: list) -> tuple:
+        # USING matches on Store and, as the last column, on the latest factor Date <= the row's Date
+        return f"SELECT * FROM ({sql}) ASOF LEFT JOIN read_parquet(?) USING (\"Store\", \"Date\")", [*params, self.factors_path]
+
+    def _sql(self, select: str, suffix: str = '', factors: bool = False) -> tuple:
+        where, params = self._where()
+        if not factors:
+            return f"SELECT {select} FROM read_parquet(?) WHERE {where} {suffix}", [self.path, *params]
+        source, params = self._with_factors(f"SELECT * FROM read_parquet(?) WHERE {where}", [self.path, *params])
+        return f"SELECT {select} FROM ({source}) {suffix}", params
+
+    def _query(self, select: str, suffix: str = '', extra_params: tuple = (), factors: bool = False) -> pd.DataFrame:
+        sql, params = self._sql(select, suffix, factors)
+        return _duckdb_cursor().execute(sql, [*params, *extra_params]).df()
+
+    def __len__(self) -> int:
+        return int(self._query('count(*) AS n')['n'].iloc[0])
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def agg(self, by: list, **aggs) -> pd.DataFrame:
+        keys = ', '.join(_quote(column) for column in by)
+        measures = ', '.join(
+            f"{_SQL_AGGREGATES[func].format(_quote(column))} AS {_quote(name)}" for name, (column, func) in aggs.items()
+        )
+        factors = self._needs_factors(by + [column for column, _ in aggs.values()])
+        if not by:
+            return self._query(measures, factors=factors)
+        return self._query(f"{keys}, {measures}", f"GROUP BY {keys} ORDER BY {keys}", factors=factors)
+
+    def corr(self, columns: list) -> pd.DataFrame:
+        pairs = [(a, b) for i, a in enumerate(columns) for b in columns[i:]]
+        values = self._query(', '.join(
+            f"corr({_quote(a)}, {_quote(b)}) AS c{n}" for n, (a, b) in enumerate(pairs)
+        ), factors=self._needs_factors(columns)).iloc[0]
+        matrix = pd.DataFrame(index=columns, columns=columns, dtype=float)
+        for n, (a, b) in enumerate(pairs):
+            matrix.loc[a, b] = matrix.loc[b, a] = values[f"c{n}"]
+        return matrix
+
+    def sample(self, n: int, seed: int | None = None) -> pd.DataFrame:
+        # USING SAMPLE runs before WHERE, so the filtered rows are sampled from a subquery. Reservoir
+        # sampling keeps every row when the selection has fewer than `n`.
+        sql, params = self._sql('*')
+        repeatable = '' if seed is None else f"REPEATABLE ({int(seed)})"
+        sql = f"SELECT * FROM ({sql}) USING SAMPLE reservoir({int(n)} ROWS) {repeatable}"
+        if self.factors_path is not None:
+            # Factors are joined onto the sampled rows only
+            sql, params = self._with_factors(sql, params)
+        return _duckdb_cursor().execute(sql, params).df()
+
+    def rows(self, limit: int | None = None, offset: int = 0) -> pd.DataFrame:
+        # No ORDER BY: DuckDB keeps the file's row order (the master DataFrame's), and a page near the
+        # start stops the scan early instead of sorting the whole selection
+        if limit is None:
+            return self._query('*', 'OFFSET ?', (int(offset),))
+        return self._query('*', 'LIMIT ? OFFSET ?', (int(limit), int(offset)))
+
+    def batches(self, batch_rows: int) -> pa.RecordBatchReader:
+        # Streamed from the Parquet scan: DuckDB produces the next batch only when the reader asks for it
+        sql, params = self._sql('*')
+        return _duckdb_cursor().execute(sql, params).fetch_record_batch(batch_rows)
+
+    def cache_key(self) -> tuple:
+        # The filters and the version identify the rows without reading them
+        return self.path, self.version, self.start_date, self.end_date, self.stores, self.types
+
+
+# `hash_funcs` for `st.cache_data` functions that take a selection
+SELECTION_HASH_FUNCS = {FrameSelection: FrameSelection.cache_key, DuckDBSelection: DuckDBSelection.cache_key}
+# `max_entries` for those functions. Selection keys include the dataset version, so entries for a
+# superseded version are never hit again and age out (app/utils/data_versions.py evicts the warmed ones).
+SELECTION_CACHE_ENTRIES = 64
+
+
+class DuckDBBackend:
+    """The master dataset and the macro table as Parquet files, queried in place by DuckDB."""
+
+    name = 'duckdb'
+
+    def __init__(self, path: Path, version: str | None = None, factors_path: Path | None = None):
+        self.path = Path(path)
+        self.version = version
+        self.factors_path = factors_path
+        self.factor_columns = () if factors_path is None else tuple(
+            column for column in pq.read_schema(factors_path).names if column not in FACTOR_KEYS
+        )
+        options = DuckDBSelection(self.path, dt.date.min, dt.date.max)._query(
+            'min("Date") AS min_date, max("Date") AS max_date, '
+            'list(DISTINCT "Type" ORDER BY "Type") AS store_types, list(DISTINCT "Store" ORDER BY "Store") AS stores'
+        ).iloc[0]
+        self._filter_options = {
+            'min_date': options['min_date'].date(),
+            'max_date': options['max_date'].date(),
+            'store_types': list(options['store_types']),
+            'stores': [int(store) for store in options['stores']],
+        }
+
+    def filter_options(self) -> dict:
+        return self._filter_options
+
+    def select(self, start_date, end_date, selected_stores, selected_types) -> DuckDBSelection:
+        options = self._filter_options
+        return DuckDBSelection(
+            self.path, start_date, end_date,
+            None if set(selected_stores) >= set(options['stores']) else selected_stores,
+            None if set(selected_types) >= set(options['store_types']) else selected_types,
+            version=self.version, factors_path=self.factors_path, factor_columns=self.factor_columns
+        )
@@ -0,0 +1,127 @@
+# app/analytics/scenarios.py
+
+import numpy as np
+import pandas as pd
+
+from app.analytics.economic import ECONOMIC_FACTORS
+from app.analytics.query import as_selection
+
+# Fuel and CPI shocks are relative (%), temperature (°F) and unemployment (pts) shocks are absolute.
+PERCENT_SHOCKS = np.array([False, True, True, False])
+SHOCK_LABELS = {
+    'Temperature': 'Temperature (°F)',
+    'Fuel_Price': 'Fuel Price (%)',
+    'CPI': 'CPI (%)',
+    'Unemployment': 'Unemployment (pts)'
+}
+# Step between neighbouring cells of the scenario grid, per factor
+GRID_STEPS = {'Temperature': 5.0, 'Fuel_Price': 5.0, 'CPI': 1.0, 'Unemployment': 0.5}
+# Ridge penalty, relative to the number of weeks per store. The factors are standardized, so this is
+# added to a correlation matrix: it shrinks slopes by about 0.1% when the factors move independently,
+# and only matters when a store's CPI or unemployment barely moves over the history (or moves with another factor).
+RIDGE_ALPHA = 1e-3
+
+
+def _store_week_panel(df):
+    """Stores x weeks arrays of total sales and macro factors, plus a mask of observed weeks."""
+    store_weeks = as_selection(df).agg(
+        ['Store', 'Date'],
+        Weekly_Sales=('Weekly_Sales', 'sum'),
+        **{factor: (factor, 'first') for factor in ECONOMIC_FACTORS}
+    ).set_index(['Store', 'Date'])
+    panel = store_weeks.unstack('Date')
+    stores = panel.index.to_numpy()
+    sales = panel['Weekly_Sales'].to_numpy(dtype=float)
+    factors = np.stack([panel[factor].to_numpy(dtype=float) for factor in ECONOMIC_FACTORS], axis=-1)
+    observed = ~np.isnan(sales) & ~np.isnan(factors).any(axis=-1)
+    return stores, np.nan_to_num(sales), np.nan_to_num(factors), observed
+
+
+def fit_economic_model(df) -> dict:
+    """
+    Fits one ridge regression of weekly sales on the economic factors per store, in a single batch.
+
+    Every store's normal equations are stacked into a (stores x factors x factors) array and solved
+    together, so fitting 10k stores costs one `np.linalg.solve` call rather than 10k model fits.
+    """
+    stores, sales, factors, observed = _store_week_panel(df)
+    weights = observed.astype(float)
+    n_obs = weights.sum(axis=1)
+    safe_n = np.maximum(n_obs, 1)
+
+    sales_mean = (sales * weights).sum(axis=1) / safe_n
+    factor_mean = (factors * weights[..., None]).sum(axis=1) / safe_n[:, None]
+    centered = (factors - factor_mean[:, None, :]) * weights[..., None]
+    factor_std = np.sqrt((centered ** 2).sum(axis=1) / safe_n[:, None])
+    factor_std[factor_std == 0] = 1.0
+
+    scaled = centered / factor_std[:, None, :]
+    sales_centered = (sales - sales_mean[:, None]) * weights
+
+    gram = np.einsum('stf,stg->sfg', scaled, scaled)
+    gram += RIDGE_ALPHA * safe_n[:, None, None] * np.eye(len(ECONOMIC_FACTORS))
+    moments = np.einsum('stf,st->sf', scaled, sales_centered)
+    betas = np.linalg.solve(gram, moments[..., None])[..., 0]
+
+    return {
+        'stores': stores,
+        'baseline_sales': sales_mean,
+        'factor_mean': factor_mean,
+        # Slopes in original units: change in weekly sales per unit change of each factor
+        'slopes': betas / factor_std,
+        'n_weeks': n_obs
+    }
+
+
+def score_scenarios(model: dict, shocks: np.ndarray) -> np.ndarray:
+    """
+    Projects weekly sales for every store under every scenario in one vectorized batch.
+
+    Args:
+        model (dict): Output of `fit_economic_model`.
+        shocks (np.ndarray): (scenarios x 4) shocks in `ECONOMIC_FACTORS` order, using the
+                             units in `SHOCK_LABELS`.
+
+    Returns:
+        np.ndarray: (scenarios x stores) projected average weekly sales.
+    """
+    shocks = np.atleast_2d(np.asarray(shocks, dtype=float))
+    relative = np.where(PERCENT_SHOCKS, shocks / 100, 0.0)
+    absolute = np.where(PERCENT_SHOCKS, 0.0, shocks)
+    # Percentage shocks scale each store's own factor level; absolute shocks apply as-is.
+    uplift = relative @ (model['factor_mean'] * model['slopes']).T + absolute @ model['slopes'].T
+    return model['baseline_sales'][None, :] + uplift
+
+
+def shock_grid(base_shock, x_factor: str, y_factor: str, half_width: int = 4) -> np.ndarray:
+    """
+    (cells x 4) shocks varying `x_factor` and `y_factor` over a square grid around zero,
+    holding the other factors at `base_shock`.
+    """
+    x_values = GRID_STEPS[x_factor] * np.arange(-half_width, half_width + 1)
+    y_values = GRID_STEPS[y_factor] * np.arange(-half_width, half_width + 1)
+    grid = np.tile(np.asarray(base_shock, dtype=float), (len(x_values) * len(y_values), 1))
+    xx, yy = np.meshgrid(x_values, y_values)
+    grid[:, ECONOMIC_FACTORS.index(x_factor)] = xx.ravel()
+    grid[:, ECONOMIC_FACTORS.index(y_factor)] = yy.ravel()
+    return grid
+
+
+def grid_chain_change(model: dict, grid: np.ndarray, projected: np.ndarray, x_factor: str, y_factor: str) -> pd.DataFrame:
+    """Long frame of chain-level % sales change per grid cell, from `score_scenarios` output."""
+    return pd.DataFrame({
+        'x': grid[:, ECONOMIC_FACTORS.index(x_factor)],
+        'y': grid[:, ECONOMIC_FACTORS.index(y_factor)],
+        'Change': projected.sum(axis=1) / model['baseline_sales'].sum() - 1
+    })
+
+
+def store_changes(model: dict, projected: np.ndarray) -> pd.DataFrame:
+    """Baseline vs. projected weekly sales per store for a single scenario, largest movers first."""
+    changes = pd.DataFrame({
+        'Store': model['stores'],
+        'Baseline': model['baseline_sales'],
+        'Projected': projected,
+    })
+    changes['Change'] = changes['Projected'] - changes['Baseline']
+    return changes.reindex(changes['Change'].abs().sort_values(ascending=False).index)
@@ -0,0 +1,18 @@
+# app/analytics/seasonality.py
+
+import calendar
+
+from app.analytics.query import as_selection
+
+
+def seasonality_profile(df) -> dict:
+    """Average weekly sales by calendar month and by ISO week, plus the three peak weeks."""
+    selection = as_selection(df)
+    monthly_sales = selection.agg(['Month'], Weekly_Sales=('Weekly_Sales', 'mean'))
+    monthly_sales['MonthName'] = monthly_sales['Month'].apply(lambda m: calendar.month_abbr[m])
+    weekly_sales = selection.agg(['WeekOfYear'], Weekly_Sales=('Weekly_Sales', 'mean'))
+    return {
+        'monthly_sales': monthly_sales,
+        'weekly_sales': weekly_sales,
+        'top_3_weeks': weekly_sales.nlargest(3, 'Weekly_Sales')
+    }
@@ -0,0 +1,48 @@
+# app/analytics/segmentation.py
+
+import pandas as pd
+
+from app.analytics.query import as_selection
+from data.data_functions.store_segments import assign_cluster_labels, cluster_store_aggregates
+
+
+def cluster_stores(df, k: int):
+    """
+    K-means segmentation of the selected stores on size and average weekly sales.
+
+    Returns:
+        tuple: Per-store aggregates with a 'Cluster' column, and the centroids in original units
+               (None when there are fewer stores than clusters).
+    """
+    selection = as_selection(df)
+    if selection.empty:
+        return pd.DataFrame(), None
+
+    # Group by all relevant descriptive columns to keep them in the output
+    store_agg = selection.agg(
+        ['Store', 'Type', 'Size'],
+        Avg_Weekly_Sales=('Weekly_Sales', 'mean'),
+        Sales_per_sq_ft=('Sales_per_sq_ft', 'mean')
+    )
+    return cluster_store_aggregates(store_agg, k)
+
+
+def segment_summary(clustered_df: pd.DataFrame) -> pd.DataFrame:
+    """One row per labelled segment: store count, average size, sales and sales per sq. ft."""
+    return clustered_df.groupby('Segment').agg(
+        Num_Stores=('Store', 'count'),
+        Avg_Size=('Size', 'mean'),
+        Avg_Sales=('Avg_Weekly_Sales', 'mean'),
+        Sales_per_SqFt=('Sales_per_sq_ft', 'mean')
+    ).reset_index().sort_values('Avg_Sales', ascending=False)
+
+
+def overall_metrics(df) -> dict:
+    """Averages across all selected stores, used as the baseline for segment deltas."""
+    selection = as_selection(df)
+    averages = selection.agg([], avg_sales=('Weekly_Sales', 'mean'), avg_efficiency=('Sales_per_sq_ft', 'mean')).iloc[0]
+    return {
+        'avg_sales': averages['avg_sales'],
+        'avg_size': selection.agg(['Store', 'Size'], Rows=('Store', 'count'))['Size'].mean(),
+        'avg_efficiency': averages['avg_efficiency']
+    }
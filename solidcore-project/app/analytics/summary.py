@@ -0,0 +1,42 @@
+# app/analytics/summary.py
+
+import pandas as pd
+
+from app.analytics.query import as_selection
+
+
+def executive_summary(df) -> dict:
+    """
+    KPIs and aggregates behind the executive summary view.
+
+    Args:
+        df: Filtered master data, as a selection (see app/analytics/query.py) or a DataFrame.
+            Must include 'Store', 'Type', 'Size', 'Date' and 'Weekly_Sales' columns.
+
+    Returns:
+        dict: 'kpis' (dict of scalars), 'sales_over_time', 'sales_by_type' and 'store_sales' frames.
+    """
+    selection = as_selection(df)
+    # One per-store aggregate answers the KPIs and both rankings; stores never change format or size
+    per_store = selection.agg(['Store', 'Type'], Weekly_Sales=('Weekly_Sales', 'sum'), Size=('Size', 'first'))
+    total_sales = per_store['Weekly_Sales'].sum()
+    num_stores = per_store['Store'].nunique()
+    total_size = per_store.drop_duplicates('Store')['Size'].sum() if num_stores else 0
+    store_sales = per_store[['Store', 'Type', 'Weekly_Sales']]
+
+    return {
+        'kpis': {
+            'total_sales': total_sales,
+            'num_stores': num_stores,
+            'avg_weekly_sales_per_store': total_sales / num_stores if num_stores > 0 else 0,
+            'avg_sales_per_sqft': total_sales / total_size if total_size > 0 else 0
+        },
+        'sales_over_time': selection.agg(['Date'], Weekly_Sales=('Weekly_Sales', 'sum')),
+        'sales_by_type': store_sales.groupby('Type')['Weekly_Sales'].sum().sort_values(ascending=False).reset_index(),
+        'store_sales': store_sales.sort_values('Weekly_Sales', ascending=False).reset_index(drop=True)
+    }
+
+
+def store_ranking(store_sales: pd.DataFrame, top: bool = True, n: int = 10) -> pd.DataFrame:
+    """Top or bottom `n` stores by total sales from the `store_sales` frame of `executive_summary`."""
+    return store_sales.head(n) if top else store_sales.tail(n)
@@ -0,0 +1,45 @@
+# plotting_modules/confidence_bounds.py
+
+import altair as alt
+import pandas as pd
+
+VALUE = 'Weekly_Sales'
+LOWER, UPPER = f'{VALUE}_lower', f'{VALUE}_upper'
+BAND_COLOR = '#1f77b4'
+
+
+def has_bounds(data: pd.DataFrame) -> bool:
+    """True for approximate-mode frames, which carry 95% confidence bounds next to the value."""
+    return LOWER in data.columns
+
+
+def _bounds_tooltip():
+    return [
+        alt.Tooltip(f'{LOWER}:Q', title='95% CI low', format='$,.0f'),
+        alt.Tooltip(f'{UPPER}:Q', title='95% CI high', format='$,.0f')
+    ]
+
+
+def confidence_band(data: pd.DataFrame, x: str) -> alt.Chart:
+    """Shaded 95% band for a line or area chart over `x` (an encoding shorthand such as 'Date:T')."""
+    return alt.Chart(data).mark_area(opacity=0.2, color=BAND_COLOR).encode(
+        x=x, y=f'{LOWER}:Q', y2=f'{UPPER}:Q', tooltip=_bounds_tooltip()
+    )
+
+
+def error_bars(data: pd.DataFrame, category: str, horizontal: bool = False, sort=None) -> alt.Chart:
+    """95% error bars for a bar chart of `category`; `horizontal` for charts with the value on the x axis."""
+    value_axis, category_axis = ('x', 'y') if horizontal else ('y', 'x')
+    return alt.Chart(data).mark_rule(color='#333333', strokeWidth=1.5).encode(**{
+        category_axis: alt.X(category, sort=sort) if category_axis == 'x' else alt.Y(category, sort=sort),
+        value_axis: f'{LOWER}:Q',
+        f'{value_axis}2': f'{UPPER}:Q',
+        'tooltip': _bounds_tooltip()
+    })
+
+
+def with_bounds(chart, data: pd.DataFrame, bounds_chart_fn, *args, **kwargs):
+    """Layers `bounds_chart_fn(data, ...)` under `chart` when `data` has bounds; returns `chart` otherwise."""
+    if not has_bounds(data):
+        return chart
+    return alt.layer(bounds_chart_fn(data, *args, **kwargs), chart)
@@ -0,0 +1,49 @@
+# plotting_modules/forecast_analysis.py
+
+import streamlit as st
+import pandas as pd
+import altair as alt
+
+from app.analytics.forecast import moving_average_forecast
+from app.analytics.query import SELECTION_CACHE_ENTRIES, SELECTION_HASH_FUNCS
+from app.utils import chart_cache, perf
+
+
+@st.cache_data(hash_funcs=SELECTION_HASH_FUNCS, max_entries=SELECTION_CACHE_ENTRIES)
+def get_moving_average_forecast(df) -> dict:
+    perf.cache_miss("get_moving_average_forecast")
+    return moving_average_forecast(df)
+
+
+def forecast_chart(sales_over_time: pd.DataFrame):
+    base = alt.Chart(sales_over_time.reset_index()).encode(x='Date:T')
+    
+    actual_line = base.mark_line(opacity=0.8).encode(
+        y=alt.Y('Weekly_Sales:Q', title='Weekly Sales'),
+        tooltip=[alt.Tooltip('Weekly_Sales', format='$,.0f', title='Actual Sales')]
+    ).interactive()
+    
+    forecast_line = base.mark_line(strokeDash=[5,5], color='orange').encode(
+        y=alt.Y('Forecast:Q'),
+        tooltip=[alt.Tooltip('Forecast', format='$,.0f', title='Forecasted Sales')]
+    )
+    return (actual_line + forecast_line).properties(title="Actual Sales vs. 4-Week Moving Average Forecast")
+
+
+## NEW: A simple forecasting function
+def generate_forecast(df, prepared: dict | None = None):
+    """Generates a simple moving average forecast."""
+    if prepared is None:
+        prepared = get_moving_average_forecast(df)
+
+    st.subheader("Sales Forecast (Illustrative)")
+    st.markdown("""
+    This chart illustrates a simple forecast using a 4-week moving average. With more time, we'd approach a model to forecast weekly sales using the following methodology: To create a model that forecasts weekly sales, we'd take the following approach:
+1. Feature Engineering: Add leading variables to the model to capture the week or two prior to Christmas - for example, two_weeks_from_christmas, one_week_from_christmas . Christmas is our biggest sales time, but since shoppers purchase before, we're not accurately capturing that. We could repeat this process for other holidays, though this is the one that has the most pre-shopping behavior. We can eliminate Christmas from the IsHoliday flag as well. 
+2. Training: We'd train on 24 months or about 75% of our existing data, validate which model works best on ~15% of our data, and test on our holdout group of ~15% of our data. 
+3. Validation: We'd test different models on our validation set - looking at XGBoost, linear regression, random forest to see which performs best. I lean XGBoost as a default. We'd look at Weighted Mean Average Percent Error (WMAPE) and RMSE (Root Mean Squared Error), looking for which model has the lowest RMSE and a WMAPE between 10-20% (or lower if it's possible without overfitting!)
+4. Testing: Once we've selected the best model using WMAPE and RMSE, we'd test on our holdout set and see how it performs using RMSE and WMAPE. If it performs similarly to our validation set, we can be more confident in its performance. If it performs significantly worse, we may have overfit to our validation set and need to revisit our model selection.
+    """)
+    
+    # Plotting
+    chart_cache.altair_chart("forecast.actual_vs_forecast", forecast_chart, prepared['sales_over_time'])
@@ -0,0 +1,115 @@
+# plotting_modules/scenario_analysis.py
+
+import streamlit as st
+import pandas as pd
+import altair as alt
+import numpy as np
+
+from app.analytics.economic import ECONOMIC_FACTORS
+from app.analytics.query import SELECTION_CACHE_ENTRIES, SELECTION_HASH_FUNCS
+from app.analytics.scenarios import (
+    SHOCK_LABELS, fit_economic_model, score_scenarios, shock_grid, grid_chain_change, store_changes
+)
+from app.utils import chart_cache, perf
+
+
+@st.cache_data(hash_funcs=SELECTION_HASH_FUNCS, max_entries=SELECTION_CACHE_ENTRIES)
+def get_economic_model(df) -> dict:
+    perf.cache_miss("get_economic_model")
+    return fit_economic_model(df)
+
+
+@st.cache_data(hash_funcs=SELECTION_HASH_FUNCS, max_entries=SELECTION_CACHE_ENTRIES)
+def project_scenarios(df, shocks: tuple) -> np.ndarray:
+    perf.cache_miss("project_scenarios")
+    with perf.span("get_economic_model", cached=True):
+        model = get_economic_model(df)
+    return score_scenarios(model, np.array(shocks))
+
+
+def prepare_scenario_simulator(df) -> dict:
+    """Fits (or fetches the cached) scenario model so it can be warmed off the script thread."""
+    with perf.span("get_economic_model", cached=True):
+        return {'model': get_economic_model(df)}
+
+
+def _movers_chart(movers: pd.DataFrame):
+    return alt.Chart(movers).mark_bar().encode(
+        x=alt.X('Change:Q', title='Change in Avg. Weekly Sales', axis=alt.Axis(format='$,s')),
+        y=alt.Y('Store:N', title='Store ID', sort='-x'),
+        color=alt.condition(alt.datum.Change > 0, alt.value('#1f77b4'), alt.value('#ff7f0e')),
+        tooltip=[
+            'Store',
+            alt.Tooltip('Baseline:Q', title='Baseline', format='$,.0f'),
+            alt.Tooltip('Projected:Q', title='Projected', format='$,.0f'),
+            alt.Tooltip('Change:Q', title='Change', format='$,.0f')
+        ]
+    ).properties(title="Stores Most Affected by the Scenario")
+
+
+def _grid_chart(grid_df: pd.DataFrame, x_factor: str, y_factor: str):
+    return alt.Chart(grid_df).mark_rect().encode(
+        x=alt.X('x:O', title=SHOCK_LABELS[x_factor]),
+        y=alt.Y('y:O', title=SHOCK_LABELS[y_factor], sort='descending'),
+        color=alt.Color('Change:Q', title='Chain Sales Change', scale=alt.Scale(scheme='redblue', domainMid=0), legend=alt.Legend(format='.1%')),
+        tooltip=[
+            alt.Tooltip('x:Q', title=SHOCK_LABELS[x_factor]),
+            alt.Tooltip('y:Q', title=SHOCK_LABELS[y_factor]),
+            alt.Tooltip('Change:Q', title='Chain Sales Change', format='.2%')
+        ]
+    ).properties(title="Projected Chain Sales Change Across Shocks")
+
+
+def display_scenario_simulator(df, prepared: dict | None = None):
+    if prepared is None:
+        prepared = prepare_scenario_simulator(df)
+
+    st.subheader("Economic What-If Scenarios")
+    st.markdown(
+        "Shift the economic factors below to see projected weekly sales per store and for the chain. "
+        "Projections come from a regression of each store's weekly sales on temperature, fuel price, CPI and unemployment, so they reflect historical association rather than causation."
+    )
+
+    cols = st.columns(4)
+    shock = (
+        cols[0].slider(SHOCK_LABELS['Temperature'], -15.0, 15.0, 0.0, step=1.0),
+        cols[1].slider(SHOCK_LABELS['Fuel_Price'], -30.0, 30.0, 10.0, step=1.0),
+        cols[2].slider(SHOCK_LABELS['CPI'], -5.0, 5.0, 0.0, step=0.5),
+        cols[3].slider(SHOCK_LABELS['Unemployment'], -3.0, 3.0, 1.0, step=0.25)
+    )
+
+    model = prepared['model']
+    baseline = model['baseline_sales']
+    with perf.span("project_scenarios", cached=True):
+        projected = project_scenarios(df, (shock,))[0]
+
+    with st.container(border=True):
+        kpi_cols = st.columns(3)
+        total_baseline = baseline.sum()
+        total_projected = projected.sum()
+        change = (total_projected - total_baseline) / total_baseline if total_baseline else 0
+        kpi_cols[0].metric("Baseline Weekly Sales", f"${total_baseline:,.0f}")
+        kpi_cols[1].metric("Projected Weekly Sales", f"${total_projected:,.0f}", delta=f"{change:.2%}")
+        kpi_cols[2].metric("Stores Projected Down", f"{int((projected < baseline).sum())} of {len(baseline)}")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("##### Projected Change by Store")
+        movers = store_changes(model, projected).head(15)
+        chart_cache.altair_chart("scenarios.movers", _movers_chart, movers)
+
+    with col2:
+        st.markdown("##### Scenario Grid")
+        axis_cols = st.columns(2)
+        x_factor = axis_cols[0].selectbox("Grid x-axis", ECONOMIC_FACTORS, index=1, format_func=SHOCK_LABELS.get)
+        y_options = [factor for factor in ECONOMIC_FACTORS if factor != x_factor]
+        y_factor = axis_cols[1].selectbox("Grid y-axis", y_options, index=len(y_options) - 1, format_func=SHOCK_LABELS.get)
+
+        # Score a 9 x 9 grid of shocks for the two chosen factors in one batch, holding the others at the sliders
+        grid = shock_grid(shock, x_factor, y_factor)
+        with perf.span("project_scenarios", cached=True):
+            grid_scores = project_scenarios(df, tuple(map(tuple, grid)))
+        grid_df = grid_chain_change(model, grid, grid_scores, x_factor, y_factor)
+        chart_cache.altair_chart("scenarios.grid", _grid_chart, grid_df, x_factor, y_factor)
+        st.caption("Each cell is a full scenario scored against every store; other factors stay at the slider values.")
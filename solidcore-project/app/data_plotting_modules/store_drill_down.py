@@ -0,0 +1,118 @@
+# plotting_modules/store_drill_down.py
+
+import streamlit as st
+import pandas as pd
+import altair as alt
+
+from app.utils.loaders import load_anomaly_index
+from data.data_functions.anomaly_detection import query_anomalies
+from data.data_functions.store_summaries import SEGMENTS
+from app.data_plotting_modules.seasonality_analysis import monthly_chart, weekly_chart
+from app.data_plotting_modules.holiday_analysis import uplift_bars_chart, timeline_chart
+from app.data_plotting_modules.forecast_analysis import forecast_chart
+from app.utils import chart_cache, data_versions, perf
+
+
+def summary_frames(summary: dict) -> dict:
+    """The summary's columnar lists as the frames the shared chart builders take."""
+    trend = pd.DataFrame(summary['trend']).assign(Date=lambda frame: pd.to_datetime(frame['Date']))
+    weekly_sales = pd.DataFrame(summary['weekly'])
+    holiday_impact_df = pd.DataFrame()
+    if summary['holiday'] is not None:
+        holiday_impact_df = pd.DataFrame({
+            'Week Type': ['Non-Holiday Week', 'Holiday Week'],
+            'Weekly_Sales': [summary['holiday']['non_holiday_avg'], summary['holiday']['holiday_avg']]
+        })
+    return {
+        'trend': trend,
+        'monthly_sales': pd.DataFrame(summary['monthly']),
+        'weekly_sales': weekly_sales,
+        'top_3_weeks': weekly_sales.nlargest(3, 'Weekly_Sales'),
+        'holiday_impact_df': holiday_impact_df,
+        'sensitivity': pd.DataFrame({
+            'Factor': list(summary['economic']),
+            'correlation': list(summary['economic'].values())
+        }).dropna()
+    }
+
+
+def sensitivity_chart(sensitivity: pd.DataFrame):
+    return alt.Chart(sensitivity).mark_bar().encode(
+        x=alt.X('correlation:Q', title='Correlation with Weekly Sales', scale=alt.Scale(domain=[-1, 1])),
+        y=alt.Y('Factor:N', title=None, sort='-x'),
+        color=alt.condition(alt.datum.correlation >= 0, alt.value('#1f77b4'), alt.value('#d62728')),
+        tooltip=['Factor', alt.Tooltip('correlation:Q', title='Correlation', format='.2f')]
+    ).properties(height=200)
+
+
+def display_store_drill_down(summary: dict):
+    store = summary['store']
+    frames = summary_frames(summary)
+
+    # --- Profile ---
+    with st.container(border=True):
+        cols = st.columns(4)
+        cols[0].metric("Store Type / Size", f"{summary['type']} · {summary['size']:,} sq. ft.")
+        cols[1].metric("Total Sales", f"${summary['total_sales']:,.0f}", help=f"{summary['start']} to {summary['end']}")
+        cols[2].metric("Avg. Weekly Sales", f"${summary['avg_weekly_sales']:,.0f}")
+        cols[3].metric("Sales Rank", f"#{summary['sales_rank']} of {summary['num_stores']}")
+    if summary['segment'] is not None:
+        st.info(f"**{summary['segment']['Segment']}**: store segment when the whole chain is clustered into {SEGMENTS} "
+                "segments on size and average weekly sales (see page 2).")
+
+    # --- Trend ---
+    st.subheader("Sales Trend")
+    trend = frames['trend']
+    chart_cache.altair_chart("drill_down.trend", forecast_chart, trend.set_index('Date')[['Weekly_Sales', 'Forecast']])
+
+    # --- Seasonality ---
+    st.subheader("Seasonality")
+    col1, col2 = st.columns(2)
+    with col1:
+        chart_cache.altair_chart("drill_down.monthly", monthly_chart, frames['monthly_sales'])
+    with col2:
+        chart_cache.altair_chart("drill_down.weekly", weekly_chart, frames['weekly_sales'], frames['top_3_weeks'])
+
+    # --- Holiday uplift ---
+    st.subheader("Holiday Uplift")
+    if summary['holiday'] is None:
+        st.info("This store has no holiday (or no non-holiday) weeks to compare.")
+    else:
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            st.metric(
+                "Holiday Week Uplift", f"{summary['holiday']['delta_pct']:+.1f}%",
+                help="Average sales in holiday weeks vs. non-holiday weeks."
+            )
+            chart_cache.altair_chart("drill_down.uplift_bars", uplift_bars_chart, frames['holiday_impact_df'])
+        with col2:
+            sales_over_time = trend[['Date', 'Weekly_Sales']]
+            holiday_data = sales_over_time[trend['IsHoliday'].astype(bool)]
+            chart_cache.altair_chart("drill_down.timeline", timeline_chart, sales_over_time, holiday_data, True)
+
+    # --- Economic sensitivity ---
+    st.subheader("Economic Sensitivity")
+    st.caption("Correlation of the store's weekly sales with each factor over its history.")
+    if frames['sensitivity'].empty:
+        st.info("The economic factors did not vary for this store.")
+    else:
+        chart_cache.altair_chart("drill_down.sensitivity", sensitivity_chart, frames['sensitivity'])
+
+    # --- Anomalies ---
+    st.subheader("Sales Anomalies")
+    with perf.span("load_anomaly_index", cached=True):
+        anomaly_index = load_anomaly_index(data_versions.active_version())
+    flagged = query_anomalies(anomaly_index, [store], summary['start'], summary['end'])
+    if flagged.empty:
+        st.success("No anomalous weeks flagged for this store.")
+    else:
+        st.dataframe(
+            flagged,
+            column_config={
+                "Date": st.column_config.DateColumn("Week"),
+                "Weekly_Sales": st.column_config.NumberColumn("Actual Sales", format="$%.0f"),
+                "Expected_Sales": st.column_config.NumberColumn("Expected Sales", format="$%.0f"),
+                "Robust_Z": st.column_config.NumberColumn("Robust Z-Score", format="%.2f")
+            },
+            use_container_width=True, hide_index=True
+        )
@@ -1,67 +1,90 @@
 # pages/Sales_Analysis_and_Forecasting.py
 
+import time
+PAGE_START = time.perf_counter()
+
+import importlib
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import altair as alt
-
-# Import the display functions from our modules
-from data_plotting_modules.holiday_analysis import display_holiday_impact
-from data_plotting_modules.economic_analysis import display_economic_drivers
-from data_plotting_modules.seasonality_analysis import display_seasonality
-
-## NEW: A simple forecasting function
-def generate_forecast(df: pd.DataFrame):
-    """Generates a simple moving average forecast."""
-    st.subheader("Sales Forecast (Illustrative)")
-    st.markdown("""
-    This chart illustrates a simple forecast using a 4-week moving average. With more time, we'd approach a model to forecast weekly sales using the following methodology: To create a model that forecasts weekly sales, we'd take the following approach:
-1. Feature Engineering: Add leading variables to the model to capture the week or two prior to Christmas - for example, two_weeks_from_christmas, one_week_from_christmas . Christmas is our biggest sales time, but since shoppers purchase before, we're not accurately capturing that. We could repeat this process for other holidays, though this is the one that has the most pre-shopping behavior. We can eliminate Christmas from the IsHoliday flag as well. 
-2. Training: We'd train on 24 months or about 75% of our existing data, validate which model works best on ~15% of our data, and test on our holdout group of ~15% of our data. 
-3. Validation: We'd test different models on our validation set - looking at XGBoost, linear regression, random forest to see which performs best. I lean XGBoost as a default. We'd look at Weighted Mean Average Percent Error (WMAPE) and RMSE (Root Mean Squared Error), looking for which model has the lowest RMSE and a WMAPE between 10-20% (or lower if it's possible without overfitting!)
-4. Testing: Once we've selected the best model using WMAPE and RMSE, we'd test on our holdout set and see how it performs using RMSE and WMAPE. If it performs similarly to our validation set, we can be more confident in its performance. If it performs significantly worse, we may have overfit to our validation set and need to revisit our model selection.
-    """)
-    
-    sales_over_time = df.groupby('Date')['Weekly_Sales'].sum().reset_index().set_index('Date')
-    
-    # Calculate moving average
-    sales_over_time['Forecast'] = sales_over_time['Weekly_Sales'].rolling(4, min_periods=1).mean().shift(1)
-    
-    # Plotting
-    base = alt.Chart(sales_over_time.reset_index()).encode(x='Date:T')
-    
-    actual_line = base.mark_line(opacity=0.8).encode(
-        y=alt.Y('Weekly_Sales:Q', title='Weekly Sales'),
-        tooltip=[alt.Tooltip('Weekly_Sales', format='$,.0f', title='Actual Sales')]
-    ).interactive()
-    
-    forecast_line = base.mark_line(strokeDash=[5,5], color='orange').encode(
-        y=alt.Y('Forecast:Q'),
-        tooltip=[alt.Tooltip('Forecast', format='$,.0f', title='Forecasted Sales')]
-    )
-    
-    st.altair_chart((actual_line + forecast_line).properties(title="Actual Sales vs. 4-Week Moving Average Forecast"), use_container_width=True)
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+script_path = Path(__file__).resolve()
+project_root = script_path.parent.parent.parent
+if str(project_root) not in sys.path:  # The script reruns on every interaction
+    sys.path.append(str(project_root))
+
+# Now, use absolute imports from the project root
+from app.themes import theming
+from app.utils import perf, refinement
 
+theming.enable_theme()
+perf.start_rerun("Sales Analysis")
 
 st.title("1. Sales Analysis & Forecasting 📈")
 
-if 'filtered_df' not in st.session_state or st.session_state.filtered_df.empty:
+if 'selection' not in st.session_state or st.session_state.selection.empty:
     st.warning("Please select filters on the main page to see the data.")
     st.stop()
 
-df = st.session_state.filtered_df
+# The filtered rows as a query-backend selection (see app/analytics/query.py); in approximate mode a
+# stand-in that is made in the background (see app/utils/refinement.py)
+df = st.session_state.selection
+
+# Each view is a (module, prepare, display) triple: prepare is the renderer module's cached analytics call
+# (through refinement.prepare for views with an approximate mode); display is the module's Streamlit renderer.
+# Modules are imported only when their view is first selected, keeping them (and their imports) off the cold-start path.
+VIEWS = {
+    "1a) Seasonality": ("app.data_plotting_modules.seasonality_analysis", "prepare_seasonality", "display_seasonality"),
+    "1a) Holiday Impact": ("app.data_plotting_modules.holiday_analysis", "prepare_holiday_impact", "display_holiday_impact"),
+    "1a) Economic Drivers": ("app.data_plotting_modules.economic_analysis", "get_economic_drivers", "display_economic_drivers"),
+    "1a) What-If Scenarios": ("app.data_plotting_modules.scenario_analysis", "prepare_scenario_simulator", "display_scenario_simulator"),
+    "1b) Forecasting": ("app.data_plotting_modules.forecast_analysis", "get_moving_average_forecast", "generate_forecast"),
+}
+# Views that accept the approximate-mode stand-in for the selection; the others are given the exact selection
+APPROXIMATE_VIEWS = {"1a) Seasonality", "1a) Holiday Impact"}
+
+
+def _load_view(view: str):
+    module_name, prepare_name, display_name = VIEWS[view]
+    module = importlib.import_module(module_name)
+    return getattr(module, prepare_name), getattr(module, display_name)
+
 
-## NEW: Using tabs for better organization
-tab1, tab2, tab3, tab4 = st.tabs(["1a) Seasonality", "1a) Holiday Impact", "1a) Economic Drivers", "1b) Forecasting"])
+def _prepare_in_thread(ctx, prepare_fn, df, exact: bool) -> tuple:
+    # Attach the session's script context so cached functions called from the pool behave as on the script thread
+    add_script_run_ctx(threading.current_thread(), ctx)
+    with perf.span(prepare_fn.__name__):
+        df = refinement.resolve(df) if exact else df
+        return df, prepare_fn(df)
 
 
-with tab1:
-    display_seasonality(df)
+## Unlike st.tabs, which runs every tab's code on each rerun, only the selected views are computed
+selected_views = st.pills(
+    "Views", options=list(VIEWS), selection_mode="multi",
+    default=[next(iter(VIEWS))], key="sales_analysis_views", label_visibility="collapsed"
+)
 
-with tab2:
-    display_holiday_impact(df)
+if not selected_views:
+    st.info("Select one or more views above to run the analysis.")
+else:
+    # Independent views prepare their data concurrently; pandas and DuckDB both release the GIL while aggregating
+    views = {view: _load_view(view) for view in selected_views}
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=len(views), thread_name_prefix="sales_view") as pool:
+        prepared = {
+            view: pool.submit(_prepare_in_thread, ctx, prepare_fn, df, view not in APPROXIMATE_VIEWS)
+            for view, (prepare_fn, _) in views.items()
+        }
 
-with tab3:
-    display_economic_drivers(df)
+    for view, (_, display_fn) in views.items():
+        st.header(view, divider="gray")
+        with perf.span(display_fn.__name__):
+            display_fn(*prepared[view].result())
 
-with tab4:
-    generate_forecast(df)
+st.caption(f"Page rerun completed in {time.perf_counter() - PAGE_START:.2f}s.")
+perf.finish_rerun()
@@ -4,8 +4,9 @@ import sys
 from pathlib import Path
 
 script_path = Path(__file__).resolve()
-project_root = script_path.parent.parent
-sys.path.append(str(project_root))
+project_root = script_path.parent.parent.parent
+if str(project_root) not in sys.path:  # The script reruns on every interaction
+    sys.path.append(str(project_root))
 
 # Now, use absolute imports from the project root
 from app.themes import theming
@@ -17,7 +18,7 @@ st.set_page_config(
     page_title="03. Enhancement Through External Data Sources",
     page_icon="🛒"
 )
-theming.altair_theme()
+theming.enable_theme()
 
 # --- Page Header ---
 st.title("03. Enhancement Through External Data Sources")
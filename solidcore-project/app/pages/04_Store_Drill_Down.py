@@ -0,0 +1,46 @@
+# pages/Store_Drill_Down.py
+
+import streamlit as st
+import sys
+from pathlib import Path
+
+script_path = Path(__file__).resolve()
+project_root = script_path.parent.parent.parent
+if str(project_root) not in sys.path:  # The script reruns on every interaction
+    sys.path.append(str(project_root))
+
+# Now, use absolute imports from the project root
+from app.utils.loaders import load_store_summaries
+from app.data_plotting_modules.store_drill_down import display_store_drill_down
+from app.themes import theming
+from app.utils import data_versions, perf, refinement
+
+theming.enable_theme()
+perf.start_rerun("Store Drill-Down")
+
+st.title("4. Store Drill-Down 🔎")
+st.markdown("""
+One store at a time: its sales trend, seasonality, holiday uplift, sensitivity to economic factors and segment.
+Each store's figures cover its full history and are precomputed by the data preparation pipeline, so opening a store is instant and independent of the global filters.
+""")
+
+# --- Main execution block for the page ---
+with perf.span("load_store_summaries", cached=True):
+    summaries = load_store_summaries(data_versions.active_version())
+if summaries is None:
+    st.warning("No store summaries found. Please re-run the data preparation pipeline from the project root:")
+    st.code("python data/data_functions/prepare_master_data.py")
+    st.stop()
+
+stores = summaries.stores()
+# Start from the first store picked in the sidebar, if the selection was narrowed down
+filter_key = st.session_state.get(refinement.FILTER_KEY)
+selected_stores = filter_key[2] if filter_key else ()
+default_store = selected_stores[0] if 0 < len(selected_stores) < len(stores) else stores[0]
+store = st.selectbox("Select Store", stores, index=stores.index(default_store) if default_store in stores else 0)
+
+with perf.span("store_summary"):
+    summary = summaries.get(store)
+with perf.span("display_store_drill_down"):
+    display_store_drill_down(summary)
+perf.finish_rerun()
@@ -1,4 +1,15 @@
-import altair as alt
+# app/themes/theming.py
+#
+# The single Altair theme registry for the app. Plotting modules used to register and enable their
+# own "custom_theme" at import time, overwriting each other depending on import order; every page
+# now calls `enable_theme()` once instead.
+
+THEME_NAME = "retail_insights_theme"
+FONT = "Arial"
+PRIMARY_COLOR = "#1f77b4"  # Muted blue
+SECONDARY_COLOR = "#ff7f0e"  # Safety orange
+
+_theme_enabled = False
 
 
 def altair_theme():
@@ -6,48 +17,60 @@ def altair_theme():
         "config": {
             "title": {
                 "fontSize": 18,
-                "font": "Arial",
-                "anchor": "start",
-                "color": "#333"
+                "font": FONT,
+                "anchor": "start",  # Left-align titles
+                "color": "#333333"
             },
             "axis": {
-                "labelFont": "Arial",
+                "labelFont": FONT,
                 "labelFontSize": 12,
-                "titleFont": "Arial",
+                "titleFont": FONT,
                 "titleFontSize": 14,
+                "titlePadding": 10,
                 "gridColor": "#e6e6e6"
             },
             "legend": {
-                "labelFont": "Arial",
+                "labelFont": FONT,
                 "labelFontSize": 12,
-                "titleFont": "Arial",
+                "titleFont": FONT,
                 "titleFontSize": 14
             },
             "header": {
-                "labelFont": "Arial",
+                "labelFont": FONT,
                 "labelFontSize": 12,
-                "titleFont": "Arial",
+                "titleFont": FONT,
                 "titleFontSize": 14
             },
-            "view": {"stroke": "transparent"},
+            "view": {"stroke": "transparent"},  # No border around the chart
             "range": {
                 "category": ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"],
             },
-            "mark": {"color": "#1f77b4"},
+            "mark": {"color": PRIMARY_COLOR, "tooltip": True},  # Enable tooltips by default
             "area": {
-                "line": {"color": "#1f77b4"},
+                "line": {"color": PRIMARY_COLOR},
                 "color": {
                     "x1": 1, "y1": 1, "x2": 1, "y2": 0,
                     "gradient": "linear",
                     "stops": [
                         {"offset": 0, "color": "white"},
-                        {"offset": 1, "color": "#1f77b4"}
+                        {"offset": 1, "color": PRIMARY_COLOR}
                     ]
                 }
-            }
+            },
+            "line": {"color": PRIMARY_COLOR, "strokeWidth": 2.5},  # Primary for base lines
+            "point": {"filled": True, "size": 60},  # Slightly larger points
+            "circle": {"filled": True, "size": 60},
+            "rule": {"color": SECONDARY_COLOR}  # Secondary for annotations
         }
     }
 
 
-alt.themes.register("retail_insights_theme", altair_theme) 
-alt.themes.enable("retail_insights_theme")
\ No newline at end of file
+def enable_theme():
+    """Registers and enables the shared theme once per process. Altair is only imported on first call."""
+    global _theme_enabled
+    if _theme_enabled:
+        return
+
+    import altair as alt
+    alt.theme.register(THEME_NAME, enable=True)(altair_theme)
+    _theme_enabled = True
@@ -0,0 +1,81 @@
+# app/utils/chart_cache.py
+#
+# Vega-Lite spec cache for Altair charts. Building an Altair chart and serializing it to a Vega-Lite spec
+# (schema validation plus Arrow-encoding its data) happens on every rerun, even when a widget elsewhere on
+# the page changed and the chart's aggregated data did not. `altair_chart()` keys each chart on its name,
+# a fingerprint of the DataFrames it is built from and its other parameters. The spec is stored with its
+# datasets already Arrow-encoded, which `st.vega_lite_chart` passes through as they are, so a hit only
+# pays for the lookup and for sending the stored spec.
+#
+# Specs are shared by all sessions of the server process and evicted least-recently-used. Each entry
+# remembers how long its miss took to render, and hits report that minus their own measured render time
+# to the perf panel as the rerun time saved.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+from streamlit import dataframe_util
+
+from app.utils import perf
+
+MAX_SPECS = 256
+
+_specs = OrderedDict()  # key -> (spec, miss_seconds)
+_lock = threading.Lock()
+# Serializes spec conversion: Altair's data transformer and theme are process-wide settings
+_convert_lock = threading.Lock()
+
+
+def fingerprint(df: pd.DataFrame) -> tuple:
+    """Content key of a DataFrame: its columns, dtypes and a 128-bit digest of its rows' hashes."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+    return tuple(df.columns), tuple(map(str, df.dtypes)), len(df), digest
+
+
+def _cache_key(name: str, args: tuple) -> tuple:
+    # The active Altair theme is part of every spec's config
+    return (name, alt.theme.active) + tuple(fingerprint(arg) if isinstance(arg, pd.DataFrame) else arg for arg in args)
+
+
+def altair_chart(name: str, build, *args, use_container_width: bool = True):
+    """
+    Renders the Altair chart `build(*args)` as `st.altair_chart` would, reusing its Vega-Lite spec when
+    `name` was last rendered with equal arguments. DataFrame arguments are compared by content; all
+    others must be hashable, and `build` must depend on nothing but its arguments.
+    """
+    lookup_started = time.perf_counter()
+    key = _cache_key(name, args)
+    with _lock:
+        entry = _specs.get(key)
+        if entry is not None:
+            _specs.move_to_end(key)
+
+    with perf.span(f"chart.{name}", cached=True):
+        if entry is None:
+            perf.cache_miss(f"chart.{name}")
+            chart = build(*args)
+            # Data is inlined under the spec's `datasets`, encoded once here as Streamlit would on every render
+            with _convert_lock:
+                spec = chart.to_dict()
+            for dataset, values in spec.get('datasets', {}).items():
+                spec['datasets'][dataset] = dataframe_util.convert_anything_to_arrow_bytes(values)
+        else:
+            spec = entry[0]
+        # Shallow copy: Streamlit pops the datasets out of the spec it is given
+        element = st.vega_lite_chart(spec=dict(spec), use_container_width=use_container_width)
+        seconds = time.perf_counter() - lookup_started
+
+    if entry is None:
+        with _lock:
+            _specs[key] = (spec, seconds)
+            while len(_specs) > MAX_SPECS:
+                _specs.popitem(last=False)
+    else:
+        perf.time_saved(f"chart.{name}", max(entry[1] - seconds, 0.0))
+    return element
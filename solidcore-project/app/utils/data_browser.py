@@ -0,0 +1,147 @@
+# app/utils/data_browser.py
+#
+# The filtered-data browser on the main page. Only the visible page is fetched from the selection (a
+# slice of the filtered frame, or LIMIT/OFFSET against the Parquet file with DuckDB). Full extracts are
+# streamed in batches by `write_export()` to a private export directory (SOLIDCORE_EXPORT_DIR, by default
+# in the system temp directory), so the query never holds the whole extract. The file is then downloaded
+# from disk in chunks through a URL only valid for that session (app/utils/export_downloads.py), so the
+# server never holds it either. Export files are named with a full random token, and a cleaner thread
+# (one per server) removes them an hour after they were written.
+
+import atexit
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import streamlit as st
+
+from app.utils import export_downloads, perf
+from app.utils.data_export import EXPORT_FORMATS, write_export
+
+PAGE_SIZES = [50, 100, 500, 1000]
+PAGE_KEY = "browser_page"
+PAGE_FILTER_KEY = "browser_filter_key"
+EXPORT_KEY = "data_export"
+
+EXPORT_DIR_ENV = "SOLIDCORE_EXPORT_DIR"
+EXPORT_TTL_SECONDS = 60 * 60
+CLEANUP_SECONDS = 5 * 60
+CLEANER_THREAD = "export_cleaner"
+
+_stop = threading.Event()
+_logger = logging.getLogger(__name__)
+
+
+def export_dir() -> Path:
+    return Path(os.environ.get(EXPORT_DIR_ENV, Path(tempfile.gettempdir()) / "solidcore_exports"))
+
+
+def remove_stale_exports(directory: Path, ttl_seconds: float = EXPORT_TTL_SECONDS) -> int:
+    """Removes files in `directory` last written more than `ttl_seconds` ago; returns how many."""
+    cutoff = time.time() - ttl_seconds
+    removed = 0
+    for path in directory.glob("*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:  # Removed by another server process's cleaner
+            pass
+    return removed
+
+
+def _clean():
+    while not _stop.is_set():
+        try:
+            remove_stale_exports(export_dir())
+            export_downloads.forget_missing()
+        except Exception:
+            _logger.exception("Removing stale exports failed")
+        _stop.wait(CLEANUP_SECONDS)
+
+
+def _stop_cleaner(cleaner: threading.Thread):
+    _stop.set()
+    cleaner.join()
+
+
+@st.cache_resource
+def _start_cleaner() -> threading.Thread:
+    # Cached as a resource so the server starts exactly one cleaner; it does not wait for anyone to export
+    cleaner = threading.Thread(target=_clean, name=CLEANER_THREAD, daemon=True)
+    cleaner.start()
+    atexit.register(_stop_cleaner, cleaner)
+    return cleaner
+
+
+def _export(selection, file_format: str) -> dict:
+    directory = export_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4().hex}.{file_format}"
+    with perf.span(f"export.{file_format}"):
+        rows = write_export(selection, path, file_format)
+    token = export_downloads.offer(path, f"retail_extract.{file_format}", EXPORT_FORMATS[file_format])
+    return {'path': path, 'token': token, 'rows': rows, 'bytes': path.stat().st_size}
+
+
+def _display_page(selection, total_rows: int, filter_key):
+    size_column, page_column, _ = st.columns([1, 1, 3])
+    page_size = size_column.selectbox("Rows per page", PAGE_SIZES, index=1)
+    pages = max(1, math.ceil(total_rows / page_size))
+    # Back to the first page when the filters change, and never past the last one
+    if st.session_state.get(PAGE_FILTER_KEY) != filter_key:
+        st.session_state[PAGE_FILTER_KEY] = filter_key
+        st.session_state[PAGE_KEY] = 1
+    st.session_state[PAGE_KEY] = min(st.session_state.get(PAGE_KEY, 1), pages)
+    page = page_column.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=PAGE_KEY)
+
+    offset = (page - 1) * page_size
+    with perf.span("browser.page"):
+        rows = selection.rows(limit=page_size, offset=offset)
+    st.dataframe(rows, hide_index=True)
+    if total_rows:
+        st.caption(f"Rows {offset + 1:,}–{offset + len(rows):,} of {total_rows:,} based on your filters.")
+
+
+def _display_export(selection, filter_key):
+    if not export_downloads.install_route():
+        st.caption("Exports are downloaded from the Streamlit server; start the app with `streamlit run` to export.")
+        return
+    format_column, button_column = st.columns([1, 4], vertical_alignment="bottom")
+    file_format = format_column.selectbox("Export format", list(EXPORT_FORMATS), format_func=str.upper)
+    if button_column.button("Prepare export", help="Writes every filtered row to a file for download."):
+        previous = st.session_state.pop(EXPORT_KEY, None)
+        if previous is not None:
+            export_downloads.revoke(previous[2]['token'])
+            previous[2]['path'].unlink(missing_ok=True)
+        with st.spinner("Writing the export..."):
+            st.session_state[EXPORT_KEY] = (filter_key, file_format, _export(selection, file_format))
+
+    # The download link stays until the filters or the format change, or the file expires
+    export = st.session_state.get(EXPORT_KEY)
+    if export is None or export[:2] != (filter_key, file_format):
+        return
+    details = export[2]
+    if not details['path'].exists():
+        export_downloads.revoke(details['token'])
+        del st.session_state[EXPORT_KEY]
+        st.info("The export has expired. Prepare it again to download it.")
+        return
+    st.link_button(
+        f"⬇️ Download {file_format.upper()} ({details['rows']:,} rows, {details['bytes'] / 1024 ** 2:,.1f} MB)",
+        export_downloads.download_url(details['token'])
+    )
+
+
+def display_data_browser(selection, filter_key):
+    """Paged view of the filtered rows plus a streaming CSV/Parquet export of all of them."""
+    _start_cleaner()
+    total_rows = len(selection)
+    _display_page(selection, total_rows, filter_key)
+    if total_rows:
+        _display_export(selection, filter_key)
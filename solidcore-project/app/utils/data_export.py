@@ -0,0 +1,60 @@
+# app/utils/data_export.py
+#
+# Streaming export of a selection to CSV or Parquet. Rows go from the query backend to the file one
+# Arrow record batch at a time, so peak memory is a single batch whatever the size of the export: the
+# DuckDB backend streams batches straight from its Parquet scan, and the pandas backend converts one
+# slice of the filtered frame at a time. Neither the full result nor the file is ever held in memory.
+
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+BATCH_ROWS = 65_536
+
+
+def _csv_schema(schema: pa.Schema) -> pa.Schema:
+    # The master data's dates are plain weeks; write them as 2010-02-05 rather than 2010-02-05 00:00:00.000000000
+    return pa.schema([
+        pa.field(field.name, pa.date32() if pa.types.is_timestamp(field.type) else field.type) for field in schema
+    ])
+
+
+def _csv_batch(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays(
+        [pc.cast(column, field.type) for column, field in zip(batch.columns, schema)], schema=schema
+    )
+
+
+def write_export(selection, path: Path, file_format: str, batch_rows: int = BATCH_ROWS) -> int:
+    """
+    Writes every row of `selection` to `path` as 'csv' or 'parquet' and returns the row count. The file
+    is written under a temporary name and renamed once complete, so readers never see a partial export.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{file_format}'. Choose one of: {', '.join(EXPORT_FORMATS)}.")
+
+    reader = selection.batches(batch_rows)
+    partial_path = path.with_name(path.name + '.part')
+    rows = 0
+    try:
+        if file_format == 'csv':
+            schema = _csv_schema(reader.schema)
+            with pa_csv.CSVWriter(str(partial_path), schema) as writer:
+                for batch in reader:
+                    writer.write_batch(_csv_batch(batch, schema))
+                    rows += batch.num_rows
+        else:
+            # One row group per batch
+            with pq.ParquetWriter(str(partial_path), reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        os.replace(partial_path, path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+    return rows
@@ -4,7 +4,67 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
-def display_executive_summary(df: pd.DataFrame):
+from app.utils.loaders import load_anomaly_index
+from data.data_functions.anomaly_detection import query_anomalies
+from app.analytics.query import SELECTION_CACHE_ENTRIES, SELECTION_HASH_FUNCS
+from app.analytics.summary import executive_summary, store_ranking
+from app.analytics.approximate import approximate_executive_summary
+from app.data_plotting_modules.confidence_bounds import with_bounds, confidence_band, error_bars
+from app.utils import chart_cache, data_versions, perf, refinement
+
+
+@st.cache_data(hash_funcs=SELECTION_HASH_FUNCS, max_entries=SELECTION_CACHE_ENTRIES)
+def get_executive_summary(df) -> dict:
+    perf.cache_miss("get_executive_summary")
+    return executive_summary(df)
+
+
+def prepare_executive_summary(df) -> dict:
+    return refinement.prepare("executive_summary", get_executive_summary, approximate_executive_summary, df)
+
+
+def _kpi(column, label: str, value: str, bounds=None, fmt: str = "${:,.0f}"):
+    # Approximate KPIs are marked with ≈ and carry their 95% confidence interval in the help tooltip
+    if bounds is None:
+        column.metric(label=label, value=value)
+    else:
+        column.metric(label=label, value=f"≈ {value}", help=f"95% confidence interval: {fmt.format(bounds[0])} – {fmt.format(bounds[1])}")
+
+
+def sales_trend_chart(sales_over_time: pd.DataFrame):
+    line_chart = alt.Chart(sales_over_time, title="Total Weekly Sales Over Time").mark_area().encode(
+        x=alt.X('Date:T', title='Date'),
+        y=alt.Y('Weekly_Sales:Q', title='Total Weekly Sales', axis=alt.Axis(format='$,s')),
+        tooltip=['Date:T', alt.Tooltip('Weekly_Sales:Q', title='Total Sales', format='$,.0f')]
+    ).interactive()
+    return with_bounds(line_chart, sales_over_time, confidence_band, 'Date:T')
+
+
+def sales_by_type_chart(sales_by_type: pd.DataFrame):
+    by_sales_desc = alt.EncodingSortField(field='Weekly_Sales', order='descending')
+    bar_chart = alt.Chart(sales_by_type, title="Total Sales Contribution by Store Type").mark_bar().encode(
+        x=alt.X('Weekly_Sales:Q', title='Total Sales', axis=alt.Axis(format='$,s')),
+        y=alt.Y('Type:N', title='Store Type', sort=by_sales_desc),
+        color=alt.Color('Type:N', legend=None),
+        tooltip=['Type', alt.Tooltip('Weekly_Sales', title='Total Sales', format='$,.0f')]
+    )
+    return with_bounds(bar_chart, sales_by_type, error_bars, 'Type:N', horizontal=True, sort=by_sales_desc)
+
+
+def store_ranking_chart(data_to_show: pd.DataFrame, performance_choice: str):
+    sort_order = alt.EncodingSortField(
+        field='Weekly_Sales', order='descending' if performance_choice == "Top 10 Stores" else 'ascending'
+    )
+    store_perf_chart = alt.Chart(data_to_show).mark_bar().encode(
+        x=alt.X('Weekly_Sales:Q', title='Total Sales', axis=alt.Axis(format='$,s')),
+        y=alt.Y('Store:N', title='Store ID', sort=sort_order),
+        color=alt.Color('Type:N', title='Store Type'),
+        tooltip=['Store', 'Type', alt.Tooltip('Weekly_Sales', title='Total Sales', format='$,.0f')]
+    ).properties(title=f"{performance_choice} by Total Sales")
+    return with_bounds(store_perf_chart, data_to_show, error_bars, 'Store:N', horizontal=True, sort=sort_order)
+
+
+def display_executive_summary(df, prepared: dict | None = None):
     st.title("Executive Summary 📊")
     st.markdown("""
     By looking at sales over time for the 45 stores in the file, we can see:
@@ -18,26 +78,23 @@ def display_executive_summary(df: pd.DataFrame):
         st.warning("No data available for the selected filters. Please adjust the filters in the sidebar.")
         return
 
+    if prepared is None:
+        prepared = prepare_executive_summary(df)
+    kpis = prepared['kpis']
+    bounds = prepared.get('kpi_bounds', {})
+
     # --- Key Performance Indicators (KPIs) ---
     st.subheader("Top-Line KPIs")
+    refinement.show_refinement_status(prepared)
     
     ## NEW: Using st.container with a border for better visual separation
     with st.container(border=True):
         cols = st.columns(4) # NEW: Added a 4th column for efficiency metric
-        total_sales = df['Weekly_Sales'].sum()
-        num_stores = df['Store'].nunique()
-        avg_weekly_sales_per_store = total_sales / num_stores if num_stores > 0 else 0
-        
         ## NEW: Added Sales per Sq Ft as a key efficiency metric
-        # We need to get the size for the selected stores
-        store_sizes = df[['Store', 'Size']].drop_duplicates().set_index('Store')
-        total_size = store_sizes.loc[df['Store'].unique()].sum().iloc[0]
-        avg_sales_per_sqft = total_sales / total_size if total_size > 0 else 0
-
-        cols[0].metric(label="Total Sales", value=f"${total_sales:,.0f}")
-        cols[1].metric(label="Stores Analyzed", value=f"{num_stores}")
-        cols[2].metric(label="Avg. Weekly Sales / Store", value=f"${avg_weekly_sales_per_store:,.0f}")
-        cols[3].metric(label="Avg. Sales / Sq. Ft.", value=f"${avg_sales_per_sqft:,.2f}")
+        _kpi(cols[0], "Total Sales", f"${kpis['total_sales']:,.0f}", bounds.get('total_sales'))
+        cols[1].metric(label="Stores Analyzed", value=f"{kpis['num_stores']}")
+        _kpi(cols[2], "Avg. Weekly Sales / Store", f"${kpis['avg_weekly_sales_per_store']:,.0f}", bounds.get('avg_weekly_sales_per_store'))
+        _kpi(cols[3], "Avg. Sales / Sq. Ft.", f"${kpis['avg_sales_per_sqft']:,.2f}", bounds.get('avg_sales_per_sqft'), fmt="${:,.2f}")
 
     st.divider()
 
@@ -46,39 +103,49 @@ def display_executive_summary(df: pd.DataFrame):
 
     with col1:
         st.subheader("Overall Sales Trend")
-        sales_over_time = df.groupby('Date')['Weekly_Sales'].sum().reset_index()
-        line_chart = alt.Chart(sales_over_time, title="Total Weekly Sales Over Time").mark_area().encode(
-            x=alt.X('Date:T', title='Date'),
-            y=alt.Y('Weekly_Sales:Q', title='Total Weekly Sales', axis=alt.Axis(format='$,s')),
-            tooltip=['Date:T', alt.Tooltip('Weekly_Sales:Q', title='Total Sales', format='$,.0f')]
-        ).interactive()
-        st.altair_chart(line_chart, use_container_width=True)
+        chart_cache.altair_chart("summary.sales_trend", sales_trend_chart, prepared['sales_over_time'])
 
     with col2:
         st.subheader("Sales by Store Type")
-        sales_by_type = df.groupby('Type')['Weekly_Sales'].sum().sort_values(ascending=False).reset_index()
-        bar_chart = alt.Chart(sales_by_type, title="Total Sales Contribution by Store Type").mark_bar().encode(
-            x=alt.X('Weekly_Sales:Q', title='Total Sales', axis=alt.Axis(format='$,s')),
-            y=alt.Y('Type:N', title='Store Type', sort='-x'),
-            color=alt.Color('Type:N', legend=None),
-            tooltip=['Type', alt.Tooltip('Weekly_Sales', title='Total Sales', format='$,.0f')]
-        )
-        st.altair_chart(bar_chart, use_container_width=True)
+        chart_cache.altair_chart("summary.sales_by_type", sales_by_type_chart, prepared['sales_by_type'])
 
     st.subheader("Store Performance Ranking")
-    store_sales = df.groupby(['Store', 'Type'])['Weekly_Sales'].sum().sort_values(ascending=False).reset_index()
-    
+
     performance_choice = st.radio(
         "View Performance:", ["Top 10 Stores", "Bottom 10 Stores"],
         horizontal=True, label_visibility="collapsed"
     )
-    data_to_show = store_sales.head(10) if performance_choice == "Top 10 Stores" else store_sales.tail(10)
-    sort_order = '-x' if performance_choice == "Top 10 Stores" else 'x'
+    data_to_show = store_ranking(prepared['store_sales'], top=performance_choice == "Top 10 Stores")
+    chart_cache.altair_chart("summary.store_ranking", store_ranking_chart, data_to_show, performance_choice)
 
-    store_perf_chart = alt.Chart(data_to_show).mark_bar().encode(
-        x=alt.X('Weekly_Sales:Q', title='Total Sales', axis=alt.Axis(format='$,s')),
-        y=alt.Y('Store:N', title='Store ID', sort=sort_order),
-        color=alt.Color('Type:N', title='Store Type'),
-        tooltip=['Store', 'Type', alt.Tooltip('Weekly_Sales', title='Total Sales', format='$,.0f')]
-    ).properties(title=f"{performance_choice} by Total Sales")
-    st.altair_chart(store_perf_chart, use_container_width=True)
+    st.subheader("Sales Anomalies")
+    with perf.span("load_anomaly_index", cached=True):
+        anomaly_index = load_anomaly_index(data_versions.active_version())
+    if anomaly_index.empty:
+        st.info("No anomaly index found. Re-run the data preparation pipeline to score store-weeks.")
+        return
+
+    if refinement.is_pending(df):
+        st.caption("⚡ Flagged store-weeks are listed here once the exact figures above are ready.")
+        return
+    store_dates = refinement.resolve(df).agg(['Store'], Start=('Date', 'min'), End=('Date', 'max'))
+    flagged = query_anomalies(anomaly_index, store_dates['Store'].unique(), store_dates['Start'].min(), store_dates['End'].max())
+    st.caption(
+        "Store-weeks whose sales deviate from the store's trailing 13-week baseline by more than the rest of the chain did that week. "
+        "Positive scores are unexpected spikes, negative scores unexpected drops."
+    )
+    if flagged.empty:
+        st.success("No anomalous store-weeks in the current selection.")
+        return
+
+    st.dataframe(
+        flagged,
+        column_config={
+            "Date": st.column_config.DateColumn("Week"),
+            "Weekly_Sales": st.column_config.NumberColumn("Actual Sales", format="$%.0f"),
+            "Expected_Sales": st.column_config.NumberColumn("Expected Sales", format="$%.0f"),
+            "Robust_Z": st.column_config.NumberColumn("Robust Z-Score", format="%.2f")
+        },
+        use_container_width=True, hide_index=True
+    )
+    st.info(f"{len(flagged):,} anomalous store-weeks across {flagged['Store'].nunique()} stores in your selection.")
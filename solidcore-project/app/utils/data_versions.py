@@ -0,0 +1,174 @@
+# app/utils/data_versions.py
+#
+# Dataset versions for the running app. Every cache layer is keyed on the version the prepare pipeline
+# published (see data/data_functions/dataset_version.py): the loaders take it as an argument, and the
+# query backend stamps it on its selections, which key the cached view results. A regenerated dataset
+# is therefore a new set of cache entries, never a stale hit.
+#
+# Sessions read the *active* version. A watcher thread, one per server, polls for a newly published
+# version. When one appears it loads the new dataset and computes the most common views (all stores,
+# each store format, the latest year) in the background while sessions keep using the active version.
+# It then makes the new version active and evicts the superseded version's entries with
+# `func.clear(*args)`. No session waits on a refresh: its next rerun simply finds everything warm.
+
+import atexit
+import datetime as dt
+import logging
+import threading
+import time
+
+import streamlit as st
+
+from app.utils.loaders import (
+    load_anomaly_index, load_processed_data, load_query_backend, load_sample_data, load_store_summaries
+)
+from data.data_functions.data_loader import published_version
+
+POLL_SECONDS = 30
+WATCHER_THREAD = "dataset_version_watcher"
+DEFAULT_SEGMENTS = 4  # The segmentation page's default slider value
+LOADERS = (load_query_backend, load_processed_data, load_anomaly_index, load_sample_data, load_store_summaries)
+
+_active_version = None
+_warmed = {}  # version -> [(cached function, args)] filled by the warm-up, evicted when the version is superseded
+_failed_version = None
+_lock = threading.Lock()
+# Set at interpreter exit: the watcher stops between queries instead of being killed inside one
+_stop = threading.Event()
+_logger = logging.getLogger(__name__)
+
+
+def common_filters(filter_options: dict) -> list:
+    """(start, end, stores, types) for all stores, each store format and the latest calendar year."""
+    min_date, max_date = filter_options['min_date'], filter_options['max_date']
+    stores, store_types = filter_options['stores'], filter_options['store_types']
+    filters = [(min_date, max_date, stores, store_types)]
+    filters += [(min_date, max_date, stores, [store_type]) for store_type in store_types]
+    filters.append((max(dt.date(max_date.year, 1, 1), min_date), max_date, stores, store_types))
+    return filters
+
+
+def _stopping() -> bool:
+    # The main thread is marked stopped as soon as the interpreter starts shutting down, before atexit runs
+    return _stop.is_set() or not threading.main_thread().is_alive()
+
+
+def _check_stopped():
+    if _stopping():
+        raise RuntimeError("The server is shutting down.")
+
+
+def _warm(version: str) -> list:
+    # Imported here: the renderer modules import this one to find the active version
+    from app.utils.data_summarizer import get_executive_summary
+    from app.data_plotting_modules.seasonality_analysis import get_seasonality_profile
+    from app.data_plotting_modules.holiday_analysis import get_holiday_impact
+    from app.data_plotting_modules.economic_analysis import get_economic_drivers
+    from app.data_plotting_modules.forecast_analysis import get_moving_average_forecast
+    from app.data_plotting_modules.scenario_analysis import get_economic_model
+    from app.data_plotting_modules.segmentation_analysis import get_store_clusters
+
+    backend = load_query_backend(version)
+    if backend is None:
+        raise RuntimeError(f"The query backend for dataset version {version} could not be loaded.")
+    for loader in (load_anomaly_index, load_sample_data, load_store_summaries):
+        loader(version)
+    warmed = [(loader, (version,)) for loader in LOADERS]
+
+    for filters in common_filters(backend.filter_options()):
+        selection = backend.select(*filters)
+        if selection.empty:
+            continue
+        for view_fn in (get_executive_summary, get_seasonality_profile, get_holiday_impact, get_economic_drivers,
+                        get_moving_average_forecast, get_economic_model):
+            _check_stopped()
+            view_fn(selection)
+            warmed.append((view_fn, (selection,)))
+        num_stores = int(selection.agg([], Stores=('Store', 'nunique'))['Stores'].iloc[0])
+        if num_stores >= 3:
+            _check_stopped()
+            k = min(DEFAULT_SEGMENTS, num_stores - 1, 8)
+            get_store_clusters(selection, k)
+            warmed.append((get_store_clusters, (selection, k)))
+    return warmed
+
+
+def _evict(version: str, entries: list):
+    for cached_fn, args in entries:
+        cached_fn.clear(*args)
+    _logger.info("Evicted %d cache entries of superseded dataset version %s", len(entries), version)
+
+
+def _refresh(version: str):
+    """Warms `version`, then makes it active and evicts every other version's warmed entries."""
+    global _active_version, _failed_version
+    started = time.perf_counter()
+    try:
+        warmed = _warm(version)
+    except Exception:
+        if _stopping():
+            return
+        # Sessions stay on the active version; a later publish is tried afresh
+        _failed_version = version
+        _logger.exception("Warming dataset version %s failed", version)
+        return
+
+    with _lock:
+        previous = _active_version
+        _active_version = version
+        superseded = {old: entries for old, entries in _warmed.items() if old != version}
+        for old in superseded:
+            del _warmed[old]
+        _warmed[version] = warmed
+    _logger.info("Dataset version %s is active (warmed in %.1fs)", version, time.perf_counter() - started)
+
+    if previous is not None and previous != version and previous not in superseded:
+        # Active but never warmed: the version the first session loaded before the watcher got to it
+        superseded[previous] = [(loader, (previous,)) for loader in LOADERS]
+    for old, entries in superseded.items():
+        _evict(old, entries)
+
+
+def _watch():
+    while not _stop.is_set():
+        try:
+            version = published_version()
+            if version is not None and version not in _warmed and version != _failed_version:
+                _refresh(version)
+        except Exception:
+            _logger.exception("Checking for a new dataset version failed")
+        _stop.wait(POLL_SECONDS)
+
+
+def _stop_watcher(watcher: threading.Thread):
+    _stop.set()
+    watcher.join()
+
+
+class _WatcherContextFilter(logging.Filter):
+    # The warm-up calls cached functions outside any session, and their spinners warn about it on every call
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.threadName != WATCHER_THREAD
+
+
+@st.cache_resource
+def _start_watcher() -> threading.Thread:
+    # Cached as a resource so the server starts exactly one watcher
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_WatcherContextFilter())
+    watcher = threading.Thread(target=_watch, name=WATCHER_THREAD, daemon=True)
+    watcher.start()
+    atexit.register(_stop_watcher, watcher)
+    return watcher
+
+
+def active_version() -> str | None:
+    """
+    The dataset version sessions should read. Until the first warm-up finishes this is the published
+    version, loaded by whichever session asks first; after that, versions change only once warmed.
+    """
+    global _active_version
+    _start_watcher()
+    with _lock:
+        if _active_version is None:
+            _active_version = published_version()
+        return _active_version
@@ -0,0 +1,107 @@
+# app/utils/export_downloads.py
+#
+# Downloads of finished exports, read from disk in fixed-size chunks. `st.download_button` would read the
+# whole file into the server's memory (and again on every rerun while it is shown), so the data browser
+# offers each export at its own URL instead: `offer()` registers the file under a random 128-bit token for
+# the session that wrote it, and `ExportDownloadHandler` streams it to the browser one chunk at a time,
+# waiting for each chunk to be sent before reading the next. Peak memory is one chunk per download,
+# whatever the size of the export.
+#
+# The handler is added to the running Streamlit server's Tornado application once per process by
+# `install_route()`. A token is only served while the session it was offered to is connected.
+
+import gc
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import streamlit as st
+import tornado.web
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+EXPORT_ROUTE = "_exports"
+CHUNK_BYTES = 1 << 20
+
+_downloads = {}  # token -> {'path', 'file_name', 'mime', 'session'}
+_lock = threading.Lock()
+_logger = logging.getLogger(__name__)
+
+
+def route_pattern(base_url_path: str) -> str:
+    """The handler's URL pattern under Streamlit's `server.baseUrlPath`; the token is the one group."""
+    return "^/" + "/".join(part.strip("/") for part in (base_url_path, EXPORT_ROUTE, "([0-9a-f]{32})") if part.strip("/")) + "$"
+
+
+def download_url(token: str) -> str:
+    base = st.get_option("server.baseUrlPath").strip("/")
+    return "/" + "/".join(part for part in (base, EXPORT_ROUTE, token) if part)
+
+
+def offer(path: Path, file_name: str, mime: str) -> str:
+    """Registers `path` for download by the current session and returns its token."""
+    ctx = get_script_run_ctx()
+    token = uuid.uuid4().hex
+    with _lock:
+        _downloads[token] = {'path': Path(path), 'file_name': file_name, 'mime': mime, 'session': ctx.session_id if ctx else None}
+    return token
+
+
+def revoke(token: str):
+    with _lock:
+        _downloads.pop(token, None)
+
+
+def forget_missing():
+    """Drops the tokens of files that no longer exist (removed once stale, see app/utils/data_browser.py)."""
+    with _lock:
+        for token, download in list(_downloads.items()):
+            if not download['path'].exists():
+                del _downloads[token]
+
+
+class ExportDownloadHandler(tornado.web.RequestHandler):
+    def initialize(self, is_active_session):
+        self._is_active_session = is_active_session
+
+    async def get(self, token: str):
+        with _lock:
+            download = _downloads.get(token)
+        if download is None or not self._is_active_session(download['session']):
+            raise tornado.web.HTTPError(404)
+        try:
+            f = open(download['path'], 'rb')
+        except FileNotFoundError:
+            raise tornado.web.HTTPError(404)
+
+        with f:
+            self.set_header("Content-Type", download['mime'])
+            self.set_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.set_header("Content-Disposition", f'attachment; filename="{download["file_name"]}"')
+            self.set_header("Cache-Control", "no-store")
+            while chunk := f.read(CHUNK_BYTES):
+                self.write(chunk)
+                # Sent before the next chunk is read, so at most one chunk is held per download
+                await self.flush()
+
+
+@st.cache_resource
+def install_route() -> bool:
+    """
+    Adds the download handler to the running server, once per process. False when there is no server
+    (bare mode, AppTest). Streamlit does not expose its Tornado application, so it is found among live objects.
+    """
+    if not Runtime.exists():
+        return False
+    applications = [obj for obj in gc.get_objects() if isinstance(obj, tornado.web.Application)]
+    if len(applications) != 1:
+        _logger.warning("Export downloads are unavailable: found %d Tornado applications.", len(applications))
+        return False
+    # Host rules added later are matched before the application's own catch-all routes
+    applications[0].add_handlers(r".*$", [(
+        route_pattern(st.get_option("server.baseUrlPath")), ExportDownloadHandler,
+        {'is_active_session': Runtime.instance().is_active_session}
+    )])
+    return True
@@ -0,0 +1,128 @@
+# app/utils/import_profiler.py
+#
+# Cold-start import report for each Streamlit page. Every page's top-level imports are replayed in a
+# fresh interpreter under `python -X importtime`, so the numbers reflect a server process that has
+# not imported anything yet. Imports deferred into functions (plotting modules, scikit-learn) are
+# intentionally not counted: they are off the cold-start path.
+#
+# Usage (from the project root):
+#   python app/utils/import_profiler.py                         # print the JSON report
+#   python app/utils/import_profiler.py --output imports.json   # save it as a regression baseline
+#   python app/utils/import_profiler.py --baseline imports.json --tolerance 0.25
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+APP_DIR = PROJECT_ROOT / "app"
+
+
+def page_scripts() -> list:
+    return [APP_DIR / "Main.py"] + sorted((APP_DIR / "pages").glob("*.py"))
+
+
+def top_level_imports(script: Path) -> str:
+    """Source of the module-level import statements of a page, in order."""
+    tree = ast.parse(script.read_text(encoding="utf-8"))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def _parse_importtime(stderr: str) -> list:
+    """Rows of (module, depth, self_us, cumulative_us) from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One separator space, then two spaces per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _interpreter_startup_modules() -> set:
+    """Modules every interpreter imports before running any code (site, encodings, ...)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True, check=True)
+    return {name for name, _, _, _ in _parse_importtime(result.stderr)}
+
+
+def profile_page(script: Path, runs: int = 3, top: int = 10) -> dict:
+    """Median cold-start import time of one page over `runs` fresh interpreters."""
+    # Mirror `streamlit run`, which puts the main script's directory on sys.path, plus the pages' own project-root entry
+    code = (
+        "import sys, time\n"
+        f"sys.path[:0] = [{str(APP_DIR)!r}, {str(PROJECT_ROOT)!r}]\n"
+        "_start = time.perf_counter()\n"
+        f"{top_level_imports(script)}\n"
+        "print(time.perf_counter() - _start)\n"
+    )
+
+    startup_modules = _interpreter_startup_modules()
+    totals, module_times = [], {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        totals.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+        for name, depth, _, cumulative_us in _parse_importtime(result.stderr):
+            # Depth 0 entries are the packages a page imports directly, with their dependencies included
+            if depth == 0 and name not in startup_modules:
+                module_times.setdefault(name, []).append(cumulative_us / 1000)
+
+    heaviest = sorted(
+        ((name, statistics.median(times)) for name, times in module_times.items()),
+        key=lambda item: item[1], reverse=True
+    )[:top]
+    return {
+        "total_ms": round(statistics.median(totals), 1),
+        "runs": runs,
+        "heaviest_imports_ms": {name: round(ms, 1) for name, ms in heaviest}
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list:
+    """Pages whose cold-start time grew by more than `tolerance` (a fraction) over the baseline."""
+    regressions = []
+    for page, result in report["pages"].items():
+        previous = baseline.get("pages", {}).get(page)
+        if previous and result["total_ms"] > previous["total_ms"] * (1 + tolerance):
+            regressions.append(f"{page}: {previous['total_ms']:.1f} ms -> {result['total_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start import time per Streamlit page.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per page; the median is reported.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--baseline", type=Path, help="Previous report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional slowdown vs. the baseline.")
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "pages": {script.name: profile_page(script, runs=args.runs) for script in page_scripts()}
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"✅ Import profile written to '{args.output}'.")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("❌ Cold-start regressions:\n   - " + "\n   - ".join(regressions))
+            sys.exit(1)
+        print("✅ No cold-start regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
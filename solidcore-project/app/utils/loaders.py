@@ -0,0 +1,127 @@
+# app/utils/loaders.py
+#
+# The app's cached loaders of the published dataset, and the query backend factory. Paths and settings
+# come from data/data_functions/data_loader.py, which stays free of Streamlit and of the app so the
+# pipeline can run on its own.
+#
+# Every loader takes the dataset version it should load: a new version is a new cache entry, and
+# app/utils/data_versions.py evicts the superseded one with `.clear(old_version)`.
+
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from app.analytics.query import BACKENDS, DuckDBBackend, PandasBackend
+from app.utils import perf
+from data.data_functions.anomaly_detection import INDEX_FILE
+from data.data_functions.data_loader import (
+    QUERY_BACKEND_ENV, SETUP_COMMANDS, processed_data_dir, query_backend_name, read_master_data, shared_data_dir
+)
+from data.data_functions.dataset_version import current_version, dataset_file
+from data.data_functions.macro_factors import MACRO_FILE, read_macro_factors
+from data.data_functions.sampling import SAMPLE_FILE
+from data.data_functions.shared_dataset import attach_shared_dataset, shared_version
+from data.data_functions.store_summaries import SUMMARY_FILE, StoreSummaries
+
+
+def open_query_backend(backend_name: str, processed_dir: Path, version: str | None = None):
+    """
+    Opens the named query backend over `processed_dir`, for `version` (by default the published one).
+    Streamlit-free, so batch jobs (like the static report export) can call it directly; raises ValueError
+    or FileNotFoundError instead of showing errors.
+    """
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Unknown query backend '{backend_name}'. Choose one of: {', '.join(BACKENDS)}.")
+    if backend_name == "shared":
+        # Mapped, not read: every server process on the machine shares the same pages
+        shared_dir = shared_data_dir(processed_dir)
+        version = shared_version(shared_dir) if version is None else version
+        shared = attach_shared_dataset(shared_dir, version) if version is not None else None
+        if shared is None:
+            raise FileNotFoundError(f"No dataset has been published for shared mode in '{shared_dir}'.")
+        return PandasBackend(shared['master'], version, shared['factors'], shared['store_index'])
+
+    version = current_version(processed_dir) if version is None else version
+    name = "master_data.parquet" if backend_name == "duckdb" else "master_data.csv"
+    path = dataset_file(processed_dir, version, name)
+    if path is None:
+        raise FileNotFoundError(f"The master data file '{name}' of dataset version {version} was not found in '{processed_dir}'.")
+    # Output from before the macro table existed carries the factors as master columns
+    factors_path = dataset_file(processed_dir, version, MACRO_FILE)
+    if backend_name == "duckdb":
+        return DuckDBBackend(path, version, factors_path)
+    factors = read_macro_factors(factors_path) if factors_path is not None else None
+    return PandasBackend(read_master_data(path), version, factors)
+
+
+@st.cache_data
+def load_processed_data(version: str) -> pd.DataFrame:
+    perf.cache_miss("load_processed_data")
+    DATA_PATH = dataset_file(processed_data_dir(), version, "master_data.csv")
+    
+    if DATA_PATH is None:
+        st.error(
+            "Fatal Error: The master data file was not found. "
+            "Please prepare the data by running this command in your terminal from the project root:"
+        )
+        # Note: You might want to update this path if your script is actually in data/data_functions
+        st.code("python data/data_functions/prepare_master_data.py")
+        return pd.DataFrame()
+        
+    try:
+        df = read_master_data(DATA_PATH)
+        return df
+    except Exception as e:
+        st.error(f"An error occurred while loading the processed data: {e}")
+        return pd.DataFrame()
+
+
+@st.cache_resource
+def load_query_backend(version: str):
+    """The query backend named by SOLIDCORE_QUERY_BACKEND, shared by all sessions; None if its data is missing."""
+    perf.cache_miss("load_query_backend")
+    backend_name = query_backend_name()
+    try:
+        return open_query_backend(backend_name, processed_data_dir(), version)
+    except ValueError as e:
+        st.error(f"{e} Set it with {QUERY_BACKEND_ENV}.")
+        return None
+    except FileNotFoundError as e:
+        st.error(f"Fatal Error: {e} Please prepare the data by running this command in your terminal from the project root:")
+        st.code(SETUP_COMMANDS["shared" if backend_name == "shared" else "prepare"])
+        return None
+
+
+@st.cache_data
+def load_anomaly_index(version: str) -> pd.DataFrame:
+    perf.cache_miss("load_anomaly_index")
+    # The anomaly index is small (flagged store-weeks only), so it is loaded once and filtered in memory.
+    INDEX_PATH = dataset_file(processed_data_dir(), version, INDEX_FILE)
+
+    if INDEX_PATH is None:
+        return pd.DataFrame()
+    return pd.read_csv(INDEX_PATH, parse_dates=['Date'])
+
+
+@st.cache_resource
+def load_store_summaries(version: str) -> StoreSummaries | None:
+    # Memory-mapped and shared by all sessions; each store's summary is read only when it is opened
+    perf.cache_miss("load_store_summaries")
+    SUMMARY_PATH = dataset_file(processed_data_dir(), version, SUMMARY_FILE)
+
+    if SUMMARY_PATH is None:
+        return None
+    return StoreSummaries(SUMMARY_PATH)
+
+
+@st.cache_resource
+def load_sample_data(version: str) -> pd.DataFrame:
+    # The stratified sample behind approximate mode; its size is capped per store, not set by the length of history.
+    # Shared by all sessions rather than copied into each, so callers must not modify it.
+    perf.cache_miss("load_sample_data")
+    SAMPLE_PATH = dataset_file(processed_data_dir(), version, SAMPLE_FILE)
+
+    if SAMPLE_PATH is None:
+        return pd.DataFrame()
+    return pd.read_csv(SAMPLE_PATH, parse_dates=['Date'])
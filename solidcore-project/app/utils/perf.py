@@ -0,0 +1,199 @@
+# app/utils/perf.py
+#
+# Lightweight hot-path instrumentation. Pages call `start_rerun()` at the top and `finish_rerun()` at
+# the bottom; in between, `span()` times a block (loader, filter, display_* functions, clustering and
+# charts, see app/utils/chart_cache.py). Cached functions call `cache_miss()` from
+# their body, which only runs on a miss, so the panel can report hit rates; caches that know what a
+# hit saved (like the chart spec cache) report it with `time_saved()`.
+#
+# Instrumentation is per session and off by default. While it is off, `span()` returns a shared no-op
+# context manager after one session-state lookup. While it is on, each rerun is shown in a sidebar
+# panel and appended as one JSON line to the perf log (SOLIDCORE_PERF_LOG, default logs/perf_log.jsonl).
+
+import datetime as dt
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+try:
+    import psutil
+    _PROCESS = psutil.Process()
+except ImportError:  # Spans are still timed; memory columns stay empty
+    _PROCESS = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PERF_LOG_ENV = "SOLIDCORE_PERF_LOG"
+DEFAULT_LOG_PATH = PROJECT_ROOT / "logs" / "perf_log.jsonl"
+
+ENABLED_KEY = "perf_debug_enabled"
+RECORDER_KEY = "perf_recorder"
+CACHE_TOTALS_KEY = "perf_cache_totals"
+
+_NO_SPAN = nullcontext()
+_log_lock = threading.Lock()
+
+
+def _rss_mb() -> float | None:
+    return _PROCESS.memory_info().rss / 1e6 if _PROCESS else None
+
+
+class RerunRecorder:
+    """Spans and cache lookups of one script rerun. Appends are thread-safe, so view threads can record too."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started = time.perf_counter()
+        self.spans = []
+        self.cache_calls = {}
+        self.cache_misses = {}
+        self.saved_seconds = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, seconds: float, rss_delta_mb: float | None):
+        with self._lock:
+            self.spans.append({
+                'name': name,
+                'ms': round(seconds * 1000, 2),
+                'rss_delta_mb': round(rss_delta_mb, 2) if rss_delta_mb is not None else None,
+                'thread': threading.current_thread().name
+            })
+
+    def count(self, counter: dict, name: str):
+        with self._lock:
+            counter[name] = counter.get(name, 0) + 1
+
+    def add_saving(self, name: str, seconds: float):
+        with self._lock:
+            self.saved_seconds[name] = self.saved_seconds.get(name, 0.0) + seconds
+
+    def summary(self) -> dict:
+        end_rss_mb = _rss_mb()
+        return {
+            'timestamp': dt.datetime.now(dt.timezone.utc).isoformat(timespec='milliseconds'),
+            'page': self.page,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'rss_mb': round(end_rss_mb, 1) if end_rss_mb is not None else None,
+            'spans': self.spans,
+            'cache': {
+                name: {'calls': calls, 'hits': calls - self.cache_misses.get(name, 0)}
+                for name, calls in self.cache_calls.items()
+            },
+            'saved_ms': {name: round(seconds * 1000, 2) for name, seconds in self.saved_seconds.items()}
+        }
+
+
+def _recorder() -> RerunRecorder | None:
+    # Background work (cache warm-up, exact refinements) runs outside any session and records nothing
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    return st.session_state.get(RECORDER_KEY)
+
+
+def start_rerun(page: str):
+    """Shows the panel toggle and, if it is on, starts recording this rerun."""
+    # Widget state does not survive page switches, so the toggle's value is mirrored in a plain key
+    enabled = st.sidebar.toggle("⏱️ Performance debug", value=st.session_state.get(ENABLED_KEY, False))
+    st.session_state[ENABLED_KEY] = enabled
+    st.session_state[RECORDER_KEY] = RerunRecorder(page) if enabled else None
+
+
+def span(name: str, cached: bool = False):
+    """
+    Times the enclosed block as `name`. With `cached=True` the block counts as one lookup of the
+    cached function `name`; the function reports misses itself via `cache_miss(name)`.
+    """
+    recorder = _recorder()
+    if recorder is None:
+        return _NO_SPAN
+    if cached:
+        recorder.count(recorder.cache_calls, name)
+    return _timed(recorder, name)
+
+
+@contextmanager
+def _timed(recorder: RerunRecorder, name: str):
+    start_rss = _rss_mb()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        end_rss = _rss_mb()
+        recorder.add_span(name, seconds, end_rss - start_rss if end_rss is not None else None)
+
+
+def cache_miss(name: str):
+    """Called from the body of a cached function, which Streamlit only runs on a cache miss."""
+    recorder = _recorder()
+    if recorder is not None:
+        recorder.count(recorder.cache_misses, name)
+
+
+def time_saved(name: str, seconds: float):
+    """Credits `seconds` of avoided work to cache `name` for this rerun, e.g. a chart spec that was not rebuilt."""
+    recorder = _recorder()
+    if recorder is not None:
+        recorder.add_saving(name, seconds)
+
+
+def _write_log(record: dict):
+    log_path = Path(os.environ.get(PERF_LOG_ENV, DEFAULT_LOG_PATH))
+    with _log_lock:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_path.open("a") as log:
+            log.write(json.dumps(record) + "\n")
+
+
+def finish_rerun():
+    """Logs the rerun and renders the debug panel in the sidebar. A no-op while the panel is off."""
+    recorder = _recorder()
+    if recorder is None:
+        return
+    st.session_state[RECORDER_KEY] = None
+
+    record = recorder.summary()
+    record['session'] = _session_id()
+    _write_log(record)
+
+    # Hit rates accumulate over the session, since a single rerun usually makes one lookup per function
+    totals = st.session_state.setdefault(CACHE_TOTALS_KEY, {})
+    for name, counts in record['cache'].items():
+        calls, hits = totals.get(name, (0, 0))
+        totals[name] = (calls + counts['calls'], hits + counts['hits'])
+
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.metric("Rerun total", f"{record['total_ms']:,.0f} ms")
+        saved_ms = sum(record['saved_ms'].values())
+        if saved_ms:
+            st.caption(f"Chart spec cache: ~{saved_ms:,.0f} ms saved across {len(record['saved_ms'])} charts")
+        if record['rss_mb'] is not None:
+            st.caption(f"Process memory: {record['rss_mb']:,.0f} MB")
+        if record['spans']:
+            st.dataframe(
+                sorted(record['spans'], key=lambda s: s['ms'], reverse=True),
+                column_config={
+                    'name': "Span",
+                    'ms': st.column_config.NumberColumn("ms", format="%.1f"),
+                    'rss_delta_mb': st.column_config.NumberColumn("Δ RSS (MB)", format="%.1f"),
+                    'thread': None
+                },
+                hide_index=True, use_container_width=True
+            )
+        if totals:
+            st.markdown("**Cache hit rates (this session)**")
+            st.dataframe(
+                [{'function': name, 'calls': calls, 'hit_rate': hits / calls} for name, (calls, hits) in totals.items()],
+                column_config={'hit_rate': st.column_config.ProgressColumn("Hit rate", format="percent", min_value=0, max_value=1)},
+                hide_index=True, use_container_width=True
+            )
+
+
+def _session_id() -> str | None:
+    ctx = get_script_run_ctx()
+    return ctx.session_id[:8] if ctx else None
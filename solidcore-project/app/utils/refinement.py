@@ -0,0 +1,179 @@
+# app/utils/refinement.py
+#
+# Approximate mode. With the sidebar toggle on, Main.py does not make the exact selection up front: it
+# keeps a `DeferredSelection` standing in for it, and per session only a boolean mask marking which rows
+# of the shared stratified sample pass the current filters. Views that support it then render
+# approximate results right away. The exact results for the same filters (and the selection they need)
+# are computed on the session's background worker. A small polling fragment next to each approximate
+# view triggers a full rerun once the exact results are ready; `prepare()` then returns them and the view
+# swaps in exact figures. Exact results are remembered per filter selection, so later reruns with the
+# same filters are exact immediately.
+#
+# Each session has a single worker, so one session's refinements never queue behind another's, and
+# refinements for filters the user has moved away from are cancelled. Like the dataset version warm-up
+# (app/utils/data_versions.py), refinements run without a script context: they only call cached
+# analytics functions and must not touch `st` elements or session state.
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from app.analytics.approximate import DOMAIN
+
+APPROXIMATE_KEY = "approximate_mode"
+SAMPLE_KEY = "approximate_sample"
+FILTER_KEY = "filter_key"
+REFINEMENTS_KEY = "exact_refinements"
+EXECUTOR_KEY = "exact_refine_executor"
+REFINE_THREAD_PREFIX = "exact_refine"
+REFINE_POLL_SECONDS = 1.0
+
+_lock = threading.Lock()
+
+
+class DeferredSelection:
+    """
+    Stands in for `backend.select(*filters)` in approximate mode, so the script does not wait for the
+    exact selection. `result()` makes it on first use (normally on the worker, for the first exact
+    refinement) and returns it; `done()` tells whether it has been made.
+    """
+
+    def __init__(self, backend, filters: tuple, sampled_rows: int):
+        self.backend = backend
+        self.filters = filters
+        self.sampled_rows = sampled_rows
+        self._selection = None
+        self._lock = threading.Lock()
+
+    def done(self) -> bool:
+        return self._selection is not None
+
+    def result(self):
+        with self._lock:
+            if self._selection is None:
+                self._selection = self.backend.select(*self.filters)
+            return self._selection
+
+    @property
+    def empty(self) -> bool:
+        # Sampled rows inside the filters prove the selection is not empty without making it
+        return self.sampled_rows == 0 and self.result().empty
+
+
+def resolve(selection):
+    """The selection itself, or the one a `DeferredSelection` stands for (made now if need be)."""
+    return selection.result() if isinstance(selection, DeferredSelection) else selection
+
+
+def is_pending(selection) -> bool:
+    """Whether `selection` is a `DeferredSelection` that has not been made yet."""
+    return isinstance(selection, DeferredSelection) and not selection.done()
+
+
+def defer_selection(backend, start_date, end_date, selected_stores, selected_types, sample, mask):
+    """
+    Turns approximate mode on for this session: keeps the shared `sample` and the `mask` of its rows
+    inside the filters, and returns a `DeferredSelection` for the filters. It is the session's previous
+    one if the filters are unchanged, so a selection made for them already is not made again.
+    """
+    st.session_state[SAMPLE_KEY] = (sample, mask)
+    filters = (start_date, end_date, tuple(selected_stores), tuple(selected_types))
+    previous = st.session_state.get('selection')
+    if isinstance(previous, DeferredSelection) and previous.backend is backend and previous.filters == filters:
+        return previous
+    return DeferredSelection(backend, filters, int(mask.sum()))
+
+
+def disable():
+    st.session_state.pop(SAMPLE_KEY, None)
+
+
+def is_enabled() -> bool:
+    return bool(st.session_state.get(APPROXIMATE_KEY)) and SAMPLE_KEY in st.session_state
+
+
+def _executor() -> ThreadPoolExecutor:
+    # Created lazily per session and dropped with its session state; idle workers exit once it is collected
+    executor = st.session_state.get(EXECUTOR_KEY)
+    if executor is None:
+        executor = st.session_state[EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=REFINE_THREAD_PREFIX)
+    return executor
+
+
+def cancel_stale():
+    """Cancels this session's refinements for filters other than the current ones. Called by Main.py on every rerun."""
+    filter_key = st.session_state.get(FILTER_KEY)
+    with _lock:
+        refinements = st.session_state.get(REFINEMENTS_KEY, {})
+        for name, (key, future) in list(refinements.items()):
+            if key != filter_key:
+                # One already running finishes (its result still lands in the shared cache); queued ones never start
+                future.cancel()
+                del refinements[name]
+
+
+def _refine(exact_fn, selection):
+    return exact_fn(resolve(selection))
+
+
+def _sample_in_domain():
+    # A shallow copy: the mask is added as a column without copying the shared sample's data
+    sample, mask = st.session_state[SAMPLE_KEY]
+    sample = sample.copy(deep=False)
+    sample[DOMAIN] = mask
+    return sample
+
+
+def prepare(name: str, exact_fn, approximate_fn, df):
+    """
+    `exact_fn(df)`, or in approximate mode `approximate_fn(sample)` while `exact_fn(df)` runs on the
+    session's worker. `df` may be a `DeferredSelection`. Safe to call from the Sales Analysis page's view threads.
+    """
+    if not is_enabled():
+        return exact_fn(resolve(df))
+
+    filter_key = st.session_state.get(FILTER_KEY)
+    with _lock:
+        refinements = st.session_state.setdefault(REFINEMENTS_KEY, {})
+        entry = refinements.get(name)
+        if entry is None or entry[0] != filter_key:
+            if entry is not None:
+                entry[1].cancel()  # A refinement for filters the user has already moved away from
+            entry = refinements[name] = (filter_key, _executor().submit(_refine, exact_fn, df))
+
+    future = entry[1]
+    if future.done() and not future.cancelled():
+        return future.result()
+    return approximate_fn(_sample_in_domain())
+
+
+@st.fragment(run_every=REFINE_POLL_SECONDS)
+def _refinement_poller():
+    filter_key = st.session_state.get(FILTER_KEY)
+    pending = [
+        future for key, future in st.session_state.get(REFINEMENTS_KEY, {}).values()
+        if key == filter_key and not future.done()
+    ]
+    if not pending:
+        st.rerun()  # Full app rerun: prepare() now returns the exact results
+    st.caption(
+        "⚡ Approximate: estimated from a stratified sample, with 95% confidence bounds. "
+        "Exact figures are being computed and will replace these automatically."
+    )
+
+
+def show_refinement_status(prepared: dict):
+    """Shows the approximate-results notice and polls for the exact results. No-op for exact results."""
+    if prepared.get('approximate'):
+        _refinement_poller()
+
+
+class _RefineContextFilter(logging.Filter):
+    # Cached functions called by refinements warn about the missing script context on every call
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.threadName.startswith(REFINE_THREAD_PREFIX)
+
+
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_RefineContextFilter())
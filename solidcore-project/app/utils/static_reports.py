@@ -0,0 +1,309 @@
+# app/utils/static_reports.py
+#
+# Static report export. Renders the default dashboard views (executive summary, seasonality, holiday
+# impact, economic drivers, forecast and store segmentation) for the standard filter combinations (all
+# stores, each store format, each calendar year) and writes them as static files that any web server
+# can host, so stakeholders who only need the default views never start a Streamlit session:
+#
+#   <output>/<report>.html   the views' charts (Vega-Lite, data embedded) and tables
+#   <output>/<report>.json   the same views' numbers, for downstream tools
+#   <output>/index.html      links to every report; manifest.json lists them with timings
+#
+# Reports are rendered in parallel worker processes, each with its own query backend. Charts come from
+# the same builder functions the Streamlit renderers use, so static and live views match. The pages
+# load Vega-Lite from jsDelivr; everything else, data included, is inside the HTML file.
+#
+# Usage (from the project root):
+#   python app/utils/static_reports.py                                  # all combinations -> reports/
+#   python app/utils/static_reports.py --workers 4 --output-dir /srv/www/retail
+#   SOLIDCORE_QUERY_BACKEND=duckdb python app/utils/static_reports.py  # workers query the Parquet file
+
+import argparse
+import datetime as dt
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from data.data_functions.data_loader import QUERY_BACKEND_ENV, processed_data_dir
+from data.data_functions.anomaly_detection import INDEX_FILE, query_anomalies
+from data.data_functions.dataset_version import dataset_file
+from app.analytics.summary import executive_summary, store_ranking
+from app.analytics.seasonality import seasonality_profile
+from app.analytics.holiday import holiday_impact
+from app.analytics.economic import ECONOMIC_FACTORS, economic_drivers
+from app.analytics.forecast import moving_average_forecast
+from app.analytics import segmentation
+from app.utils.loaders import open_query_backend
+from app.utils.data_summarizer import sales_trend_chart, sales_by_type_chart, store_ranking_chart
+from app.data_plotting_modules.seasonality_analysis import monthly_chart, weekly_chart
+from app.data_plotting_modules.holiday_analysis import uplift_bars_chart, timeline_chart
+from app.data_plotting_modules.economic_analysis import sales_vs_factor_chart, correlation_heatmap
+from app.data_plotting_modules.forecast_analysis import forecast_chart
+from app.data_plotting_modules.segmentation_analysis import segment_scatter_chart
+from app.themes import theming
+
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "reports"
+DEFAULT_SEGMENTS = 4  # The segmentation page's default slider value
+SCATTER_COLUMNS = ['Date', 'Store', 'Weekly_Sales']
+VEGA_SCRIPTS = [
+    "https://cdn.jsdelivr.net/npm/vega@5",
+    "https://cdn.jsdelivr.net/npm/vega-lite@5",
+    "https://cdn.jsdelivr.net/npm/vega-embed@6",
+]
+
+# The worker's query backend. Forked workers inherit the parent's; spawned workers open their own.
+_backend = None
+_anomaly_index = None
+
+
+def filter_combinations(filter_options: dict) -> list:
+    """(slug, title, filters) for all stores, each store format and each calendar year in the data."""
+    everything = {
+        'start_date': filter_options['min_date'],
+        'end_date': filter_options['max_date'],
+        'stores': filter_options['stores'],
+        'types': filter_options['store_types'],
+    }
+    combinations = [("all", "All stores", everything)]
+    for store_type in filter_options['store_types']:
+        combinations.append((f"type-{store_type}", f"Type {store_type} stores", {**everything, 'types': [store_type]}))
+    for year in range(filter_options['min_date'].year, filter_options['max_date'].year + 1):
+        combinations.append((f"year-{year}", f"{year}, all stores", {
+            **everything,
+            'start_date': max(dt.date(year, 1, 1), filter_options['min_date']),
+            'end_date': min(dt.date(year, 12, 31), filter_options['max_date']),
+        }))
+    return combinations
+
+
+def _init_worker(backend_name: str, processed_dir: Path, version: str):
+    global _backend, _anomaly_index
+    theming.enable_theme()
+    if _backend is None:
+        _backend = open_query_backend(backend_name, processed_dir, version)
+    index_path = dataset_file(processed_dir, version, INDEX_FILE)
+    _anomaly_index = pd.read_csv(index_path, parse_dates=['Date']) if index_path is not None else pd.DataFrame()
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='records', date_format='iso'))
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (dt.date, pd.Timestamp)):
+        return value.isoformat()
+    return value
+
+
+def _report_views(selection) -> tuple:
+    """The views as ({section: {name: frame or scalar}}, {section: [(title, chart)]}, {section: [(title, table)]})."""
+    summary = executive_summary(selection)
+    store_dates = selection.agg(['Store'], Start=('Date', 'min'), End=('Date', 'max'))
+    anomalies = (
+        query_anomalies(_anomaly_index, store_dates['Store'].unique(), store_dates['Start'].min(), store_dates['End'].max())
+        if not _anomaly_index.empty and not store_dates.empty else pd.DataFrame()
+    )
+    seasonality = seasonality_profile(selection)
+    holiday = holiday_impact(selection)
+    economic = economic_drivers(selection)
+    # Only the plotted columns: the sample is embedded once per factor chart
+    economic['scatter_sample'] = economic['scatter_sample'][SCATTER_COLUMNS + ECONOMIC_FACTORS]
+    forecast = moving_average_forecast(selection)['sales_over_time']
+
+    data = {
+        'executive_summary': {**summary, 'anomalies': anomalies},
+        'seasonality': seasonality,
+        'holiday_impact': holiday,
+        'economic_drivers': economic,
+        'forecast': {'sales_over_time': forecast.reset_index()},
+    }
+    charts = {
+        'executive_summary': [
+            ("Overall Sales Trend", sales_trend_chart(summary['sales_over_time'])),
+            ("Sales by Store Type", sales_by_type_chart(summary['sales_by_type'])),
+            ("Top 10 Stores", store_ranking_chart(store_ranking(summary['store_sales'], top=True), "Top 10 Stores")),
+            ("Bottom 10 Stores", store_ranking_chart(store_ranking(summary['store_sales'], top=False), "Bottom 10 Stores")),
+        ],
+        'seasonality': [
+            ("Monthly Sales Trend", monthly_chart(seasonality['monthly_sales'])),
+            ("Weekly Sales Hotspots", weekly_chart(seasonality['weekly_sales'], seasonality['top_3_weeks'])),
+        ],
+        'holiday_impact': [
+            ("Average Sales Comparison", uplift_bars_chart(holiday['holiday_impact_df'])),
+            ("Sales Timeline with Holiday Markers",
+             timeline_chart(holiday['sales_over_time'], holiday['holiday_data'], not holiday['holiday_data'].empty)),
+        ],
+        'economic_drivers': [("Correlation Matrix", correlation_heatmap(economic['corr_df']))] + [
+            (f"Sales vs. {factor}", sales_vs_factor_chart(economic['scatter_sample'][SCATTER_COLUMNS + [factor]], factor))
+            for factor in ECONOMIC_FACTORS
+        ],
+        'forecast': [("Actual Sales vs. 4-Week Moving Average Forecast", forecast_chart(forecast))],
+    }
+    tables = {'executive_summary': [("Sales Anomalies", anomalies)]} if not anomalies.empty else {}
+
+    # Segmentation needs at least 3 stores, like the page; k is the page's default for the store count
+    num_stores = summary['kpis']['num_stores']
+    if num_stores >= 3:
+        clustered_df, centroids = segmentation.cluster_stores(selection, min(DEFAULT_SEGMENTS, num_stores - 1, 8))
+        if centroids is not None:
+            clustered_df['Segment'] = clustered_df['Cluster'].map(segmentation.assign_cluster_labels(centroids))
+            segments = segmentation.segment_summary(clustered_df)
+            data['segmentation'] = {'stores': clustered_df, 'segments': segments}
+            charts['segmentation'] = [("Store Segment Scatter Plot", segment_scatter_chart(clustered_df))]
+            tables['segmentation'] = [("Segment Profiles at a Glance", segments)]
+    return data, charts, tables
+
+
+def _kpi_html(kpis: dict) -> str:
+    cells = [
+        ("Total Sales", f"${kpis['total_sales']:,.0f}"),
+        ("Stores Analyzed", f"{kpis['num_stores']}"),
+        ("Avg. Weekly Sales / Store", f"${kpis['avg_weekly_sales_per_store']:,.0f}"),
+        ("Avg. Sales / Sq. Ft.", f"${kpis['avg_sales_per_sqft']:,.2f}"),
+    ]
+    return '<div class="kpis">' + "".join(
+        f'<div class="kpi"><span>{label}</span><strong>{value}</strong></div>' for label, value in cells
+    ) + '</div>'
+
+
+def _page_html(title: str, subtitle: str, body: str, scripts: str = "") -> str:
+    script_tags = "".join(f'<script src="{src}"></script>' for src in VEGA_SCRIPTS) if scripts else ""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+{script_tags}
+<style>
+body {{ font-family: Arial, sans-serif; margin: 2rem auto; max-width: 1100px; color: #333; }}
+h2 {{ border-bottom: 1px solid #ddd; padding-bottom: .3rem; margin-top: 2.5rem; }}
+.kpis {{ display: flex; gap: 1rem; }}
+.kpi {{ flex: 1; border: 1px solid #ddd; border-radius: 6px; padding: .8rem; }}
+.kpi span {{ display: block; font-size: .85rem; color: #666; }}
+.kpi strong {{ font-size: 1.4rem; }}
+.chart {{ width: 100%; margin: 1rem 0; }}
+table {{ border-collapse: collapse; font-size: .85rem; }}
+th, td {{ border: 1px solid #ddd; padding: .25rem .5rem; text-align: right; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{subtitle}</p>
+{body}
+{scripts}
+</body>
+</html>
+"""
+
+
+def render_report(slug: str, title: str, filters: dict, output_dir: Path) -> dict:
+    """Renders one filter combination to `<slug>.html` and `<slug>.json`; returns its manifest entry."""
+    started = time.perf_counter()
+    selection = _backend.select(filters['start_date'], filters['end_date'], filters['stores'], filters['types'])
+    rows = len(selection)
+    subtitle = html.escape(
+        f"{filters['start_date']:%b %d, %Y} – {filters['end_date']:%b %d, %Y} · "
+        f"{len(filters['stores'])} stores · formats {', '.join(filters['types'])} · {rows:,} rows · "
+        f"generated {dt.datetime.now():%Y-%m-%d %H:%M}"
+    )
+    entry = {
+        'slug': slug,
+        'title': title,
+        'filters': _jsonable({**filters, 'stores': len(filters['stores'])}),  # Store count; the lists get long
+        'rows': rows
+    }
+    if rows == 0:
+        body, scripts, data = "<p>No data for this selection.</p>", "", {}
+    else:
+        data, charts, tables = _report_views(selection)
+        sections, embeds = [], []
+        for section, section_charts in charts.items():
+            parts = [f"<h2>{section.replace('_', ' ').title()}</h2>"]
+            if section == 'executive_summary':
+                parts.append(_kpi_html(data[section]['kpis']))
+            for chart_title, chart in section_charts:
+                chart_id = f"chart-{len(embeds)}"
+                # `</` would end the script element early if a label contained it
+                spec = json.dumps(chart.to_dict()).replace("</", "<\\/")
+                embeds.append(f"vegaEmbed('#{chart_id}', {spec}, {{actions: false}});")
+                parts.append(f'<h3>{html.escape(chart_title)}</h3><div class="chart" id="{chart_id}"></div>')
+            for table_title, table in tables.get(section, []):
+                parts.append(f"<h3>{html.escape(table_title)}</h3>" + table.to_html(index=False, float_format="{:,.2f}".format))
+            sections.append("\n".join(parts))
+        body = "\n".join(sections)
+        scripts = "<script>\n" + "\n".join(embeds) + "\n</script>"
+
+    (output_dir / f"{slug}.html").write_text(_page_html(title, subtitle, body, scripts), encoding="utf-8")
+    (output_dir / f"{slug}.json").write_text(json.dumps({**entry, 'views': _jsonable(data)}), encoding="utf-8")
+    return {**entry, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def _write_index(entries: list, output_dir: Path, manifest: dict):
+    links = "".join(
+        f'<li><a href="{entry["slug"]}.html">{html.escape(entry["title"])}</a> '
+        f'(<a href="{entry["slug"]}.json">JSON</a>, {entry["rows"]:,} rows)</li>'
+        for entry in entries
+    )
+    subtitle = html.escape(f"Generated {manifest['generated_at']} from {manifest['backend']} backend data.")
+    (output_dir / "index.html").write_text(_page_html("Big Box Retail Reports", subtitle, f"<ul>{links}</ul>"), encoding="utf-8")
+    (output_dir / "manifest.json").write_text(json.dumps({**manifest, 'reports': entries}, indent=2), encoding="utf-8")
+
+
+def export_reports(output_dir: Path, processed_dir: Path, backend_name: str, workers: int | None = None) -> dict:
+    global _backend
+    output_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    # Opened in the parent for the filter options; forked workers reuse it instead of loading the data again.
+    # Every worker reads the same version, even if the pipeline publishes another during the export.
+    _backend = open_query_backend(backend_name, processed_dir)
+    version = _backend.version
+    combinations = filter_combinations(_backend.filter_options())
+
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backend_name, processed_dir, version)) as pool:
+        futures = {pool.submit(render_report, slug, title, filters, output_dir): slug for slug, title, filters in combinations}
+        for future in as_completed(futures):
+            entry = future.result()
+            entries.append(entry)
+            print(f"   - {entry['slug']}: {entry['rows']:,} rows in {entry['seconds']:.2f}s")
+
+    order = [slug for slug, _, _ in combinations]
+    entries.sort(key=lambda entry: order.index(entry['slug']))
+    manifest = {
+        'generated_at': dt.datetime.now(dt.timezone.utc).isoformat(timespec='seconds'),
+        'backend': backend_name,
+        'total_seconds': round(time.perf_counter() - started, 2),
+    }
+    _write_index(entries, output_dir, manifest)
+    return {**manifest, 'reports': entries}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the default dashboard views as static HTML/JSON reports.")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR, help="Directory to write the reports to.")
+    parser.add_argument("--processed-dir", type=Path, default=processed_data_dir(), help="Directory with the processed data.")
+    parser.add_argument("--backend", default=os.environ.get(QUERY_BACKEND_ENV, "pandas"), help="Query backend: pandas, duckdb or shared.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    args = parser.parse_args()
+
+    print(f"🚀 Exporting static reports to '{args.output_dir}'...")
+    result = export_reports(args.output_dir, args.processed_dir, args.backend, args.workers)
+    print(f"✅ {len(result['reports'])} reports written in {result['total_seconds']:.2f}s. Open '{args.output_dir / 'index.html'}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# benchmarks/load_test.py
+#
+# Concurrent-session load test for the dashboard, built on Streamlit's headless AppTest. Each simulated
+# analyst opens Main.py, drives the sidebar filters (date range, store formats, reset), switches to the
+# Sales Analysis page and picks views, then moves the segmentation slider on the Store Segmentation
+# page, for a number of rounds. Every rerun is timed; the report gives p50/p95/p99 rerun latency and
+# peak memory for each concurrency level. Runs fully offline against a generated dataset.
+#
+# AppTest installs a process-global mock runtime for the duration of each run, so two sessions cannot
+# rerun concurrently in one interpreter. Each session therefore gets its own worker process; sessions
+# compete for CPU like they would on a shared server, but each warms its own st.cache_data.
+#
+# Usage (from the project root):
+#   python benchmarks/load_test.py                                   # 1, 4 and 8 sessions, 45 stores
+#   python benchmarks/load_test.py --sessions 1 8 16 --rounds 3 --output benchmarks/load.jsonl
+#   python benchmarks/load_test.py --data-dir data/processed_data    # use an already prepared dataset
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import psutil
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from data.data_functions.synthetic_data import generate_retail_data, write_raw_files
+from data.data_functions.prepare_master_data import prepare_master_data
+from data.data_functions.data_loader import PROCESSED_DIR_ENV
+from data.data_functions.dataset_version import dataset_file
+
+MAIN_SCRIPT = PROJECT_ROOT / "app" / "Main.py"
+SALES_PAGE = "pages/01_Sales_Analysis_and_Forecasting.py"
+SEGMENTATION_PAGE = "pages/02_Store_Segmentation_and_Efficiency.py"
+PERCENTILES = (50, 95, 99)
+MEMORY_SAMPLE_SECONDS = 0.1
+
+
+def prepare_dataset(n_stores: int, n_years: int, n_depts: int, work_dir: Path) -> Path:
+    """Generates synthetic raw extracts and runs the prepare pipeline on them. Returns the processed dir."""
+    raw_dir = write_raw_files(generate_retail_data(n_stores, n_years, n_depts), work_dir / "unprocessed_data")
+    processed_dir = work_dir / "processed_data"
+    with contextlib.redirect_stdout(io.StringIO()):
+        prepare_master_data(raw_dir, processed_dir)
+    if dataset_file(processed_dir, None, "master_data.csv") is None:
+        raise RuntimeError(f"The prepare pipeline did not produce a master dataset in '{processed_dir}'.")
+    return processed_dir
+
+
+def _widget(elements, label: str):
+    return next(element for element in elements if element.label == label)
+
+
+def session_actions(at, rng: random.Random, round_number: int) -> list:
+    """
+    One round of an analyst's clicks, as (action name, step) pairs. Each step changes a widget or the
+    page and reruns the app. Values are drawn from `rng`, so sessions do not move in lockstep.
+    """
+    def open_main():
+        if round_number > 0:
+            at.switch_page("Main.py")
+        at.run()
+
+    def change_date_range():
+        date_input = at.sidebar.date_input[0]
+        min_date, max_date = date_input.min, date_input.max
+        span_days = (max_date - min_date).days
+        start = min_date + dt.timedelta(days=rng.randint(0, span_days // 2))
+        end = start + dt.timedelta(days=rng.randint(90, max(90, span_days - (start - min_date).days)))
+        date_input.set_value((start, min(end, max_date))).run()
+
+    def pick_store_formats():
+        _widget(at.sidebar.checkbox, "Select All Store Formats").uncheck().run()
+        formats = _widget(at.sidebar.multiselect, "Select Store Format(s)")
+        formats.set_value(rng.sample(formats.options, rng.randint(1, len(formats.options)))).run()
+
+    def reset_filters():
+        _widget(at.sidebar.checkbox, "Select All Store Formats").check().run()
+
+    def pick_sales_views():
+        views = at.button_group[0]
+        options = [option.content for option in views.options]
+        views.set_value(rng.sample(options, rng.randint(1, 3))).run()
+
+    def move_segment_slider():
+        slider = at.slider[0]
+        slider.set_value(rng.randint(slider.min, slider.max)).run()
+
+    return [
+        ("main.open" if round_number > 0 else "main.cold_start", open_main),
+        ("filter.date_range", change_date_range),
+        ("filter.store_format", pick_store_formats),
+        ("filter.reset", reset_filters),
+        ("page.sales_analysis", lambda: at.switch_page(SALES_PAGE).run()),
+        ("sales_analysis.views", pick_sales_views),
+        ("page.segmentation", lambda: at.switch_page(SEGMENTATION_PAGE).run()),
+        ("segmentation.slider", move_segment_slider),
+    ]
+
+
+def run_session(session_id: int, processed_dir: str, rounds: int, think: float, timeout: float,
+                seed: int, start_barrier, results):
+    """Worker process: one simulated analyst. Puts a dict of per-action timings on `results`."""
+    os.environ[PROCESSED_DIR_ENV] = processed_dir
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    at = AppTest.from_file(str(MAIN_SCRIPT), default_timeout=timeout)
+    timings, errors, peak_rss = [], [], 0
+
+    start_barrier.wait()
+    for round_number in range(rounds):
+        for action, step in session_actions(at, rng, round_number):
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:  # A failing step (e.g. timeout) ends the session but not the load test
+                errors.append(f"{action}: {type(e).__name__}: {e}")
+                results.put({'session': session_id, 'timings': timings, 'errors': errors, 'peak_rss_mb': peak_rss})
+                return
+            timings.append((action, time.perf_counter() - start))
+            errors += [f"{action}: {exception.value}" for exception in at.exception]
+            peak_rss = max(peak_rss, psutil.Process().memory_info().rss / 1e6)
+            if think:
+                time.sleep(rng.uniform(0, think))
+
+    results.put({'session': session_id, 'timings': timings, 'errors': errors, 'peak_rss_mb': peak_rss})
+
+
+def _sample_total_rss(processes: list, stop: threading.Event, peak: list):
+    """Tracks the peak combined RSS of all session processes until `stop` is set."""
+    while not stop.is_set():
+        total = 0
+        for process in processes:
+            with contextlib.suppress(psutil.Error):
+                total += process.memory_info().rss
+        peak[0] = max(peak[0], total / 1e6)
+        stop.wait(MEMORY_SAMPLE_SECONDS)
+
+
+def _latency_summary(seconds: list) -> dict:
+    if not seconds:
+        return {f'p{p}_ms': None for p in PERCENTILES}
+    values = np.percentile(np.array(seconds) * 1000, PERCENTILES)
+    return {f'p{p}_ms': round(float(value), 1) for p, value in zip(PERCENTILES, values)}
+
+
+def run_load_level(n_sessions: int, processed_dir: Path, rounds: int, think: float, timeout: float, seed: int) -> dict:
+    """Runs `n_sessions` concurrent sessions and summarizes their rerun latencies and memory."""
+    # Spawned (not forked) workers start from a clean interpreter, like a freshly started server
+    ctx = mp.get_context("spawn")
+    start_barrier, results = ctx.Barrier(n_sessions), ctx.Queue()
+    workers = [
+        ctx.Process(target=run_session, args=(i, str(processed_dir), rounds, think, timeout, seed, start_barrier, results))
+        for i in range(n_sessions)
+    ]
+    for worker in workers:
+        worker.start()
+
+    stop_sampling, peak_total_rss = threading.Event(), [0.0]
+    sampler = threading.Thread(
+        target=_sample_total_rss, args=([psutil.Process(w.pid) for w in workers], stop_sampling, peak_total_rss), daemon=True
+    )
+    sampler.start()
+
+    start = time.perf_counter()
+    sessions = [results.get() for _ in workers]
+    wall_seconds = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+    stop_sampling.set()
+    sampler.join()
+
+    timings = [timing for session in sessions for timing in session['timings']]
+    # The first rerun loads and parses the dataset, so it is reported separately from interactive reruns
+    interactive = [seconds for action, seconds in timings if action != "main.cold_start"]
+    by_action = {}
+    for action, seconds in timings:
+        by_action.setdefault(action, []).append(seconds)
+
+    return {
+        'sessions': n_sessions,
+        'rounds': rounds,
+        'reruns': len(timings),
+        'wall_seconds': round(wall_seconds, 2),
+        'reruns_per_second': round(len(timings) / wall_seconds, 2),
+        **_latency_summary(interactive),
+        'cold_start': _latency_summary(by_action.pop("main.cold_start", [])),
+        'by_action': {action: _latency_summary(values) for action, values in by_action.items()},
+        'peak_session_rss_mb': round(max(session['peak_rss_mb'] for session in sessions), 1),
+        'peak_total_rss_mb': round(peak_total_rss[0], 1),
+        'errors': [error for session in sessions for error in session['errors']][:20]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard with concurrent headless sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8], help="Concurrency levels to run.")
+    parser.add_argument("--rounds", type=int, default=2, help="Rounds of the click script per session.")
+    parser.add_argument("--think", type=float, default=0.0, help="Max random pause between clicks, in seconds.")
+    parser.add_argument("--stores", type=int, default=45, help="Stores in the generated dataset.")
+    parser.add_argument("--years", type=int, default=3, help="Years of weekly history in the generated dataset.")
+    parser.add_argument("--depts", type=int, default=81, help="Departments per store in the generated dataset.")
+    parser.add_argument("--data-dir", type=Path, help="Use this processed data dir instead of generating one.")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-rerun timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the sessions' widget choices.")
+    parser.add_argument("--output", type=Path, help="Append JSON lines to this file instead of printing them.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="solidcore_load_") as work_dir:
+        if args.data_dir:
+            processed_dir = args.data_dir.resolve()
+            dataset = {'data_dir': str(processed_dir)}
+        else:
+            print(f"🚀 Generating a {args.stores}-store, {args.years}-year dataset...", file=sys.stderr)
+            processed_dir = prepare_dataset(args.stores, args.years, args.depts, Path(work_dir))
+            dataset = {'n_stores': args.stores, 'n_years': args.years, 'n_depts': args.depts}
+
+        run_info = {
+            'run_id': uuid.uuid4().hex[:12],
+            'timestamp': dt.datetime.now(dt.timezone.utc).isoformat(timespec='seconds'),
+            'cpu_count': psutil.cpu_count(),
+            **dataset
+        }
+        out = args.output.open("a") if args.output else sys.stdout
+        try:
+            for n_sessions in args.sessions:
+                print(f"   - Running {n_sessions} concurrent session(s)...", file=sys.stderr)
+                record = {**run_info, **run_load_level(n_sessions, processed_dir, args.rounds, args.think, args.timeout, args.seed)}
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+        finally:
+            if args.output:
+                out.close()
+                print(f"✅ Load test results appended to '{args.output}'.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# benchmarks/run_benchmarks.py
+#
+# Times and memory-profiles each stage of the app on synthetic data at several scales: the prepare
+# pipeline steps, loading the processed file, the Main.py sidebar filter, and every view computation
+# in app/analytics, on the pandas backend and again on the DuckDB backend (`duckdb.*` stages). Scale 1x is the delivered extract's size (45 stores, 3 years); Nx multiplies the
+# store count. Each stage emits one JSON line, so results can be appended to a file and compared
+# across commits.
+#
+# Usage (from the project root):
+#   python benchmarks/run_benchmarks.py                                   # 1x, 10x and 100x to stdout
+#   python benchmarks/run_benchmarks.py --scales 1 10 --depts 20 --output benchmarks/results.jsonl
+#   python benchmarks/run_benchmarks.py --stores 10000 --years 15 --depts 10 --no-memory
+
+import argparse
+import datetime as dt
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import psutil
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from data.data_functions.synthetic_data import generate_retail_data, write_raw_files
+from data.data_functions.prepare_master_data import (
+    load_raw_data, merge_raw_data, clean_data, engineer_features, save_master_data
+)
+from data.data_functions.anomaly_detection import build_anomaly_index
+from data.data_functions.data_loader import read_master_data
+from data.data_functions.macro_factors import MACRO_FILE, build_macro_factors, read_macro_factors, write_macro_factors
+from app.analytics.filters import filter_master_data
+from app.analytics.query import DuckDBBackend, FrameSelection
+from app.analytics.summary import executive_summary
+from app.analytics.seasonality import seasonality_profile
+from app.analytics.holiday import holiday_impact
+from app.analytics.economic import economic_drivers
+from app.analytics.forecast import moving_average_forecast
+from app.analytics.segmentation import cluster_stores
+from app.analytics.scenarios import fit_economic_model
+
+BASE_STORES = 45
+BASE_YEARS = 3
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(fn, setup=lambda: (), repeat: int = 3, memory: bool = True) -> dict:
+    """
+    Wall time (min and median over `repeat` runs) and, optionally, peak traced allocation of one stage.
+
+    `setup` returns the stage's arguments; it runs outside the timer so stages that modify their
+    input in place start from the same state every time.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        # A separate traced run: tracemalloc slows allocation-heavy code, so it must not skew the timings
+        args = setup()
+        tracemalloc.start()
+        result = fn(*args)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    return {
+        'result': result,
+        'seconds_min': round(min(timings), 6),
+        'seconds_median': round(statistics.median(timings), 6),
+        'peak_alloc_mb': round(peak_mb, 2) if peak_mb is not None else None,
+        'rss_mb': round(psutil.Process().memory_info().rss / 1e6, 1)
+    }
+
+
+def benchmark_scale(n_stores: int, n_years: int, n_depts: int, repeat: int, memory: bool, work_dir: Path):
+    """Yields (stage, rows_in, measurement) for every stage at one data scale."""
+    generated = measure(lambda: generate_retail_data(n_stores, n_years, n_depts), repeat=1, memory=memory)
+    dfs = generated['result']
+    yield 'synthetic.generate', len(dfs['sales']), generated
+
+    raw_dir = write_raw_files(dfs, work_dir / 'unprocessed_data')
+    processed_dir = work_dir / 'processed_data'
+    del dfs, generated
+
+    # --- Prepare pipeline, one step at a time ---
+    loaded = measure(load_raw_data, lambda: (raw_dir,), repeat, memory)
+    raw = loaded['result']
+    yield 'pipeline.load', len(raw['sales']), loaded
+
+    merged = measure(merge_raw_data, lambda: (raw,), repeat, memory)
+    yield 'pipeline.merge', len(raw['sales']), merged
+    macro = measure(build_macro_factors, lambda: (raw['macro'],), repeat, memory)
+    yield 'pipeline.macro_factors', len(raw['macro']), macro
+    del raw, loaded
+
+    cleaned = measure(clean_data, lambda: (merged['result'].copy(), macro['result']), repeat, memory)
+    yield 'pipeline.clean', len(merged['result']), cleaned
+    del merged
+
+    featured = measure(engineer_features, lambda: (cleaned['result'].copy(),), repeat, memory)
+    yield 'pipeline.features', len(cleaned['result']), featured
+    del cleaned
+    master = featured['result']
+
+    yield 'pipeline.save', len(master), measure(save_master_data, lambda: (master, processed_dir), repeat, memory)
+    write_macro_factors(macro['result'], processed_dir)
+    del macro
+    yield 'pipeline.anomalies', len(master), measure(build_anomaly_index, lambda: (master, processed_dir), repeat, memory)
+    del featured, master
+
+    # --- App: load, filter, views ---
+    loaded = measure(read_master_data, lambda: (processed_dir / 'master_data.csv',), repeat, memory)
+    master_df = loaded['result']
+    yield 'app.load_processed_data', len(master_df), loaded
+
+    all_stores = sorted(master_df['Store'].unique())
+    all_types = sorted(master_df['Type'].unique())
+    min_date, max_date = master_df['Date'].min().date(), master_df['Date'].max().date()
+    latest_year = master_df['Date'].max().year
+
+    filter_all = measure(
+        filter_master_data, lambda: (master_df, min_date, max_date, all_stores, all_types), repeat, memory
+    )
+    yield 'app.filter.all', len(master_df), filter_all
+    yield 'app.filter.type_a_latest_year', len(master_df), measure(
+        filter_master_data,
+        lambda: (master_df, dt.date(latest_year, 1, 1), max_date, all_stores, all_types[:1]),
+        repeat, memory
+    )
+
+    filtered_df = filter_all['result']
+    # The views take the macro factors from the selection, as in the app
+    factors = read_macro_factors(processed_dir / MACRO_FILE).sort_values('Date', ignore_index=True)
+    filtered_selection = FrameSelection(filtered_df, factors=factors)
+    views = {
+        'view.executive_summary': executive_summary,
+        'view.seasonality': seasonality_profile,
+        'view.holiday_impact': holiday_impact,
+        'view.economic_drivers': economic_drivers,
+        'view.forecast': moving_average_forecast,
+        'view.scenario_model': fit_economic_model,
+        'view.store_clusters': lambda df: cluster_stores(df, 4),
+    }
+    for stage, fn in views.items():
+        yield stage, len(filtered_df), measure(fn, lambda: (filtered_selection,), repeat, memory)
+
+    # The same views on the DuckDB backend, queried from the Parquet file. tracemalloc only sees the
+    # Python-side result frames, not DuckDB's own buffers.
+    opened = measure(
+        DuckDBBackend, lambda: (processed_dir / 'master_data.parquet', None, processed_dir / MACRO_FILE), repeat, memory
+    )
+    yield 'duckdb.open', len(master_df), opened
+    selection = opened['result'].select(min_date, max_date, all_stores, all_types)
+    for stage, fn in views.items():
+        yield f'duckdb.{stage}', len(filtered_df), measure(fn, lambda: (selection,), repeat, memory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline and app computations on synthetic data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help=f"Store-count multipliers of the {BASE_STORES}-store base data.")
+    parser.add_argument("--stores", type=int, help="Benchmark a single explicit store count instead of --scales.")
+    parser.add_argument("--years", type=int, default=BASE_YEARS, help="Years of weekly history (3 to 15).")
+    parser.add_argument("--depts", type=int, default=81, help="Departments per store.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; min and median are reported.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-allocation runs.")
+    parser.add_argument("--output", type=Path, help="Append JSON lines to this file instead of printing them.")
+    args = parser.parse_args()
+
+    store_counts = [args.stores] if args.stores else [BASE_STORES * scale for scale in args.scales]
+    run_info = {
+        'run_id': uuid.uuid4().hex[:12],
+        'timestamp': dt.datetime.now(dt.timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpu_count': psutil.cpu_count(),
+    }
+
+    out = args.output.open("a") if args.output else sys.stdout
+    try:
+        for n_stores in store_counts:
+            with tempfile.TemporaryDirectory(prefix="solidcore_bench_") as work_dir:
+                for stage, rows, measurement in benchmark_scale(
+                    n_stores, args.years, args.depts, args.repeat, not args.no_memory, Path(work_dir)
+                ):
+                    record = {
+                        **run_info,
+                        'scale': round(n_stores / BASE_STORES, 2),
+                        'n_stores': n_stores,
+                        'n_years': args.years,
+                        'n_depts': args.depts,
+                        'stage': stage,
+                        'rows': rows,
+                        'repeat': 1 if stage == 'synthetic.generate' else args.repeat,
+                        # The stage's output stays with the generator, which feeds it to the next stage
+                        **{key: value for key, value in measurement.items() if key != 'result'}
+                    }
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+    finally:
+        if args.output:
+            out.close()
+            print(f"✅ Benchmark results appended to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# data/data_functions/anomaly_detection.py
+
+import hashlib
+import json
+import os
+import warnings
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Trailing weeks used to build each store's "expected" weekly sales.
+ROLLING_WINDOW = 13
+MIN_HISTORY = 8
+Z_THRESHOLD = 3.5
+# Scales the MAD so it is comparable to a standard deviation for normally distributed data.
+MAD_SCALE = 1.4826
+# Stores scored per block; keeps the (weeks x stores x window) scratch array bounded.
+STORE_BLOCK_SIZE = 512
+
+INDEX_FILE = 'anomaly_index.csv'
+META_FILE = 'anomaly_index.json'
+INDEX_COLUMNS = ['Store', 'Date', 'Weekly_Sales', 'Expected_Sales', 'Robust_Z']
+
+
+def store_week_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """Total weekly sales per store (departments summed) as a Date x Store matrix."""
+    return df.groupby(['Date', 'Store'])['Weekly_Sales'].sum().unstack('Store').sort_index()
+
+
+@contextmanager
+def _quiet_nan_warnings():
+    # All-NaN windows (new stores, the first weeks of history) are expected and simply stay unscored.
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        yield
+
+
+def _rolling_median_and_mad(values: np.ndarray, window: int, min_history: int):
+    """Trailing median and MAD for every (week, store) cell, excluding the week itself."""
+    weeks, stores = values.shape
+    # Pad the top so week t sees weeks t-window .. t-1 only.
+    padded = np.vstack([np.full((window, stores), np.nan), values])[:-1]
+    median = np.full((weeks, stores), np.nan)
+    mad = np.full((weeks, stores), np.nan)
+
+    for start in range(0, stores, STORE_BLOCK_SIZE):
+        block = slice(start, start + STORE_BLOCK_SIZE)
+        windows = sliding_window_view(padded[:, block], window, axis=0)
+        enough = (~np.isnan(windows)).sum(axis=-1) >= min_history
+        with _quiet_nan_warnings():
+            block_median = np.nanmedian(windows, axis=-1)
+            block_mad = np.nanmedian(np.abs(windows - block_median[..., None]), axis=-1)
+        median[:, block] = np.where(enough, block_median, np.nan)
+        mad[:, block] = np.where(enough, block_mad, np.nan)
+
+    return median, mad
+
+
+def score_store_weeks(sales: pd.DataFrame, window: int = ROLLING_WINDOW, min_history: int = MIN_HISTORY) -> pd.DataFrame:
+    """
+    Scores every store-week against its trailing robust baseline in one batched pass.
+
+    The baseline is the store's rolling median, scaled by the chain-wide movement for that
+    week (the median ratio of actual to baseline across all stores). This keeps company-wide
+    holiday peaks from flagging every store, so only stores that deviate from the chain stand out.
+
+    Args:
+        sales (pd.DataFrame): Date x Store matrix from `store_week_matrix`.
+
+    Returns:
+        pd.DataFrame: Long frame with Store, Date, Weekly_Sales, Expected_Sales and Robust_Z.
+    """
+    values = sales.to_numpy(dtype=float)
+    baseline, mad = _rolling_median_and_mad(values, window, min_history)
+
+    with _quiet_nan_warnings():
+        ratio = values / baseline
+        ratio[~np.isfinite(ratio)] = np.nan
+        chain_factor = np.nanmedian(ratio, axis=1, keepdims=True)
+        chain_factor = np.where(np.isnan(chain_factor), 1.0, chain_factor)
+        expected = baseline * chain_factor
+        spread = MAD_SCALE * mad * chain_factor
+        robust_z = (values - expected) / spread
+    robust_z[~np.isfinite(robust_z)] = np.nan
+
+    dates = np.repeat(sales.index.to_numpy(), sales.shape[1])
+    stores = np.tile(sales.columns.to_numpy(), sales.shape[0])
+    return pd.DataFrame({
+        'Store': stores,
+        'Date': dates,
+        'Weekly_Sales': values.ravel(),
+        'Expected_Sales': expected.ravel(),
+        'Robust_Z': robust_z.ravel()
+    })
+
+
+def flag_anomalies(scores: pd.DataFrame, threshold: float = Z_THRESHOLD) -> pd.DataFrame:
+    """Keeps only the store-weeks whose robust z-score exceeds the threshold, in index order."""
+    flagged = scores[scores['Robust_Z'].abs() >= threshold]
+    flagged = flagged.astype({'Weekly_Sales': 'float32', 'Expected_Sales': 'float32', 'Robust_Z': 'float32'})
+    return flagged.sort_values(['Date', 'Store']).reset_index(drop=True)[INDEX_COLUMNS]
+
+
+def _history_digest(sales: pd.DataFrame) -> str:
+    """Digest of a store-week matrix, to tell whether the history an index was scored on has changed."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(sales.index.to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(','.join(map(str, sales.columns)).encode())
+    # Rounded to cents, so summing the departments in another order does not change the digest
+    digest.update(np.round(sales.to_numpy(dtype=float), 2).tobytes())
+    return digest.hexdigest()
+
+
+def _write_index(index_df: pd.DataFrame, sales: pd.DataFrame, processed_dir: Path):
+    # Each file is replaced in one step, never rewritten in place: it may be linked into a published version
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    partial_path = processed_dir / (INDEX_FILE + '.part')
+    index_df.to_csv(partial_path, index=False, float_format='%.4f')
+    os.replace(partial_path, processed_dir / INDEX_FILE)
+    meta = {
+        'window': ROLLING_WINDOW,
+        'min_history': MIN_HISTORY,
+        'threshold': Z_THRESHOLD,
+        'last_scored_date': sales.index.max().strftime('%Y-%m-%d'),
+        'history_digest': _history_digest(sales),
+        'flagged_store_weeks': int(len(index_df))
+    }
+    partial_path = processed_dir / (META_FILE + '.part')
+    partial_path.write_text(json.dumps(meta, indent=2))
+    os.replace(partial_path, processed_dir / META_FILE)
+
+
+def build_anomaly_index(df: pd.DataFrame, processed_dir: Path) -> pd.DataFrame:
+    """Scores the full history and writes the flagged store-week index."""
+    sales = store_week_matrix(df)
+    index_df = flag_anomalies(score_store_weeks(sales))
+    _write_index(index_df, sales, processed_dir)
+    return index_df
+
+
+def update_anomaly_index(df: pd.DataFrame, processed_dir: Path, previous_dir: Path | None = None) -> pd.DataFrame:
+    """
+    Scores only the weeks that arrived since the index in `previous_dir` (by default `processed_dir`)
+    was written, and writes the extended index to `processed_dir`.
+
+    Just the trailing `ROLLING_WINDOW` weeks of history are re-scored with the new weeks, so the cost
+    of an update depends on the number of new weeks rather than on the length of the history. The
+    index is rebuilt from scratch instead if the weeks it was scored on have changed since (a revised
+    extract, a store added or dropped) or if it was scored with different settings.
+    """
+    previous_dir = processed_dir if previous_dir is None else previous_dir
+    meta_path = previous_dir / META_FILE
+    if not meta_path.exists() or not (previous_dir / INDEX_FILE).exists():
+        return build_anomaly_index(df, processed_dir)
+
+    meta = json.loads(meta_path.read_text())
+    sales = store_week_matrix(df)
+    last_scored = pd.Timestamp(meta['last_scored_date'])
+    settings = {'window': ROLLING_WINDOW, 'min_history': MIN_HISTORY, 'threshold': Z_THRESHOLD}
+    if (any(meta.get(name) != value for name, value in settings.items())
+            or meta.get('history_digest') != _history_digest(sales[sales.index <= last_scored].dropna(axis=1, how='all'))):
+        return build_anomaly_index(df, processed_dir)
+
+    existing = pd.read_csv(previous_dir / INDEX_FILE, parse_dates=['Date'])
+    if sales.index.max() <= last_scored:
+        index_df = existing
+    else:
+        history_start = last_scored - pd.Timedelta(weeks=ROLLING_WINDOW)
+        new_scores = score_store_weeks(sales[sales.index > history_start])
+        new_flags = flag_anomalies(new_scores[new_scores['Date'] > last_scored])
+        index_df = pd.concat([existing, new_flags], ignore_index=True)
+    _write_index(index_df, sales, processed_dir)
+    return index_df
+
+
+def query_anomalies(index_df: pd.DataFrame, stores, start_date, end_date) -> pd.DataFrame:
+    """Flagged store-weeks for a store selection and date range, largest deviations first."""
+    if index_df.empty:
+        return index_df
+    mask = (
+        index_df['Store'].isin(stores)
+        & (index_df['Date'] >= pd.Timestamp(start_date))
+        & (index_df['Date'] <= pd.Timestamp(end_date))
+    )
+    result = index_df[mask]
+    return result.reindex(result['Robust_Z'].abs().sort_values(ascending=False).index)
+
+
+if __name__ == "__main__":
+    import sys
+    PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+    sys.path.append(str(PROJECT_ROOT))
+    from data.data_functions.dataset_version import dataset_file, publish_version, stage_unchanged, staging_dir
+    from data.data_functions.prepare_master_data import OUTPUT_FILE, PUBLISHED_FILES
+
+    processed_dir = PROJECT_ROOT / 'data' / 'processed_data'
+    master_df = pd.read_csv(dataset_file(processed_dir, None, OUTPUT_FILE), parse_dates=['Date'])
+    # Published versions are never rewritten: the updated index is published as a new version
+    with staging_dir(processed_dir) as output_dir:
+        stage_unchanged(processed_dir, None, output_dir, PUBLISHED_FILES)
+        updated = update_anomaly_index(master_df, output_dir)
+        manifest = publish_version(processed_dir, output_dir, PUBLISHED_FILES)
+    print(f"✅ Anomaly index up to date: {len(updated)} flagged store-weeks (dataset version {manifest['version']}).")
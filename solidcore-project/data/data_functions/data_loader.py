@@ -1,28 +1,47 @@
 # data/data_functions/data_loader.py
 
-import streamlit as st
+import os
 import pandas as pd
 from pathlib import Path
 
+from data.data_functions.dataset_version import current_version
+from data.data_functions.shared_dataset import shared_version
 
-@st.cache_data
-def load_processed_data() -> pd.DataFrame:
-    # <<< FIX: Correctly navigate to the project root (three levels up) and then to the data file.
-    PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
-    DATA_PATH = PROJECT_ROOT / "data/processed_data/master_data.csv"
-    
-    if not DATA_PATH.exists():
-        st.error(
-            "Fatal Error: The master data file was not found. "
-            "Please prepare the data by running this command in your terminal from the project root:"
-        )
-        # Note: You might want to update this path if your script is actually in data/data_functions
-        st.code("python data/data_functions/prepare_master_data.py")
-        return pd.DataFrame()
-        
-    try:
-        df = pd.read_csv(DATA_PATH, parse_dates=['Date'])
-        return df
-    except Exception as e:
-        st.error(f"An error occurred while loading the processed data: {e}")
-        return pd.DataFrame()
+# Load tests and benchmarks point the app at a generated dataset by setting SOLIDCORE_PROCESSED_DIR
+PROCESSED_DIR_ENV = "SOLIDCORE_PROCESSED_DIR"
+# "pandas" (default) holds the master dataset in memory; "duckdb" queries master_data.parquet on disk;
+# "shared" maps the dataset published by data/data_functions/shared_dataset.py, shared by every server process
+QUERY_BACKEND_ENV = "SOLIDCORE_QUERY_BACKEND"
+SHARED_DIR_ENV = "SOLIDCORE_SHARED_DIR"
+SETUP_COMMANDS = {
+    "prepare": "python data/data_functions/prepare_master_data.py",
+    "shared": "python data/data_functions/shared_dataset.py --watch",
+}
+
+
+def processed_data_dir() -> Path:
+    default_dir = Path(__file__).resolve().parent.parent.parent / "data" / "processed_data"
+    return Path(os.environ.get(PROCESSED_DIR_ENV, default_dir))
+
+
+def shared_data_dir(processed_dir: Path | None = None) -> Path:
+    return Path(os.environ.get(SHARED_DIR_ENV, (processed_dir or processed_data_dir()) / "shared"))
+
+
+def query_backend_name() -> str:
+    return os.environ.get(QUERY_BACKEND_ENV, "pandas").lower()
+
+
+def published_version() -> str | None:
+    """
+    The dataset version the pipeline last published (in shared mode, the one last published to shared
+    memory). The app's loaders (app/utils/loaders.py) take it as their cache key.
+    """
+    if query_backend_name() == "shared":
+        return shared_version(shared_data_dir())
+    return current_version(processed_data_dir())
+
+
+def read_master_data(path: Path) -> pd.DataFrame:
+    """Reads the processed master dataset. Streamlit-free, so benchmarks and batch jobs can call it directly."""
+    return pd.read_csv(path, parse_dates=['Date'])
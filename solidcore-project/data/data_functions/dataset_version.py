@@ -0,0 +1,133 @@
+# data/data_functions/dataset_version.py
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import uuid
+import pandas as pd
+from pathlib import Path
+
+# The pipeline publishes each run's output as a dataset version: a content hash of the files it wrote.
+# A run writes into a staging directory under versions/, which is renamed to versions/<version>/ once
+# every file is in place; dataset_version.json at the top of the processed directory then names it.
+# Published files are never rewritten, so a reader holding an older version (a cache miss, a DuckDB
+# scan) keeps reading that version's files while the next one is written. The app keys its caches on
+# the version, so a regenerated dataset is picked up (and the superseded one evicted) without a restart.
+VERSION_FILE = 'dataset_version.json'
+VERSIONS_DIR = 'versions'
+# The current version, the one servers may still be serving while they warm it up, and one before that
+VERSIONS_KEPT = 3
+CHUNK_BYTES = 1 << 20
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace_json(path: Path, content: dict):
+    partial_path = path.with_name(path.name + '.part')
+    partial_path.write_text(json.dumps(content, indent=2))
+    os.replace(partial_path, path)
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+@contextlib.contextmanager
+def staging_dir(processed_dir: Path):
+    """A new directory to write a version's files into; removed if they are not published from it."""
+    path = processed_dir / VERSIONS_DIR / f".staging-{uuid.uuid4().hex}"
+    path.mkdir(parents=True)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def stage_unchanged(processed_dir: Path, version: str | None, staging: Path, file_names: list):
+    """
+    Puts the named files of a published version into `staging`, for a run that rewrites only some of
+    them. They are hard links where the file system allows it, so nothing is copied; the run must replace
+    the files it rewrites (write then `os.replace`) rather than write into them.
+    """
+    for name in file_names:
+        source = dataset_file(processed_dir, version, name)
+        if source is None:
+            continue
+        try:
+            os.link(source, staging / name)
+        except OSError:
+            shutil.copy2(source, staging / name)
+
+
+def publish_version(processed_dir: Path, staging: Path, file_names: list) -> dict:
+    """
+    Hashes the files written to `staging`, moves them to the new version's directory and replaces the
+    manifest naming the current version in one step, so readers see either the previous version or the
+    complete new one. Versions beyond the last `VERSIONS_KEPT` are then removed.
+    """
+    files = {
+        name: {'bytes': (staging / name).stat().st_size, 'blake2b': _file_digest(staging / name)}
+        for name in file_names if (staging / name).exists()
+    }
+    version = hashlib.blake2b(json.dumps(files, sort_keys=True).encode(), digest_size=6).hexdigest()
+    previous = _read_json(processed_dir / VERSION_FILE) or {}
+    manifest = {
+        'version': version,
+        'published_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        'path': f"{VERSIONS_DIR}/{version}",
+        'files': files,
+        'history': [v for v in [previous.get('version')] + previous.get('history', []) if v and v != version][:VERSIONS_KEPT - 1]
+    }
+    _replace_json(staging / VERSION_FILE, manifest)
+
+    version_dir = processed_dir / manifest['path']
+    if not version_dir.exists():
+        # Otherwise the same content is already published under this version
+        os.rename(staging, version_dir)
+    _replace_json(processed_dir / VERSION_FILE, manifest)
+
+    kept = {version, *manifest['history']}
+    for path in (processed_dir / VERSIONS_DIR).iterdir():
+        if not path.name.startswith('.') and path.name not in kept:
+            shutil.rmtree(path, ignore_errors=True)
+    return manifest
+
+
+def current_version(processed_dir: Path) -> str | None:
+    """
+    The published version, or for output written before versions were published, one derived from the
+    master data file's modification time. None when there is no output at all.
+    """
+    manifest = _read_json(processed_dir / VERSION_FILE)
+    if manifest is not None and 'version' in manifest:
+        return manifest['version']
+    master_path = processed_dir / 'master_data.csv'
+    return f"mtime-{master_path.stat().st_mtime_ns}" if master_path.exists() else None
+
+
+def dataset_file(processed_dir: Path, version: str | None, name: str) -> Path | None:
+    """
+    The path of one of `version`'s files (by default the current version's), as listed in that version's
+    manifest; None if the version does not include it. Output from before versions had their own
+    directories is read from the top of the processed directory.
+    """
+    version = current_version(processed_dir) if version is None else version
+    if version is None:
+        return None
+    version_dir = processed_dir / VERSIONS_DIR / version
+    manifest = _read_json(version_dir / VERSION_FILE)
+    if manifest is not None:
+        return version_dir / name if name in manifest['files'] else None
+    legacy_path = processed_dir / name
+    return legacy_path if legacy_path.exists() else None
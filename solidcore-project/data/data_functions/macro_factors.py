@@ -0,0 +1,52 @@
+# data/data_functions/macro_factors.py
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# The macro factors are kept out of the master dataset: one row per store and week they were reported
+# for, instead of a copy on every department's sales row. `attach_factors()` joins them on by an as-of
+# join when a view asks for them (see app/analytics/query.py), so new readings land without rewriting the
+# sales data.
+MACRO_FILE = 'macro_factors.parquet'
+ECONOMIC_FACTORS = ['Temperature', 'Fuel_Price', 'CPI', 'Unemployment']
+FACTOR_KEYS = ['Store', 'Date']  # The macro table's key: the as-of join matches on Store, then on the latest Date
+# CPI and unemployment are published monthly; their weeks in between are filled from the last release
+MONTHLY_FACTORS = ['CPI', 'Unemployment']
+
+
+def build_macro_factors(macro_df: pd.DataFrame) -> pd.DataFrame:
+    """The per-store factor table (Store, Date, factors), sorted by store and date."""
+    factors = macro_df[['Store', 'Date'] + ECONOMIC_FACTORS].copy()
+    factors['Date'] = pd.to_datetime(factors['Date'])
+    factors.sort_values(['Store', 'Date'], inplace=True, ignore_index=True)
+    # Forward fill, then a backward fill for weeks before a store's first release
+    factors[MONTHLY_FACTORS] = factors.groupby('Store')[MONTHLY_FACTORS].transform(lambda x: x.ffill().bfill())
+    return factors.dropna(ignore_index=True)
+
+
+def write_macro_factors(factors: pd.DataFrame, processed_dir: Path) -> Path:
+    """Writes the factor table; the file is replaced in one step when complete."""
+    output_path = processed_dir / MACRO_FILE
+    partial_path = output_path.with_name(output_path.name + '.part')
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    factors.to_parquet(partial_path, index=False)
+    partial_path.replace(output_path)
+    return output_path
+
+
+def read_macro_factors(path: Path) -> pd.DataFrame:
+    return pd.read_parquet(path)
+
+
+def attach_factors(frame: pd.DataFrame, factors: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    `frame` (with Store and Date columns) plus `columns` of the macro table, as of each row's date: the
+    store's latest reading on or before it. Rows keep their order and index. `factors` must be sorted by Date.
+    """
+    order = np.argsort(frame['Date'].to_numpy(), kind='stable')
+    right = factors[FACTOR_KEYS + columns].astype({'Date': frame['Date'].dtype})
+    joined = pd.merge_asof(frame.iloc[order], right, on='Date', by='Store', direction='backward')
+    joined = joined.iloc[np.argsort(order, kind='stable')]
+    joined.index = frame.index
+    return joined
@@ -0,0 +1,185 @@
+# data/data_functions/pipeline_profiler.py
+#
+# Step-level profiling for the prepare pipeline: wall time, peak RSS and the shape and dtype memory of
+# the frame(s) each step produces, plus an optional sampling profile. The sampler is a daemon thread
+# that reads the pipeline thread's stack via sys._current_frames() every few milliseconds, so it needs
+# no extra dependency and its cost does not grow with the number of Python calls. Samples are written
+# in folded-stack format (one "frame;frame;frame count" line per stack), which flamegraph.pl and
+# speedscope read directly; each stack is rooted at the step it was taken in.
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import psutil
+    _PROCESS = psutil.Process()
+except ImportError:  # Without psutil, peak RSS falls back to the process high-water mark (Unix only)
+    _PROCESS = None
+
+RSS_SAMPLE_SECONDS = 0.01
+DEFAULT_PROFILE_INTERVAL = 0.005
+
+
+def _rss_mb() -> float | None:
+    if _PROCESS is not None:
+        return _PROCESS.memory_info().rss / 1e6
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    scale = 1e6 if sys.platform == 'darwin' else 1e3
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def frame_stats(df: pd.DataFrame) -> dict:
+    """Rows, columns and deep memory footprint of a frame, in total and per dtype."""
+    memory = df.memory_usage(deep=True, index=True)
+    dtypes = df.dtypes.astype(str)
+    by_dtype = memory.drop('Index').groupby(dtypes).sum() / 1e6
+    return {
+        'rows': len(df),
+        'columns': df.shape[1],
+        'memory_mb': round(memory.sum() / 1e6, 2),
+        'memory_by_dtype_mb': {dtype: round(mb, 2) for dtype, mb in by_dtype.sort_values(ascending=False).items()}
+    }
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval and counts folded stacks."""
+
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(name="pipeline_stack_sampler", daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.current_step = "setup"
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join([self.current_step] + frames[::-1])] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class _PeakRssSampler(threading.Thread):
+    """Tracks the highest RSS seen since the last `reset()`."""
+
+    def __init__(self):
+        super().__init__(name="pipeline_rss_sampler", daemon=True)
+        self.peak_mb = _rss_mb() or 0.0
+        self._stop_event = threading.Event()
+
+    def reset(self):
+        self.peak_mb = _rss_mb() or 0.0
+
+    def run(self):
+        while not self._stop_event.wait(RSS_SAMPLE_SECONDS):
+            self.peak_mb = max(self.peak_mb, _rss_mb() or 0.0)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class PipelineProfiler:
+    """
+    Collects a per-step report for one pipeline run.
+
+    Usage:
+        profiler = PipelineProfiler(sample_stacks=True)
+        with profiler.step('load'):
+            dfs = load_raw_data()
+        profiler.record_frames('load', dfs)
+        profiler.finish(report_path, folded_path)
+    """
+
+    def __init__(self, sample_stacks: bool = False, interval: float = DEFAULT_PROFILE_INTERVAL):
+        self.steps = {}
+        self.started = time.perf_counter()
+        self._rss_sampler = _PeakRssSampler()
+        self._rss_sampler.start()
+        self._stack_sampler = None
+        if sample_stacks:
+            self._stack_sampler = _StackSampler(threading.get_ident(), interval)
+            self._stack_sampler.start()
+
+    @contextmanager
+    def step(self, name: str):
+        if self._stack_sampler:
+            self._stack_sampler.current_step = name
+        self._rss_sampler.reset()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            rss_after = _rss_mb()
+            # Catch a peak reached after the sampler's last tick
+            peak = max(self._rss_sampler.peak_mb, rss_after or 0.0)
+            self.steps.setdefault(name, {}).update({
+                'seconds': round(seconds, 4),
+                'peak_rss_mb': round(peak, 1) if rss_after is not None else None,
+                'rss_after_mb': round(rss_after, 1) if rss_after is not None else None
+            })
+
+    def record_frames(self, name: str, frames):
+        """Adds the shape and dtype memory of a step's output (a frame, or a dict of named frames)."""
+        if isinstance(frames, pd.DataFrame):
+            self.steps.setdefault(name, {}).update(frame_stats(frames))
+        else:
+            self.steps.setdefault(name, {})['frames'] = {key: frame_stats(df) for key, df in frames.items()}
+
+    def _top_functions(self, top: int = 10) -> dict:
+        """Functions with the most self samples, per step."""
+        by_step = {}
+        for stack, count in self._stack_sampler.stacks.items():
+            step, *frames = stack.split(";")
+            if frames:
+                by_step.setdefault(step, Counter())[frames[-1]] += count
+        return {
+            step: [{'function': function, 'samples': samples} for function, samples in counter.most_common(top)]
+            for step, counter in by_step.items()
+        }
+
+    def finish(self, report_path: Path, folded_path: Path | None = None) -> dict:
+        """Stops the samplers and writes the JSON report (and the folded stacks, if sampling)."""
+        self._rss_sampler.stop()
+        report = {
+            'total_seconds': round(time.perf_counter() - self.started, 4),
+            'peak_rss_mb': round(max((s.get('peak_rss_mb') or 0.0) for s in self.steps.values()), 1) if self.steps else None,
+            'steps': self.steps
+        }
+
+        if self._stack_sampler:
+            self._stack_sampler.stop()
+            report['profile'] = {
+                'interval_seconds': self._stack_sampler.interval,
+                'samples': sum(self._stack_sampler.stacks.values()),
+                'top_functions': self._top_functions()
+            }
+            if folded_path:
+                folded_path.write_text(
+                    "".join(f"{stack} {count}\n" for stack, count in self._stack_sampler.stacks.most_common())
+                )
+                report['profile']['folded_stacks'] = folded_path.name
+
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2))
+        return report
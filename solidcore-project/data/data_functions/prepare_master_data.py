@@ -1,58 +1,88 @@
 # data/data_functions/prepare_master_data.py
 
+import argparse
 import pandas as pd
+import sys
 from pathlib import Path
 import numpy as np
 
-def prepare_master_data():
-    print("🚀 Starting the master data preparation pipeline...")
-
-    # <<< FIX: Define a robust project root based on this script's location
-    PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
-    
-    # <<< FIX: Define all paths relative to the project root
-    unprocessed_dir = PROJECT_ROOT / 'data' / 'unprocessed_data'
-    processed_dir = PROJECT_ROOT / 'data' / 'processed_data'
-
-    file_paths = {
-        'sales':  'Store_Sales.xlsx',
-        'stores': 'Store_Type.xlsx',
-        'macro':  'Macro_Factors.xlsx'
-    }
-    output_path = processed_dir / 'master_data.csv'
-
-    try:
-        print("\n[Step 1/5] Loading raw Excel files...")
-        # <<< FIX: Join the directory path with the filename for loading
-        dfs = {name: pd.read_excel(unprocessed_dir / path) for name, path in file_paths.items()}
-        print("   - Success: All raw files loaded.")
-    except FileNotFoundError as e:
-        print(f"❌ ERROR: Raw data file not found. Please check your paths. Details: {e}")
-        return
-
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from data.data_functions.anomaly_detection import INDEX_FILE, META_FILE, build_anomaly_index, update_anomaly_index
+from data.data_functions.dataset_version import VERSION_FILE, dataset_file, publish_version, stage_unchanged, staging_dir
+from data.data_functions.macro_factors import MACRO_FILE, build_macro_factors, write_macro_factors
+from data.data_functions.pipeline_profiler import PipelineProfiler
+from data.data_functions.sampling import SAMPLE_FILE, build_stratified_sample, write_sample
+from data.data_functions.store_summaries import SUMMARY_FILE, build_store_summaries, write_store_summaries
+
+# <<< FIX: Define a robust project root based on this script's location
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# <<< FIX: Define all paths relative to the project root
+UNPROCESSED_DIR = PROJECT_ROOT / 'data' / 'unprocessed_data'
+PROCESSED_DIR = PROJECT_ROOT / 'data' / 'processed_data'
+
+RAW_FILES = {
+    'sales':  'Store_Sales',
+    'stores': 'Store_Type',
+    'macro':  'Macro_Factors'
+}
+# Excel is the format of the delivered extracts; larger (e.g. synthetic benchmark) extracts exceed
+# Excel's row limit and are read from Parquet or CSV instead.
+RAW_READERS = {
+    '.xlsx': pd.read_excel,
+    '.parquet': pd.read_parquet,
+    '.csv': pd.read_csv
+}
+OUTPUT_FILE = 'master_data.csv'
+# Columnar copy of the master dataset, queried in place by the app's DuckDB backend
+PARQUET_FILE = 'master_data.parquet'
+REPORT_FILE = 'pipeline_report.json'
+PROFILE_FILE = 'pipeline_profile.folded'
+PUBLISHED_FILES = [OUTPUT_FILE, PARQUET_FILE, MACRO_FILE, INDEX_FILE, META_FILE, SAMPLE_FILE, SUMMARY_FILE]
+
+
+def load_raw_data(unprocessed_dir: Path = UNPROCESSED_DIR, names=tuple(RAW_FILES)) -> dict:
+    """Loads the sales, store and macro extracts (or just `names`), raising FileNotFoundError if one is missing."""
+    dfs = {}
+    for name in names:
+        stem = RAW_FILES[name]
+        for suffix, reader in RAW_READERS.items():
+            path = unprocessed_dir / f"{stem}{suffix}"
+            if path.exists():
+                dfs[name] = reader(path)
+                break
+        else:
+            raise FileNotFoundError(f"No {stem} file ({', '.join(RAW_READERS)}) in '{unprocessed_dir}'.")
+    return dfs
+
+
+def merge_raw_data(dfs: dict) -> pd.DataFrame:
     # Merge dataframes, left joining to the sales dataset. We do not need to join Holiday because data is represented elsewhere.
-    print("\n[Step 2/5] Merging dataframes...")
-    df = pd.merge(dfs['sales'], dfs['stores'], on='Store', how='left')
-    df = pd.merge(df, dfs['macro'], on=['Store', 'Date', 'IsHoliday'], how='left')
-    print("   - Success: Sales, store, and macro data merged.")
+    # The macro factors are not merged: they stay a per-store table (see macro_factors.py) the app joins as-of on demand.
+    return pd.merge(dfs['sales'], dfs['stores'], on='Store', how='left')
 
+
+def clean_data(df: pd.DataFrame, factors: pd.DataFrame) -> pd.DataFrame:
     # Cleaning data - making sure dates are dates and not strings
-    print("\n[Step 3/5] Cleaning and preprocessing data...")
     df['Date'] = pd.to_datetime(df['Date'])
     df.sort_values(by=['Store', 'Date'], inplace=True)
 
-    # Since CPI and Unemployment come out monthly, fill in missing data by performing a forward fill, then a backward fill to have a better time series
-    df['CPI'] = df.groupby('Store')['CPI'].transform(lambda x: x.ffill().bfill())
-    df['Unemployment'] = df.groupby('Store')['Unemployment'].transform(lambda x: x.ffill().bfill())
+    # Sales weeks without a macro reading for their store are dropped, as they were when the factors were merged in.
+    # The as-of join would otherwise give them an earlier week's reading and change the totals.
+    reported = pd.MultiIndex.from_frame(factors[['Store', 'Date']])
+    has_reading = pd.MultiIndex.from_frame(df[['Store', 'Date']]).isin(reported)
+    if not has_reading.all():
+        print(f"   - Dropped {(~has_reading).sum()} sales rows with no macro factor reading for their store and week.")
+        df.drop(index=df.index[~has_reading], inplace=True)
 
     initial_rows = len(df)
     df.dropna(inplace=True)
     if len(df) < initial_rows:
         print(f"   - Dropped {initial_rows - len(df)} rows with remaining NaN values.")
-    print("   - Success: Data types converted and missing values handled.")
+    return df
 
 
-    print("\n[Step 4/5] Engineering analytical features...")
+def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
     # Create new features for year, month, and ISO Week of Year
     df['Year'] = df['Date'].dt.year
     df['Month'] = df['Date'].dt.month
@@ -61,21 +91,164 @@ def prepare_master_data():
     # Create a new feature in the dataframe to show sales per square foot (Assuming size is square feet)
     df['Sales_per_sq_ft'] = df['Weekly_Sales'] / df['Size']
     df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    df['Sales_per_sq_ft'].fillna(0, inplace=True)
+    df['Sales_per_sq_ft'] = df['Sales_per_sq_ft'].fillna(0)
 
     # Create a new feature in the dataframe that indicates whether next week is a holiday
     holiday_shift = df.groupby('Store')['IsHoliday'].shift(-1)
-    df['Is_Week_Before_Holiday'] = holiday_shift.fillna(False).astype(bool)
-    print("   - Success: Time-based, performance, and holiday-proximity features created.")
+    df['Is_Week_Before_Holiday'] = holiday_shift.astype('boolean').fillna(False).astype(bool)
+    return df
+
 
-    # Save final dataset
-    print(f"\n[Step 5/5] Saving final dataset to '{output_path}'...")
+def save_master_data(df: pd.DataFrame, processed_dir: Path = PROCESSED_DIR) -> Path:
+    output_path = processed_dir / OUTPUT_FILE
     processed_dir.mkdir(parents=True, exist_ok=True)
     df.to_csv(output_path, index=False)
+    df.to_parquet(processed_dir / PARQUET_FILE, index=False)
+    return output_path
+
+
+def _print_step_stats(stats: dict):
+    line = f"   - {stats['seconds']:.2f}s, peak RSS {stats['peak_rss_mb']} MB"
+    if 'rows' in stats:
+        dtype_memory = ", ".join(f"{dtype} {mb:,.1f}" for dtype, mb in stats['memory_by_dtype_mb'].items())
+        line += f" | {stats['rows']:,} rows x {stats['columns']} cols, {stats['memory_mb']:,.1f} MB ({dtype_memory})"
+    print(line)
 
+
+def prepare_master_data(unprocessed_dir: Path = UNPROCESSED_DIR, processed_dir: Path = PROCESSED_DIR, profile: bool = False):
+    """
+    Runs the pipeline and writes `pipeline_report.json` next to the output, with wall time, peak RSS,
+    shape and dtype memory per step. With `profile=True` the steps are also stack-sampled and the
+    samples written to `pipeline_profile.folded`.
+    """
+    print("🚀 Starting the master data preparation pipeline...")
+    profiler = PipelineProfiler(sample_stacks=profile)
+
+    try:
+        print("\n[Step 1/8] Loading raw data files...")
+        with profiler.step('load'):
+            dfs = load_raw_data(unprocessed_dir)
+        print("   - Success: All raw files loaded.")
+    except FileNotFoundError as e:
+        print(f"❌ ERROR: Raw data file not found. Please check your paths. Details: {e}")
+        profiler.finish(processed_dir / REPORT_FILE)
+        return
+    profiler.record_frames('load', dfs)
+    _print_step_stats(profiler.steps['load'])
+
+    print("\n[Step 2/8] Merging dataframes...")
+    with profiler.step('merge'):
+        df = merge_raw_data(dfs)
+        factors = build_macro_factors(dfs['macro'])
+    profiler.record_frames('merge', df)
+    print(f"   - Success: Sales and store data merged; macro factors kept as a {len(factors)}-row per-store table.")
+    _print_step_stats(profiler.steps['merge'])
+    del dfs
+
+    print("\n[Step 3/8] Cleaning and preprocessing data...")
+    with profiler.step('clean'):
+        df = clean_data(df, factors)
+    profiler.record_frames('clean', df)
+    print("   - Success: Data types converted and missing values handled.")
+    _print_step_stats(profiler.steps['clean'])
+
+    print("\n[Step 4/8] Engineering analytical features...")
+    with profiler.step('features'):
+        df = engineer_features(df)
+    profiler.record_frames('features', df)
+    print("   - Success: Time-based, performance, and holiday-proximity features created.")
+    _print_step_stats(profiler.steps['features'])
+
+    # Every output is written to a staging directory first, and published as a new version once complete
+    with staging_dir(processed_dir) as output_dir:
+        print(f"\n[Step 5/8] Saving final dataset as '{OUTPUT_FILE}'...")
+        with profiler.step('save'):
+            save_master_data(df, output_dir)
+            write_macro_factors(factors, output_dir)
+        print(f"   - Success: Also written as '{PARQUET_FILE}' for the DuckDB query backend, with the macro factors in '{MACRO_FILE}'.")
+        _print_step_stats(profiler.steps['save'])
+
+        # Score every store-week against its trailing baseline so the app can look up flagged weeks instantly.
+        # Weeks the published index already covers keep their scores, unless their sales have been revised.
+        print("\n[Step 6/8] Scoring store-weeks for sales anomalies...")
+        with profiler.step('anomalies'):
+            previous_meta = dataset_file(processed_dir, None, META_FILE)
+            if previous_meta is not None:
+                anomaly_index = update_anomaly_index(df, output_dir, previous_meta.parent)
+            else:
+                anomaly_index = build_anomaly_index(df, output_dir)
+        print(f"   - Success: {len(anomaly_index)} anomalous store-weeks flagged.")
+        _print_step_stats(profiler.steps['anomalies'])
+
+        # A stratified sample (a tenth of each store's rows, capped) answers the approximate-mode views without the full dataset
+        print("\n[Step 7/8] Drawing the stratified sample for approximate mode...")
+        with profiler.step('sample'):
+            sample = build_stratified_sample(df)
+            write_sample(sample, output_dir)
+        profiler.record_frames('sample', sample)
+        print(f"   - Success: {len(sample)} rows sampled across {sample['Store'].nunique()} stores.")
+        _print_step_stats(profiler.steps['sample'])
+
+        # Per-store summaries, read one store at a time by the drill-down page
+        print("\n[Step 8/8] Summarizing each store for the drill-down page...")
+        with profiler.step('store_summaries'):
+            summaries = build_store_summaries(df, factors)
+            write_store_summaries(summaries, output_dir)
+        print(f"   - Success: {len(summaries)} store summaries written to '{SUMMARY_FILE}'.")
+        _print_step_stats(profiler.steps['store_summaries'])
+
+        # Published last: running apps switch to the new output only once all of it is written
+        with profiler.step('publish'):
+            manifest = publish_version(processed_dir, output_dir, PUBLISHED_FILES)
+
+    report = profiler.finish(processed_dir / REPORT_FILE, processed_dir / PROFILE_FILE if profile else None)
     print("\n✅ Pipeline complete! `master_data.csv` is now ready for the application.")
     print(f"   - Final dataset has {len(df)} rows and {len(df.columns)} columns.")
+    print(f"   - Published as dataset version {manifest['version']} in '{processed_dir / manifest['path']}' (named by '{VERSION_FILE}');"
+          " running apps switch to it once it is warmed up.")
+    print(f"   - Step report written to '{processed_dir / REPORT_FILE}' ({report['total_seconds']:.1f}s, peak RSS {report['peak_rss_mb']} MB).")
+    if profile:
+        print(f"   - Sampling profile written to '{processed_dir / PROFILE_FILE}' (folded stacks for flamegraph.pl or speedscope).")
+    return report
+
+
+def update_macro_factors(unprocessed_dir: Path = UNPROCESSED_DIR, processed_dir: Path = PROCESSED_DIR):
+    """
+    Rewrites only the macro factor table from a new macro extract, plus the store summaries that
+    include the factors, and publishes the result. The sales data is left as it is.
+    """
+    print("🚀 Updating the macro factors...")
+    try:
+        macro_df = load_raw_data(unprocessed_dir, names=['macro'])['macro']
+    except FileNotFoundError as e:
+        print(f"❌ ERROR: Raw data file not found. Please check your paths. Details: {e}")
+        return
+    master_path = dataset_file(processed_dir, None, PARQUET_FILE)
+    if master_path is None:
+        print(f"❌ ERROR: No published '{PARQUET_FILE}' in '{processed_dir}'. Run the full pipeline first.")
+        return
 
+    factors = build_macro_factors(macro_df)
+    with staging_dir(processed_dir) as output_dir:
+        # The sales data, anomaly index and sample carry over unchanged into the new version
+        stage_unchanged(processed_dir, None, output_dir, [OUTPUT_FILE, PARQUET_FILE, INDEX_FILE, META_FILE, SAMPLE_FILE])
+        write_macro_factors(factors, output_dir)
+        print(f"   - Success: {len(factors)} rows written to '{MACRO_FILE}'.")
+        summaries = build_store_summaries(pd.read_parquet(master_path), factors)
+        write_store_summaries(summaries, output_dir)
+        print(f"   - Success: {len(summaries)} store summaries rewritten.")
+        manifest = publish_version(processed_dir, output_dir, PUBLISHED_FILES)
+    print(f"\n✅ Macro factors updated and published as dataset version {manifest['version']}.")
 
 if __name__ == "__main__":
-    prepare_master_data()
+    parser = argparse.ArgumentParser(description="Build master_data.csv from the raw extracts.")
+    parser.add_argument("--unprocessed-dir", type=Path, default=UNPROCESSED_DIR, help="Directory with the raw extracts.")
+    parser.add_argument("--processed-dir", type=Path, default=PROCESSED_DIR, help="Output directory.")
+    parser.add_argument("--profile", action="store_true", help="Also capture a sampling profile of each step.")
+    parser.add_argument("--macro-only", action="store_true",
+                        help="Only reload the macro factor extract; the processed sales data is kept.")
+    args = parser.parse_args()
+    if args.macro_only:
+        update_macro_factors(args.unprocessed_dir, args.processed_dir)
+    else:
+        prepare_master_data(args.unprocessed_dir, args.processed_dir, profile=args.profile)
@@ -0,0 +1,51 @@
+# data/data_functions/sampling.py
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Strata for the approximate-mode sample. Store formats nest stores, so every store is its own stratum
+# and every format is covered by its stores.
+STRATA = ['Type', 'Store']
+# Rows kept per store: a fraction of the store's rows, at least enough for a variance estimate and at most
+# a fixed cap. The cap keeps the sample, and approximate-mode latency, bounded however much history the
+# master dataset accumulates; the fraction keeps small stores from being sampled almost whole.
+SAMPLE_FRACTION = 0.1
+MIN_ROWS_PER_STORE = 30
+SAMPLE_ROWS_PER_STORE = 1500
+SAMPLE_SEED = 7
+
+SAMPLE_FILE = 'master_sample.csv'
+WEIGHT_COLUMN = 'Sample_Weight'
+# Only the columns the approximate views (app/analytics/approximate.py) and the sidebar filters read
+SAMPLE_COLUMNS = ['Store', 'Type', 'Size', 'Date', 'Month', 'WeekOfYear', 'IsHoliday', 'Weekly_Sales', WEIGHT_COLUMN]
+
+
+def build_stratified_sample(df: pd.DataFrame, fraction: float = SAMPLE_FRACTION, rows_per_store: int = SAMPLE_ROWS_PER_STORE,
+                            seed: int = SAMPLE_SEED) -> pd.DataFrame:
+    """
+    Simple random sample of `fraction` of the rows of every (Type, Store) stratum, rounded up, and
+    between `MIN_ROWS_PER_STORE` and `rows_per_store` rows.
+
+    Each row carries `Sample_Weight` = stratum rows / sampled rows, the number of master rows it
+    stands for. Stores with fewer rows than their budget are kept whole (weight 1).
+    """
+    rng = np.random.default_rng(seed)
+    strata = [df[col] for col in STRATA]
+    # A random key per row; the smallest keys of a stratum, up to its budget, form its sample
+    keys = pd.Series(rng.random(len(df)), index=df.index)
+    rank = keys.groupby(strata).rank(method='first')
+    stratum_size = keys.groupby(strata).transform('size')
+    budget = np.clip(np.ceil(fraction * stratum_size), MIN_ROWS_PER_STORE, rows_per_store)
+    sample = df.loc[rank <= budget, [col for col in SAMPLE_COLUMNS if col != WEIGHT_COLUMN]]
+
+    stratum_rows = df.groupby(STRATA).size().rename('N')
+    sample_rows = sample.groupby(STRATA).size().rename('n')
+    weights = (stratum_rows / sample_rows).rename(WEIGHT_COLUMN)
+    return sample.join(weights, on=STRATA).sort_values(['Store', 'Date']).reset_index(drop=True)
+
+
+def write_sample(sample: pd.DataFrame, processed_dir: Path) -> Path:
+    output_path = processed_dir / SAMPLE_FILE
+    sample.to_csv(output_path, index=False)
+    return output_path
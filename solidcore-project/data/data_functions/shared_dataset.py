@@ -0,0 +1,178 @@
+# data/data_functions/shared_dataset.py
+#
+# Shared-memory mode, for running several Streamlit server processes on one machine. One loader process
+# (this script) publishes each dataset version as uncompressed Arrow IPC files: the master dataset sorted
+# by store and date, its filter index (each store's rows, read by the pandas backend in app/analytics/query.py) and the macro factor
+# table. Server processes started with SOLIDCORE_QUERY_BACKEND=shared memory-map those files and read the
+# columns in place, so the operating system keeps one copy of the pages for all of them: adding servers
+# adds CPU capacity, not resident copies of the dataset. Point SOLIDCORE_SHARED_DIR at a tmpfs directory
+# (e.g. /dev/shm/solidcore) to keep the files in memory rather than on disk.
+#
+# Each version's files are written under new names, then `current.json` is replaced in one step to name
+# them. Servers switch once they have warmed the new version (app/utils/data_versions.py); files mapped by
+# a server stay readable after they are superseded, and the last few versions are kept on disk.
+#
+# Usage (from the project root):
+#   python data/data_functions/shared_dataset.py           # publish the processed dataset's current version
+#   python data/data_functions/shared_dataset.py --watch   # ... and every version the pipeline publishes after it
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from data.data_functions.dataset_version import current_version, dataset_file
+from data.data_functions.macro_factors import MACRO_FILE
+
+POINTER_FILE = 'current.json'
+MASTER_PARQUET = 'master_data.parquet'
+VERSIONS_KEPT = 2  # The current version and the one before it, which servers may still be attaching to
+POLL_SECONDS = 10
+# Strings stay Arrow-backed, so they are read in place like the numeric columns instead of copied into objects
+_ZERO_COPY_TYPES = {pa.string(): pd.ArrowDtype(pa.string())}
+
+
+def build_store_index(master_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The filter index of a master frame sorted by store and date: each store's format and its rows'
+    [Start, Stop) positions. Within a store's rows, a date range is found by binary search.
+    """
+    stores = master_df['Store'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, stores[1:] != stores[:-1]]) if len(stores) else np.empty(0, dtype=np.int64)
+    if not (np.diff(stores[starts]) > 0).all():
+        raise ValueError("The master data must be sorted by store (then date) to be indexed.")
+    return pd.DataFrame({
+        'Store': stores[starts],
+        'Type': master_df['Type'].to_numpy()[starts],
+        'Start': starts,
+        'Stop': np.r_[starts[1:], len(stores)].astype(np.int64)
+    })
+
+
+def _write_arrow(table: pa.Table, path: Path):
+    # One record batch per file, so every column maps to a single contiguous buffer
+    partial_path = path.with_name(path.name + '.part')
+    with pa.OSFile(str(partial_path), 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table.combine_chunks(), max_chunksize=max(len(table), 1))
+    os.replace(partial_path, path)
+
+
+def read_pointer(shared_dir: Path) -> dict | None:
+    try:
+        return json.loads((shared_dir / POINTER_FILE).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _published_files(pointer: dict) -> dict:
+    """{version: {name: file name}} of the current version and the older ones still kept."""
+    return {entry['version']: entry['files'] for entry in [pointer, *pointer.get('history', [])]}
+
+
+def shared_version(shared_dir: Path) -> str | None:
+    """The version `current.json` names, which shared-mode servers switch to."""
+    pointer = read_pointer(shared_dir)
+    return None if pointer is None else pointer['version']
+
+
+def publish_shared_dataset(processed_dir: Path, shared_dir: Path) -> dict | None:
+    """
+    Publishes the processed dataset's current version to `shared_dir`, if it is not there already.
+    Returns the new pointer, or None when there is nothing (new) to publish.
+    """
+    version = current_version(processed_dir)
+    previous = read_pointer(shared_dir)
+    if version is None or (previous is not None and previous['version'] == version):
+        return None
+
+    # A published version's files are never rewritten, so they are read as they are
+    master_path = dataset_file(processed_dir, version, MASTER_PARQUET)
+    if master_path is None:
+        return None
+    tables = {'master': pq.read_table(master_path).sort_by([('Store', 'ascending'), ('Date', 'ascending')])}
+    tables['store_index'] = pa.Table.from_pandas(
+        build_store_index(tables['master'].select(['Store', 'Type']).to_pandas()), preserve_index=False
+    )
+    factors_path = dataset_file(processed_dir, version, MACRO_FILE)
+    if factors_path is not None:
+        # Sorted by date, as the as-of joins need it
+        tables['factors'] = pq.read_table(factors_path).sort_by('Date')
+
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    files = {name: f"{name}_{version}.arrow" for name in tables}
+    for name, table in tables.items():
+        _write_arrow(table, shared_dir / files[name])
+    pointer = {
+        'version': version,
+        'published_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        'files': files,
+        # The versions kept on disk, with their files, newest first
+        'history': ([{'version': previous['version'], 'files': previous['files']}] + previous.get('history', []))[
+            :VERSIONS_KEPT - 1
+        ] if previous else []
+    }
+    partial_path = shared_dir / (POINTER_FILE + '.part')
+    partial_path.write_text(json.dumps(pointer, indent=2))
+    os.replace(partial_path, shared_dir / POINTER_FILE)
+
+    # Unlinking a file does not unmap it: servers still on an older version keep reading it
+    kept = {file_name for files in _published_files(pointer).values() for file_name in files.values()}
+    for path in shared_dir.glob('*.arrow'):
+        if path.name not in kept:
+            path.unlink(missing_ok=True)
+    return pointer
+
+
+def attach_shared_dataset(shared_dir: Path, version: str) -> dict | None:
+    """
+    {'master', 'store_index', 'factors'} frames of a published version, memory-mapped rather than read:
+    numeric, date and string columns point into the mapped file. None if the version is not published.
+    Boolean columns are copied (Arrow packs them into bits), and `factors` is None if none was published.
+    """
+    pointer = read_pointer(shared_dir)
+    files = _published_files(pointer).get(version) if pointer is not None else None
+    if files is None:
+        return None
+    frames = {}
+    for name in ('master', 'store_index', 'factors'):
+        path = shared_dir / files[name] if name in files else None
+        if path is None or not path.exists():
+            if name == 'factors':
+                frames[name] = None
+                continue
+            return None
+        # The frame's buffers keep the mapping alive after `source` is gone
+        with pa.memory_map(str(path), 'r') as source:
+            table = ipc.open_file(source).read_all()
+        frames[name] = table.to_pandas(split_blocks=True, types_mapper=_ZERO_COPY_TYPES.get)
+    return frames
+
+
+if __name__ == "__main__":
+    default_processed_dir = Path(__file__).resolve().parent.parent / 'processed_data'
+    parser = argparse.ArgumentParser(description="Publish the processed dataset for shared-memory server processes.")
+    parser.add_argument("--processed-dir", type=Path, default=default_processed_dir, help="The pipeline's output directory.")
+    parser.add_argument("--shared-dir", type=Path,
+                        default=Path(os.environ.get("SOLIDCORE_SHARED_DIR", default_processed_dir / 'shared')),
+                        help="Where to publish (default: $SOLIDCORE_SHARED_DIR, or processed_data/shared).")
+    parser.add_argument("--watch", action="store_true", help=f"Keep publishing new versions (checks every {POLL_SECONDS}s).")
+    args = parser.parse_args()
+
+    while True:
+        published = publish_shared_dataset(args.processed_dir, args.shared_dir)
+        if published is not None:
+            print(f"✅ Published dataset version {published['version']} to '{args.shared_dir}'.")
+        elif not args.watch:
+            print(f"ℹ️ Nothing new to publish; '{args.shared_dir / POINTER_FILE}' names version {shared_version(args.shared_dir)}.")
+        if not args.watch:
+            break
+        time.sleep(POLL_SECONDS)
@@ -0,0 +1,61 @@
+# data/data_functions/store_segments.py
+#
+# K-means segmentation of stores on size and average weekly sales. The segmentation page clusters the
+# stores of the user's selection (app/analytics/segmentation.py); the store summaries record each store's
+# segment from clustering the whole chain (data/data_functions/store_summaries.py).
+
+import numpy as np
+import pandas as pd
+
+SEGMENT_FEATURES = ['Size', 'Avg_Weekly_Sales']
+
+
+def cluster_store_aggregates(store_agg: pd.DataFrame, k: int):
+    """
+    Clusters one row per store on `SEGMENT_FEATURES`.
+
+    Returns:
+        tuple: `store_agg` with a 'Cluster' column, and the centroids in original units
+               (None, and no 'Cluster' column, when there are fewer stores than clusters).
+    """
+    if len(store_agg) < k:
+        return store_agg, None
+
+    # scikit-learn is only imported when clustering actually runs, keeping it off the page's cold start
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    scaled_features = scaler.fit_transform(store_agg[SEGMENT_FEATURES])
+
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+    store_agg['Cluster'] = kmeans.fit_predict(scaled_features)
+    centroids = scaler.inverse_transform(kmeans.cluster_centers_)
+    return store_agg, centroids
+
+
+def assign_cluster_labels(centroids: np.ndarray) -> dict:
+    """Assigns descriptive labels to clusters based on their centroid values."""
+    if centroids is None:
+        return {}
+        
+    median_size = np.median(centroids[:, 0])
+    median_sales = np.median(centroids[:, 1])
+    
+    labels = {}
+    for i, (size, sales) in enumerate(centroids):
+        size_label = "Large" if size >= median_size else "Small"
+        sales_label = "High-Performing" if sales >= median_sales else "Under-Performing"
+        
+        if size_label == "Large" and sales_label == "High-Performing":
+            label = "🏆 Large High-Performers"
+        elif size_label == "Small" and sales_label == "High-Performing":
+            label = "🚀 Efficient Powerhouses"
+        elif size_label == "Large" and sales_label == "Under-Performing":
+            label = "⚠️ Flagging Giants"
+        else: # Small and Under-Performing
+            label = "⚠️ Flagging Small Stores"
+        
+        labels[i] = f"Segment {i}: {label}"
+        
+    return labels
@@ -0,0 +1,180 @@
+# data/data_functions/store_summaries.py
+
+import calendar
+import json
+import mmap
+import struct
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from data.data_functions.macro_factors import ECONOMIC_FACTORS, attach_factors
+from data.data_functions.store_segments import assign_cluster_labels, cluster_store_aggregates
+
+# One summary per store, for the drill-down page. The file is a fixed header, a slot table with one
+# (offset, length) entry per store ID, and the stores' summaries as UTF-8 JSON. Opening a store reads
+# its slot (at a position computed from the store ID) and then its summary, so the cost of opening
+# a store does not depend on how many stores the file holds.
+SUMMARY_FILE = 'store_summaries.bin'
+MAGIC = b'SCSTORE1'
+HEADER = struct.Struct('<8sQ')  # magic, number of slots (highest store ID + 1)
+SLOT = struct.Struct('<QQ')  # payload offset, payload length (0: no such store)
+
+# The segmentation page's default; every store's membership is from clustering the whole chain
+SEGMENTS = 4
+FORECAST_WINDOW = 4
+
+
+def _columns(df: pd.DataFrame) -> dict:
+    # Column-oriented lists are more compact than records, and load straight back into a DataFrame
+    return {column: df[column].tolist() for column in df.columns}
+
+
+def _store_weeks(df: pd.DataFrame, factors: pd.DataFrame) -> pd.DataFrame:
+    """Store-week totals (departments summed) with the week's holiday flag and economic factors."""
+    weeks = df.groupby(['Store', 'Date']).agg(
+        Weekly_Sales=('Weekly_Sales', 'sum'),
+        IsHoliday=('IsHoliday', 'max')
+    ).reset_index()
+    weeks = attach_factors(weeks, factors.sort_values('Date', kind='stable'), ECONOMIC_FACTORS)
+    weeks['Forecast'] = weeks.groupby('Store')['Weekly_Sales'].transform(
+        lambda sales: sales.rolling(FORECAST_WINDOW, min_periods=1).mean().shift(1)
+    )
+    return weeks
+
+
+def _factor_correlations(weeks: pd.DataFrame) -> pd.DataFrame:
+    """Per-store correlation of weekly sales with each economic factor (Store x factor)."""
+    correlations = weeks.groupby('Store')[['Weekly_Sales'] + ECONOMIC_FACTORS].corr()
+    return correlations.xs('Weekly_Sales', level=1)[ECONOMIC_FACTORS]
+
+
+def _segments(df: pd.DataFrame) -> pd.DataFrame:
+    store_agg = df.groupby('Store').agg(Size=('Size', 'first'), Avg_Weekly_Sales=('Weekly_Sales', 'mean')).reset_index()
+    clustered, centroids = cluster_store_aggregates(store_agg, SEGMENTS)
+    if centroids is None:
+        return pd.DataFrame(columns=['Cluster', 'Segment'])
+    clustered['Segment'] = clustered['Cluster'].map(assign_cluster_labels(centroids))
+    return clustered.set_index('Store')[['Cluster', 'Segment']]
+
+
+def build_store_summaries(df: pd.DataFrame, factors: pd.DataFrame) -> dict:
+    """
+    {store: summary} for every store: profile and rank, weekly trend with a moving-average forecast,
+    seasonality by month and week, holiday uplift, economic sensitivity and segment membership.
+    `factors` is the macro factor table, joined onto the store-weeks.
+
+    Seasonality and holiday averages are per row (department-week), as on the chain-wide views;
+    trend and factor correlations are on the store's weekly totals.
+    """
+    weeks = _store_weeks(df, factors)
+    correlations = _factor_correlations(weeks)
+    segments = _segments(df)
+    profiles = df.groupby('Store').agg(
+        Type=('Type', 'first'),
+        Size=('Size', 'first'),
+        Sales_per_sq_ft=('Sales_per_sq_ft', 'mean')
+    )
+    totals = weeks.groupby('Store')['Weekly_Sales'].agg(['sum', 'mean', 'size'])
+    ranks = totals['sum'].rank(ascending=False, method='min').astype(int)
+    monthly = df.groupby(['Store', 'Month'])['Weekly_Sales'].mean()
+    weekly = df.groupby(['Store', 'WeekOfYear'])['Weekly_Sales'].mean()
+    by_holiday = df.groupby(['Store', 'IsHoliday'])['Weekly_Sales'].mean().unstack('IsHoliday')
+
+    weeks['Date'] = weeks['Date'].dt.strftime('%Y-%m-%d')
+    weeks_by_store = dict(list(weeks.groupby('Store')[['Date', 'Weekly_Sales', 'Forecast', 'IsHoliday']]))
+    summaries = {}
+    for store, profile in profiles.iterrows():
+        store_weeks = weeks_by_store[store]
+        store_monthly = monthly.loc[store].reset_index()
+        store_monthly['MonthName'] = store_monthly['Month'].apply(lambda m: calendar.month_abbr[m])
+
+        holiday = None
+        holiday_avg, non_holiday_avg = by_holiday.loc[store].get(True), by_holiday.loc[store].get(False)
+        if pd.notna(holiday_avg) and pd.notna(non_holiday_avg):
+            holiday = {
+                'holiday_avg': holiday_avg,
+                'non_holiday_avg': non_holiday_avg,
+                'delta_pct': ((holiday_avg - non_holiday_avg) / non_holiday_avg) * 100
+            }
+
+        summaries[int(store)] = {
+            'store': int(store),
+            'type': profile['Type'],
+            'size': int(profile['Size']),
+            'start': store_weeks['Date'].iloc[0],
+            'end': store_weeks['Date'].iloc[-1],
+            'weeks': int(totals.loc[store, 'size']),
+            'total_sales': totals.loc[store, 'sum'],
+            'avg_weekly_sales': totals.loc[store, 'mean'],
+            'sales_per_sq_ft': profile['Sales_per_sq_ft'],
+            'sales_rank': int(ranks.loc[store]),
+            'num_stores': len(profiles),
+            'trend': _columns(store_weeks),
+            'monthly': _columns(store_monthly),
+            'weekly': _columns(weekly.loc[store].reset_index()),
+            'holiday': holiday,
+            'economic': correlations.loc[store].to_dict(),
+            'segment': segments.loc[store].to_dict() if store in segments.index else None
+        }
+    return summaries
+
+
+def write_store_summaries(summaries: dict, processed_dir: Path) -> Path:
+    """Writes the summaries with their slot table; the file is replaced in one step when complete."""
+    output_path = processed_dir / SUMMARY_FILE
+    partial_path = output_path.with_name(output_path.name + '.part')
+    if min(summaries, default=0) < 0:
+        raise ValueError("Store IDs must be non-negative to index the store summaries file.")
+    slots = max(summaries, default=-1) + 1
+
+    payloads = {store: json.dumps(summary, default=_json_default).encode() for store, summary in summaries.items()}
+    table = bytearray(SLOT.size * slots)
+    offset = HEADER.size + len(table)
+    for store in sorted(payloads):
+        SLOT.pack_into(table, SLOT.size * store, offset, len(payloads[store]))
+        offset += len(payloads[store])
+
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    with open(partial_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, slots))
+        f.write(table)
+        for store in sorted(payloads):
+            f.write(payloads[store])
+    partial_path.replace(output_path)
+    return output_path
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class StoreSummaries:
+    """Read-only, memory-mapped view of `store_summaries.bin`; `get(store)` reads one store's summary."""
+
+    def __init__(self, path: Path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slots = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a store summaries file.")
+
+    def stores(self) -> list:
+        """The store IDs in the file, from a scan of the slot table."""
+        table = np.frombuffer(self._map, dtype='<u8', count=2 * self.slots, offset=HEADER.size).reshape(-1, 2)
+        return np.flatnonzero(table[:, 1]).tolist()
+
+    def get(self, store: int) -> dict | None:
+        """The store's summary, or None for an unknown store."""
+        if not 0 <= store < self.slots:
+            return None
+        offset, length = SLOT.unpack_from(self._map, HEADER.size + SLOT.size * store)
+        if length == 0:
+            return None
+        return json.loads(self._map[offset:offset + length])
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,155 @@
+# data/data_functions/synthetic_data.py
+#
+# Synthetic Store_Sales / Store_Type / Macro_Factors extracts at configurable scale, for benchmarks and
+# load tests. The shapes and dtypes match the delivered Excel files, and the sales carry the same
+# broad structure as the real data: format-driven store sizes, a Q4 peak with Thanksgiving and
+# Christmas spikes, holiday-week uplift, and monthly CPI / unemployment releases.
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from data.data_functions.prepare_master_data import RAW_FILES
+
+START_DATE = '2010-02-05'  # First week-ending Friday of the delivered extract
+WEEKS_PER_YEAR = 52
+
+# Store formats: share of stores, typical size (sq. ft.) and typical weekly sales per department
+STORE_FORMATS = {
+    'A': {'share': 0.51, 'size': 180_000, 'dept_sales': 25_000},
+    'B': {'share': 0.38, 'size': 110_000, 'dept_sales': 12_000},
+    'C': {'share': 0.11, 'size': 40_000, 'dept_sales': 9_000},
+}
+
+
+def _holiday_weeks(dates: pd.DatetimeIndex) -> np.ndarray:
+    """Flags the week-ending Fridays whose week contains Super Bowl, Labor Day, Thanksgiving or Christmas."""
+    years = range(dates.min().year, dates.max().year + 1)
+    holidays = []
+    for year in years:
+        holidays += [
+            pd.Timestamp(year, 2, 1) + pd.offsets.Week(n=0, weekday=6) + pd.offsets.Week(),  # Super Bowl: 2nd Sunday of Feb
+            pd.Timestamp(year, 9, 1) + pd.offsets.Week(n=0, weekday=0),  # Labor Day: 1st Monday of Sep
+            pd.Timestamp(year, 11, 1) + pd.offsets.Week(n=0, weekday=3) + pd.offsets.Week(3),  # Thanksgiving: 4th Thursday of Nov
+            pd.Timestamp(year, 12, 25),
+        ]
+    week_start = dates - pd.Timedelta(days=6)
+    flags = np.zeros(len(dates), dtype=bool)
+    for holiday in holidays:
+        flags |= (week_start <= holiday) & (holiday <= dates)
+    return flags
+
+
+def _seasonal_multiplier(dates: pd.DatetimeIndex, is_holiday: np.ndarray) -> np.ndarray:
+    week = dates.isocalendar().week.to_numpy().astype(float)
+    annual = 1 + 0.06 * np.sin(2 * np.pi * (week - 10) / WEEKS_PER_YEAR)
+    black_friday = np.where(week == 47, 1.45, 1.0)
+    christmas_run_up = np.where(week == 50, 1.25, 1.0) * np.where(week == 51, 1.70, 1.0)
+    post_holiday_dip = np.where(week == 1, 0.85, 1.0)
+    holiday_uplift = np.where(is_holiday, 1.07, 1.0)
+    return annual * black_friday * christmas_run_up * post_holiday_dip * holiday_uplift
+
+
+def generate_retail_data(n_stores: int = 45, n_years: int = 3, n_depts: int = 81, seed: int = 42) -> dict:
+    """
+    Builds synthetic raw extracts in the shape the pipeline expects.
+
+    Args:
+        n_stores (int): Number of stores (the delivered data has 45).
+        n_years (int): Years of weekly history (the delivered data has ~3).
+        n_depts (int): Departments per store (the delivered data has up to 81).
+        seed (int): Random seed; the same arguments always produce the same data.
+
+    Returns:
+        dict: 'sales' (Store, Dept, Date, Weekly_Sales, IsHoliday), 'stores' (Store, Type, Size) and
+              'macro' (Store, Date, Temperature, Fuel_Price, CPI, Unemployment, IsHoliday) frames.
+    """
+    rng = np.random.default_rng(seed)
+    n_weeks = n_years * WEEKS_PER_YEAR
+    dates = pd.date_range(START_DATE, periods=n_weeks, freq='7D')
+    is_holiday = _holiday_weeks(dates)
+    stores = np.arange(1, n_stores + 1)
+
+    # --- Stores ---
+    formats = list(STORE_FORMATS)
+    store_type = rng.choice(formats, size=n_stores, p=[STORE_FORMATS[f]['share'] for f in formats])
+    typical_size = np.array([STORE_FORMATS[t]['size'] for t in store_type])
+    size = (typical_size * rng.lognormal(0, 0.2, n_stores)).astype(np.int64)
+    stores_df = pd.DataFrame({'Store': stores, 'Type': store_type, 'Size': size})
+
+    # --- Macro factors (per store-week) ---
+    latitude = rng.uniform(0, 1, n_stores)[:, None]
+    day_of_year = dates.dayofyear.to_numpy()[None, :]
+    temperature = 60 - 25 * latitude * np.cos(2 * np.pi * (day_of_year - 15) / 365) + rng.normal(0, 5, (n_stores, n_weeks))
+    national_fuel = 2.6 + np.cumsum(rng.normal(0.005, 0.04, n_weeks))
+    fuel_price = national_fuel[None, :] + rng.normal(0, 0.08, (n_stores, 1))
+    # CPI and unemployment are monthly releases: constant within a month, stepping between months
+    month_index = ((dates.year - dates.year[0]) * 12 + dates.month - dates.month[0]).to_numpy()
+    n_months = month_index.max() + 1
+    cpi_monthly = rng.uniform(126, 215, (n_stores, 1)) * np.cumprod(1 + rng.normal(0.0015, 0.001, (n_stores, n_months)), axis=1)
+    unemployment_monthly = np.clip(
+        rng.uniform(4, 12, (n_stores, 1)) + np.cumsum(rng.normal(-0.02, 0.08, (n_stores, n_months)), axis=1), 3, 15
+    )
+    cpi = cpi_monthly[:, month_index]
+    unemployment = unemployment_monthly[:, month_index]
+    # Like the delivered extract, the most recent releases are not published yet
+    unpublished = dates >= dates[-1] - pd.Timedelta(weeks=12)
+    cpi[:, unpublished] = np.nan
+    unemployment[:, unpublished] = np.nan
+
+    macro_df = pd.DataFrame({
+        'Store': np.repeat(stores, n_weeks),
+        'Date': np.tile(dates, n_stores),
+        'Temperature': temperature.ravel().round(2),
+        'Fuel_Price': fuel_price.ravel().round(3),
+        'CPI': cpi.ravel(),
+        'Unemployment': unemployment.ravel().round(3),
+        'IsHoliday': np.tile(is_holiday, n_stores)
+    })
+
+    # --- Weekly sales (per store-department-week) ---
+    store_level = np.array([STORE_FORMATS[t]['dept_sales'] for t in store_type]) * (size / typical_size)
+    store_level *= rng.lognormal(0, 0.25, n_stores)
+    dept_share = rng.lognormal(0, 1.0, n_depts)
+    trend = 1 + rng.normal(0.01, 0.03, n_stores)[:, None] * np.arange(n_weeks)[None, :] / WEEKS_PER_YEAR
+    seasonal = _seasonal_multiplier(dates, is_holiday)[None, :]
+    # Mild sensitivity to the local economy so the what-if and correlation views have something to find
+    economy = 1 - 0.01 * (unemployment_monthly[:, month_index] - unemployment_monthly.mean()) - 0.02 * (fuel_price - national_fuel.mean())
+    store_week = (store_level[:, None] * trend * seasonal * economy).astype(np.float32)
+
+    # Build the (stores x depts x weeks) cube one block of stores at a time to bound peak memory
+    sales_blocks = []
+    block_size = max(1, 2_000_000 // max(1, n_depts * n_weeks))
+    for start in range(0, n_stores, block_size):
+        block = slice(start, start + block_size)
+        n_block = len(stores[block])
+        noise = rng.lognormal(0, 0.15, (n_block, n_depts, n_weeks)).astype(np.float32)
+        cube = store_week[block][:, None, :] * dept_share[None, :, None].astype(np.float32) * noise
+        sales_blocks.append(pd.DataFrame({
+            'Store': np.repeat(stores[block], n_depts * n_weeks),
+            'Dept': np.tile(np.repeat(np.arange(1, n_depts + 1), n_weeks), n_block),
+            'Date': np.tile(dates, n_block * n_depts),
+            'Weekly_Sales': cube.ravel().astype(np.float64).round(2),
+            'IsHoliday': np.tile(is_holiday, n_block * n_depts)
+        }))
+    sales_df = pd.concat(sales_blocks, ignore_index=True)
+
+    return {'sales': sales_df, 'stores': stores_df, 'macro': macro_df}
+
+
+def write_raw_files(dfs: dict, out_dir: Path, file_format: str = 'parquet') -> Path:
+    """
+    Writes the synthetic extracts under the pipeline's raw file names.
+
+    Parquet is the default because anything beyond ~1M sales rows exceeds Excel's sheet limit.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, df in dfs.items():
+        path = out_dir / f"{RAW_FILES[name]}.{file_format}"
+        if file_format == 'parquet':
+            df.to_parquet(path, index=False)
+        elif file_format == 'xlsx':
+            df.to_excel(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+    return out_dir
@@ -0,0 +1,42 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from data.data_functions.macro_factors import build_macro_factors
+from data.data_functions.prepare_master_data import clean_data, engineer_features, merge_raw_data, prepare_master_data
+from data.data_functions.synthetic_data import generate_retail_data, write_raw_files
+
+
+@pytest.fixture(scope='session')
+def raw_data() -> dict:
+    """Small synthetic extracts: 8 stores, 2 years, 4 departments. Shared by all tests: do not modify."""
+    return generate_retail_data(n_stores=8, n_years=2, n_depts=4, seed=3)
+
+
+@pytest.fixture(scope='session')
+def master_df(raw_data):
+    """The master dataset the pipeline builds from `raw_data`. Shared by all tests: copy before modifying."""
+    dfs = {name: df.copy() for name, df in raw_data.items()}
+    return engineer_features(clean_data(merge_raw_data(dfs), build_macro_factors(dfs['macro'])))
+
+
+@pytest.fixture(scope='session')
+def factors(raw_data):
+    """The macro factor table the pipeline builds from `raw_data`. Shared by all tests: copy before modifying."""
+    return build_macro_factors(raw_data['macro'].copy())
+
+
+@pytest.fixture(scope='session')
+def processed_dir(raw_data, tmp_path_factory) -> Path:
+    """The pipeline's output for `raw_data`, as one published version. Shared by all tests: do not modify."""
+    work_dir = tmp_path_factory.mktemp('pipeline')
+    processed_dir = work_dir / 'processed_data'
+    prepare_master_data(write_raw_files(raw_data, work_dir / 'unprocessed_data'), processed_dir)
+    return processed_dir
@@ -0,0 +1,64 @@
+# tests/test_analytics.py
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analytics.forecast import moving_average_forecast
+from app.analytics.holiday import holiday_impact
+from app.analytics.seasonality import seasonality_profile
+from app.analytics.segmentation import assign_cluster_labels, cluster_stores
+from app.analytics.summary import executive_summary
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ANALYTICS_MODULES = [path.stem for path in (PROJECT_ROOT / 'app' / 'analytics').glob('*.py')]
+
+
+@pytest.mark.parametrize('module', ANALYTICS_MODULES)
+def test_analytics_modules_do_not_import_streamlit(module):
+    code = f"import sys; import app.analytics.{module}; print('streamlit' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_executive_summary(master_df):
+    summary = executive_summary(master_df)
+    stores = master_df.groupby('Store').agg(Weekly_Sales=('Weekly_Sales', 'sum'), Size=('Size', 'first'))
+
+    assert summary['kpis']['num_stores'] == len(stores)
+    assert summary['kpis']['total_sales'] == pytest.approx(master_df['Weekly_Sales'].sum())
+    assert summary['kpis']['avg_sales_per_sqft'] == pytest.approx(stores['Weekly_Sales'].sum() / stores['Size'].sum())
+    assert summary['store_sales']['Weekly_Sales'].is_monotonic_decreasing
+    assert len(summary['sales_over_time']) == master_df['Date'].nunique()
+
+
+def test_seasonality_and_holiday_averages(master_df):
+    profile = seasonality_profile(master_df)
+    expected_monthly = master_df.groupby('Month')['Weekly_Sales'].mean()
+    np.testing.assert_allclose(profile['monthly_sales']['Weekly_Sales'], expected_monthly)
+    assert profile['top_3_weeks']['Weekly_Sales'].tolist() == sorted(profile['weekly_sales']['Weekly_Sales'], reverse=True)[:3]
+
+    impact = holiday_impact(master_df)
+    means = master_df.groupby('IsHoliday')['Weekly_Sales'].mean()
+    assert impact['uplift']['delta_pct'] == pytest.approx((means[True] / means[False] - 1) * 100)
+    assert set(impact['holiday_data']['Date']) == set(master_df.loc[master_df['IsHoliday'], 'Date'])
+
+
+def test_forecast_uses_prior_weeks_only(master_df):
+    sales = moving_average_forecast(master_df, window=4)['sales_over_time']
+    weekly = master_df.groupby('Date')['Weekly_Sales'].sum()
+    assert np.isnan(sales['Forecast'].iloc[0])
+    assert sales['Forecast'].iloc[10] == pytest.approx(weekly.iloc[6:10].mean())
+
+
+def test_cluster_stores(master_df):
+    clustered, centroids = cluster_stores(master_df, 4)
+    assert len(clustered) == master_df['Store'].nunique()
+    assert set(clustered['Cluster']) == set(range(4))
+    assert len(assign_cluster_labels(centroids)) == 4
+
+    assert cluster_stores(master_df, 100)[1] is None  # Fewer stores than clusters
+    assert cluster_stores(pd.DataFrame(columns=master_df.columns), 4)[1] is None
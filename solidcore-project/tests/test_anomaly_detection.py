@@ -0,0 +1,72 @@
+# tests/test_anomaly_detection.py
+
+import numpy as np
+import pandas as pd
+
+from data.data_functions import anomaly_detection
+from data.data_functions.anomaly_detection import (
+    ROLLING_WINDOW, build_anomaly_index, score_store_weeks, store_week_matrix, update_anomaly_index
+)
+
+
+def _first_weeks(df: pd.DataFrame, weeks: int) -> pd.DataFrame:
+    cutoff = np.sort(df['Date'].unique())[weeks - 1]
+    return df[df['Date'] <= cutoff]
+
+
+def test_spike_is_flagged(master_df, tmp_path):
+    df = master_df.copy()
+    week = np.sort(df['Date'].unique())[40]
+    df.loc[(df['Store'] == 2) & (df['Date'] == week), 'Weekly_Sales'] *= 3
+
+    index_df = build_anomaly_index(df, tmp_path)
+    flagged = index_df[(index_df['Store'] == 2) & (index_df['Date'] == week)]
+    assert len(flagged) == 1
+    assert flagged['Robust_Z'].iloc[0] > 0
+
+
+def test_trailing_window_scores_match_full_history(master_df):
+    sales = store_week_matrix(master_df)
+    full = score_store_weeks(sales)
+    start = 60
+    trailing = score_store_weeks(sales.iloc[start - ROLLING_WINDOW:])
+
+    new_weeks = sales.index[start:]
+    full = full[full['Date'].isin(new_weeks)].reset_index(drop=True)
+    trailing = trailing[trailing['Date'].isin(new_weeks)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(full, trailing)
+
+
+def _no_rebuild(*args):
+    raise AssertionError("The index was rebuilt instead of updated.")
+
+
+def test_update_matches_full_rebuild(master_df, tmp_path, monkeypatch):
+    df = master_df.copy()
+    # Spikes on both sides of the update, so each part of the index has flags to compare
+    dates = np.sort(df['Date'].unique())
+    for store, week in [(1, 30), (3, 80), (5, 95)]:
+        df.loc[(df['Store'] == store) & (df['Date'] == dates[week]), 'Weekly_Sales'] *= 3
+
+    build_anomaly_index(_first_weeks(df, 60), tmp_path / 'previous')
+    with monkeypatch.context() as patch:
+        patch.setattr(anomaly_detection, 'build_anomaly_index', _no_rebuild)
+        updated = update_anomaly_index(df, tmp_path / 'updated', tmp_path / 'previous')
+    rebuilt = build_anomaly_index(df, tmp_path / 'rebuilt')
+
+    assert set(zip(updated['Store'], updated['Date'])) == set(zip(rebuilt['Store'], rebuilt['Date']))
+    assert {(1, dates[30]), (3, dates[80]), (5, dates[95])} <= set(zip(updated['Store'], updated['Date']))
+    np.testing.assert_allclose(updated['Robust_Z'], rebuilt['Robust_Z'], rtol=1e-4)
+
+
+def test_update_rebuilds_when_history_is_revised(master_df, tmp_path):
+    build_anomaly_index(_first_weeks(master_df, 60), tmp_path / 'previous')
+    df = master_df.copy()
+    # A spike in weeks the previous index already covers
+    week = np.sort(df['Date'].unique())[30]
+    df.loc[(df['Store'] == 4) & (df['Date'] == week), 'Weekly_Sales'] *= 3
+
+    updated = update_anomaly_index(df, tmp_path / 'updated', tmp_path / 'previous')
+    assert ((updated['Store'] == 4) & (updated['Date'] == week)).any()
+    rebuilt = build_anomaly_index(df, tmp_path / 'rebuilt')
+    assert len(updated) == len(rebuilt)
@@ -0,0 +1,89 @@
+# tests/test_approximate.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analytics.approximate import DOMAIN, domain_means, domain_totals
+from app.analytics.filters import filter_mask
+from app.utils.refinement import DeferredSelection, resolve
+from data.data_functions.sampling import (
+    MIN_ROWS_PER_STORE, SAMPLE_COLUMNS, SAMPLE_FRACTION, WEIGHT_COLUMN, build_stratified_sample
+)
+
+
+def _in_domain(sample: pd.DataFrame, mask) -> pd.DataFrame:
+    return sample.assign(**{DOMAIN: np.asarray(mask)})
+
+
+def test_sample_budget_per_store(master_df):
+    sample = build_stratified_sample(master_df)
+    assert sample.columns.tolist() == SAMPLE_COLUMNS
+
+    store_rows = master_df.groupby('Store').size()
+    expected = np.clip(np.ceil(SAMPLE_FRACTION * store_rows), MIN_ROWS_PER_STORE, None).clip(upper=store_rows)
+    pd.testing.assert_series_equal(sample.groupby('Store').size(), expected.astype(int))
+    # Every store's weights add up to its row count
+    pd.testing.assert_series_equal(sample.groupby('Store')[WEIGHT_COLUMN].sum(), store_rows.astype(float), check_names=False)
+
+
+def test_sample_budget_is_capped(master_df):
+    sample = build_stratified_sample(master_df, fraction=1.0, rows_per_store=50)
+    assert (sample.groupby('Store').size() == 50).all()
+
+
+def test_full_sample_gives_exact_figures(master_df):
+    # Every row sampled: the estimators reduce to the exact totals and means, with no sampling error
+    sample = build_stratified_sample(master_df, fraction=1.0, rows_per_store=len(master_df))
+    sample = _in_domain(sample, sample['Type'] != 'C')
+    domain = master_df[master_df['Type'] != 'C']
+
+    totals = domain_totals(sample, ['Date']).set_index('Date')
+    np.testing.assert_allclose(totals['Weekly_Sales'], domain.groupby('Date')['Weekly_Sales'].sum())
+    np.testing.assert_allclose(totals['Weekly_Sales_upper'], totals['Weekly_Sales_lower'])
+
+    means = domain_means(sample, ['Month']).set_index('Month')
+    np.testing.assert_allclose(means['Weekly_Sales'], domain.groupby('Month')['Weekly_Sales'].mean())
+    np.testing.assert_allclose(means['Weekly_Sales_upper'], means['Weekly_Sales_lower'])
+
+
+@pytest.mark.parametrize('estimator, exact', [
+    (domain_totals, lambda domain: domain.groupby('IsHoliday')['Weekly_Sales'].sum()),
+    (domain_means, lambda domain: domain.groupby('IsHoliday')['Weekly_Sales'].mean()),
+])
+def test_confidence_bounds_cover_exact_figures(master_df, estimator, exact):
+    start, end = master_df['Date'].min().date(), (master_df['Date'].max() - pd.Timedelta(weeks=20)).date()
+    stores, types = [1, 2, 3, 5, 8], ['A', 'B', 'C']
+    truth = exact(master_df[filter_mask(master_df, start, end, stores, types)])
+
+    covered, errors = [], []
+    for seed in range(100):
+        sample = build_stratified_sample(master_df, seed=seed)
+        estimates = estimator(_in_domain(sample, filter_mask(sample, start, end, stores, types)), ['IsHoliday'])
+        estimates = estimates.set_index('IsHoliday').reindex(truth.index)
+        covered += ((estimates['Weekly_Sales_lower'] <= truth) & (truth <= estimates['Weekly_Sales_upper'])).tolist()
+        errors += ((estimates['Weekly_Sales'] - truth) / truth).tolist()
+
+    # Nominal 95% intervals, and no bias beyond what 100 draws can resolve
+    assert 0.88 <= np.mean(covered) <= 1.0
+    assert abs(np.mean(errors)) < 3 * np.std(errors) / np.sqrt(len(errors))
+
+
+class _CountingBackend:
+    def __init__(self):
+        self.calls = 0
+
+    def select(self, *filters):
+        self.calls += 1
+        return pd.DataFrame({'Store': [1]})
+
+
+def test_deferred_selection_is_made_once_and_only_when_needed():
+    backend = _CountingBackend()
+    deferred = DeferredSelection(backend, ('2012-01-01', '2012-12-31', (1,), ('A',)), sampled_rows=3)
+    assert not deferred.empty
+    assert backend.calls == 0 and not deferred.done()
+
+    assert resolve(deferred) is resolve(deferred)
+    assert backend.calls == 1 and deferred.done()
+    assert resolve(backend) is backend
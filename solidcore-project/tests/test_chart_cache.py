@@ -0,0 +1,40 @@
+# tests/test_chart_cache.py
+
+import altair as alt
+import pandas as pd
+import pyarrow as pa
+
+from app.utils import chart_cache
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({'Month': [1, 2, 3], 'Weekly_Sales': [10.0, 12.5, 9.0]})
+
+
+def test_fingerprint_is_by_content():
+    df = _frame()
+    assert chart_cache.fingerprint(df) == chart_cache.fingerprint(df.copy().set_axis([7, 8, 9]))
+    changed = df.copy()
+    changed.loc[1, 'Weekly_Sales'] = 12.51
+    assert chart_cache.fingerprint(changed) != chart_cache.fingerprint(df)
+    assert chart_cache.fingerprint(df.astype({'Month': 'int32'})) != chart_cache.fingerprint(df)
+
+
+def test_spec_is_built_once_per_content():
+    builds = []
+
+    def build(df, title):
+        builds.append(title)
+        return alt.Chart(df, title=title).mark_bar().encode(x='Month:O', y='Weekly_Sales:Q')
+
+    transformer = alt.data_transformers.active
+    chart_cache.altair_chart("test.bars", build, _frame(), "Monthly")
+    chart_cache.altair_chart("test.bars", build, _frame(), "Monthly")
+    chart_cache.altair_chart("test.bars", build, _frame(), "Other title")
+    assert builds == ["Monthly", "Other title"]
+    assert alt.data_transformers.active == transformer
+
+    spec = next(spec for key, (spec, _) in chart_cache._specs.items() if key[0] == "test.bars")
+    # The chart's data is stored in the cached spec already encoded as Arrow
+    dataset = pa.ipc.open_stream(next(iter(spec['datasets'].values()))).read_pandas()
+    assert dataset['Weekly_Sales'].tolist() == [10.0, 12.5, 9.0]
@@ -0,0 +1,49 @@
+# tests/test_cold_start.py
+
+import subprocess
+import sys
+
+import altair as alt
+import pytest
+
+from app.themes import theming
+from app.utils.import_profiler import APP_DIR, PROJECT_ROOT, compare_to_baseline, page_scripts, top_level_imports
+
+# scikit-learn is imported by the clustering call; the Sales Analysis views' modules once their view is selected
+SALES_VIEW_MODULES = [
+    'app.data_plotting_modules.seasonality_analysis', 'app.data_plotting_modules.holiday_analysis',
+    'app.data_plotting_modules.economic_analysis', 'app.data_plotting_modules.scenario_analysis',
+    'app.data_plotting_modules.forecast_analysis'
+]
+DEFERRED_MODULES = {'Main.py': ['sklearn'] + SALES_VIEW_MODULES, '01_Sales_Analysis_and_Forecasting.py': ['sklearn'] + SALES_VIEW_MODULES}
+
+
+def _modules_after_imports(script) -> set:
+    """The modules loaded by the page's top-level imports, in a fresh interpreter."""
+    code = (
+        "import sys\n"
+        f"sys.path[:0] = [{str(APP_DIR)!r}, {str(PROJECT_ROOT)!r}]\n"
+        f"{top_level_imports(script)}\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.strip().splitlines()[-1].split())
+
+
+@pytest.mark.parametrize('script', page_scripts(), ids=lambda script: script.name)
+def test_page_imports_defer_heavy_modules(script):
+    loaded = _modules_after_imports(script)
+    assert loaded & set(DEFERRED_MODULES.get(script.name, ['sklearn'])) == set()
+
+
+def test_enable_theme_registers_one_shared_theme():
+    theming.enable_theme()
+    theming.enable_theme()
+    assert alt.theme.active == theming.THEME_NAME
+    assert alt.theme.get() is theming.altair_theme
+
+
+def test_compare_to_baseline_reports_only_slowdowns_beyond_tolerance():
+    baseline = {"pages": {"Main.py": {"total_ms": 100.0}, "01.py": {"total_ms": 100.0}}}
+    report = {"pages": {"Main.py": {"total_ms": 120.0}, "01.py": {"total_ms": 130.0}, "05.py": {"total_ms": 900.0}}}
+    assert compare_to_baseline(report, baseline, tolerance=0.25) == ["01.py: 100.0 ms -> 130.0 ms"]
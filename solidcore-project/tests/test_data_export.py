@@ -0,0 +1,41 @@
+# tests/test_data_export.py
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from app.analytics.query import FrameSelection
+from app.utils.data_browser import remove_stale_exports
+from app.utils.data_export import write_export
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet'])
+def test_write_export_round_trips_every_row(master_df, tmp_path, file_format):
+    selection = FrameSelection(master_df)
+    path = tmp_path / f"extract.{file_format}"
+    rows = write_export(selection, path, file_format, batch_rows=1000)
+
+    assert rows == len(master_df)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]  # No partial file left behind
+    exported = pd.read_csv(path, parse_dates=['Date']) if file_format == 'csv' else pd.read_parquet(path)
+    assert list(exported.columns) == list(master_df.columns)
+    pd.testing.assert_series_equal(exported['Weekly_Sales'], master_df['Weekly_Sales'].reset_index(drop=True))
+    pd.testing.assert_series_equal(exported['Date'], master_df['Date'].reset_index(drop=True), check_dtype=False)
+
+
+def test_write_export_rejects_unknown_formats(master_df, tmp_path):
+    with pytest.raises(ValueError):
+        write_export(FrameSelection(master_df), tmp_path / "extract.xlsx", 'xlsx')
+
+
+def test_remove_stale_exports_keeps_recent_files(tmp_path):
+    stale, recent = tmp_path / "stale.csv", tmp_path / "recent.csv"
+    stale.write_text("Store\n1\n")
+    recent.write_text("Store\n1\n")
+    an_hour_ago = time.time() - 3601
+    os.utime(stale, (an_hour_ago, an_hour_ago))
+
+    assert remove_stale_exports(tmp_path, ttl_seconds=3600) == 1
+    assert not stale.exists() and recent.exists()
@@ -0,0 +1,101 @@
+# tests/test_dataset_version.py
+
+import datetime as dt
+import shutil
+
+import pandas as pd
+import pytest
+
+from app.utils.data_versions import common_filters
+from data.data_functions.dataset_version import (
+    VERSIONS_DIR, VERSIONS_KEPT, current_version, dataset_file, publish_version, stage_unchanged,
+    staging_dir
+)
+from data.data_functions.macro_factors import MACRO_FILE
+from data.data_functions.prepare_master_data import OUTPUT_FILE, PARQUET_FILE, update_macro_factors
+from data.data_functions.synthetic_data import write_raw_files
+
+
+def _publish(processed_dir, **contents) -> str:
+    with staging_dir(processed_dir) as staging:
+        for name, text in contents.items():
+            (staging / name).write_text(text)
+        return publish_version(processed_dir, staging, list(contents))['version']
+
+
+def test_versions_are_published_side_by_side(tmp_path):
+    first = _publish(tmp_path, **{'a.csv': 'one', 'b.csv': 'two'})
+    assert current_version(tmp_path) == first
+    assert dataset_file(tmp_path, None, 'a.csv').read_text() == 'one'
+    assert dataset_file(tmp_path, None, 'missing.csv') is None
+
+    second = _publish(tmp_path, **{'a.csv': 'three'})
+    assert current_version(tmp_path) == second != first
+    # The superseded version's files stay readable, and the new version lists only its own files
+    assert dataset_file(tmp_path, first, 'a.csv').read_text() == 'one'
+    assert dataset_file(tmp_path, second, 'b.csv') is None
+    assert not [path for path in (tmp_path / VERSIONS_DIR).iterdir() if path.name.startswith('.staging')]
+
+
+def test_identical_content_is_the_same_version(tmp_path):
+    assert _publish(tmp_path, **{'a.csv': 'one'}) == _publish(tmp_path, **{'a.csv': 'one'})
+
+
+def test_old_versions_are_pruned(tmp_path):
+    versions = [_publish(tmp_path, **{'a.csv': str(n)}) for n in range(VERSIONS_KEPT + 2)]
+    assert sorted(path.name for path in (tmp_path / VERSIONS_DIR).iterdir()) == sorted(versions[-VERSIONS_KEPT:])
+    assert dataset_file(tmp_path, versions[0], 'a.csv') is None
+
+
+def test_failed_runs_publish_nothing(tmp_path):
+    first = _publish(tmp_path, **{'a.csv': 'one'})
+    with pytest.raises(RuntimeError):
+        with staging_dir(tmp_path) as staging:
+            (staging / 'a.csv').write_text('half-written')
+            raise RuntimeError("The run failed")
+    assert current_version(tmp_path) == first
+    assert [path.name for path in (tmp_path / VERSIONS_DIR).iterdir()] == [first]
+
+
+def test_staged_files_are_shared_until_replaced(tmp_path):
+    first = _publish(tmp_path, **{'a.csv': 'one', 'b.csv': 'two'})
+    with staging_dir(tmp_path) as staging:
+        stage_unchanged(tmp_path, first, staging, ['a.csv', 'b.csv', 'missing.csv'])
+        assert (staging / 'a.csv').samefile(dataset_file(tmp_path, first, 'a.csv'))
+        (staging / 'b.csv.part').write_text('rewritten')
+        (staging / 'b.csv.part').replace(staging / 'b.csv')
+        second = publish_version(tmp_path, staging, ['a.csv', 'b.csv'])['version']
+    assert dataset_file(tmp_path, first, 'b.csv').read_text() == 'two'
+    assert dataset_file(tmp_path, second, 'b.csv').read_text() == 'rewritten'
+
+
+def test_legacy_layout_is_still_read(tmp_path):
+    (tmp_path / OUTPUT_FILE).write_text('Store\n1\n')
+    assert current_version(tmp_path).startswith('mtime-')
+    assert dataset_file(tmp_path, None, OUTPUT_FILE) == tmp_path / OUTPUT_FILE
+    assert current_version(tmp_path / 'empty') is None
+
+
+def test_macro_update_publishes_a_new_version(raw_data, processed_dir, tmp_path):
+    processed_copy = tmp_path / 'processed_data'
+    shutil.copytree(processed_dir, processed_copy)
+    before = current_version(processed_copy)
+    macro = raw_data['macro'].copy()
+    macro['Temperature'] += 10
+    update_macro_factors(write_raw_files({'macro': macro}, tmp_path / 'unprocessed_data'), processed_copy)
+
+    after = current_version(processed_copy)
+    assert after != before
+    assert dataset_file(processed_copy, after, PARQUET_FILE).samefile(dataset_file(processed_copy, before, PARQUET_FILE))
+    old, new = (pd.read_parquet(dataset_file(processed_copy, version, MACRO_FILE)) for version in (before, after))
+    pd.testing.assert_series_equal(new['Temperature'], old['Temperature'] + 10)
+
+
+def test_common_filters():
+    options = {'min_date': dt.date(2010, 2, 5), 'max_date': dt.date(2012, 10, 26), 'stores': [1, 2], 'store_types': ['A', 'B']}
+    assert common_filters(options) == [
+        (dt.date(2010, 2, 5), dt.date(2012, 10, 26), [1, 2], ['A', 'B']),
+        (dt.date(2010, 2, 5), dt.date(2012, 10, 26), [1, 2], ['A']),
+        (dt.date(2010, 2, 5), dt.date(2012, 10, 26), [1, 2], ['B']),
+        (dt.date(2012, 1, 1), dt.date(2012, 10, 26), [1, 2], ['A', 'B']),
+    ]
@@ -0,0 +1,95 @@
+# tests/test_export_downloads.py
+
+import tracemalloc
+
+import pytest
+import tornado.web
+from tornado.testing import AsyncHTTPTestCase
+
+from app.utils import export_downloads
+from app.utils.export_downloads import CHUNK_BYTES, ExportDownloadHandler, route_pattern
+
+
+class ExportDownloadTest(AsyncHTTPTestCase):
+    def get_app(self):
+        return tornado.web.Application([
+            (route_pattern(""), ExportDownloadHandler, {'is_active_session': lambda session: session == 'live'})
+        ])
+
+    @pytest.fixture(autouse=True)
+    def _tmp_path(self, tmp_path):
+        self.tmp_path = tmp_path
+
+    def setUp(self):
+        super().setUp()
+        self.tokens = []
+
+    def tearDown(self):
+        for token in self.tokens:
+            export_downloads.revoke(token)
+        super().tearDown()
+
+    def _offer(self, path, session='live'):
+        token = export_downloads.offer(path, "retail_extract.csv", "text/csv")
+        export_downloads._downloads[token]['session'] = session
+        self.tokens.append(token)
+        return token
+
+    def test_serves_the_whole_file_as_an_attachment(self):
+        path = self.tmp_path / "export.csv"
+        path.write_bytes(b"Store,Weekly_Sales\n" + b"1,100.0\n" * (CHUNK_BYTES // 4))
+        response = self.fetch(f"/_exports/{self._offer(path)}")
+
+        assert response.code == 200
+        assert response.body == path.read_bytes()
+        assert response.headers['Content-Type'] == "text/csv"
+        assert response.headers['Content-Disposition'] == 'attachment; filename="retail_extract.csv"'
+        assert response.headers['Cache-Control'] == "no-store"
+
+    def test_unknown_tokens_and_other_sessions_are_not_served(self):
+        path = self.tmp_path / "export.csv"
+        path.write_text("Store\n1\n")
+
+        assert self.fetch(f"/_exports/{'0' * 32}").code == 404
+        assert self.fetch(f"/_exports/{self._offer(path, session='closed')}").code == 404
+        token = self._offer(path)
+        export_downloads.revoke(token)
+        assert self.fetch(f"/_exports/{token}").code == 404
+
+    def test_missing_files_are_forgotten(self):
+        path = self.tmp_path / "export.csv"
+        path.write_text("Store\n1\n")
+        token = self._offer(path)
+        path.unlink()
+
+        assert self.fetch(f"/_exports/{token}").code == 404
+        export_downloads.forget_missing()
+        assert token not in export_downloads._downloads
+
+    def _peak_download_memory(self, size):
+        path = self.tmp_path / f"export_{size}.csv"
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        token = self._offer(path)
+        received = 0
+
+        def on_chunk(chunk):
+            nonlocal received
+            received += len(chunk)
+
+        tracemalloc.start()
+        try:
+            response = self.fetch(f"/_exports/{token}", streaming_callback=on_chunk, request_timeout=60)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert response.code == 200 and received == size
+        return peak
+
+    def test_memory_stays_flat_as_the_export_grows(self):
+        small = self._peak_download_memory(2 * CHUNK_BYTES)
+        large = self._peak_download_memory(32 * CHUNK_BYTES)
+
+        # Sixteen times the data, but still only a chunk or so in flight at a time
+        assert large - small < 2 * CHUNK_BYTES
+        assert large < 4 * CHUNK_BYTES
@@ -0,0 +1,30 @@
+# tests/test_load_test.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+from load_test import _latency_summary, prepare_dataset, run_load_level  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def processed_dir(tmp_path_factory):
+    return prepare_dataset(n_stores=6, n_years=2, n_depts=3, work_dir=tmp_path_factory.mktemp('load_test'))
+
+
+def test_concurrent_sessions_complete_every_action(processed_dir):
+    report = run_load_level(2, processed_dir, rounds=1, think=0.0, timeout=120, seed=0)
+    assert report['errors'] == []
+    assert report['reruns'] == 2 * 8  # Eight clicks per round and session
+    assert report['cold_start']['p50_ms'] > 0
+    assert set(report['by_action']) == {
+        'filter.date_range', 'filter.store_format', 'filter.reset', 'page.sales_analysis',
+        'sales_analysis.views', 'page.segmentation', 'segmentation.slider'
+    }
+
+
+def test_latency_summary():
+    assert _latency_summary([]) == {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    assert _latency_summary([0.1, 0.2, 0.3])['p50_ms'] == 200.0
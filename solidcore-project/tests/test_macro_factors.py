@@ -0,0 +1,50 @@
+# tests/test_macro_factors.py
+
+import pandas as pd
+
+from data.data_functions.macro_factors import ECONOMIC_FACTORS, MONTHLY_FACTORS, attach_factors, build_macro_factors
+from data.data_functions.prepare_master_data import clean_data, merge_raw_data
+
+
+def test_monthly_factors_are_filled(raw_data, factors):
+    assert raw_data['macro'][MONTHLY_FACTORS].isna().any().any()
+    assert not factors[ECONOMIC_FACTORS].isna().any().any()
+    assert factors.groupby('Store')['Date'].is_monotonic_increasing.all()
+
+
+def test_as_of_join_matches_merge_on_reported_weeks(master_df, factors):
+    frame = master_df[['Store', 'Date', 'Weekly_Sales']].sample(frac=1, random_state=0)
+    joined = attach_factors(frame, factors.sort_values('Date', kind='stable'), ECONOMIC_FACTORS)
+
+    # Every master row has a reading for its own week, so the as-of join is an exact join on it
+    merged = frame.reset_index().merge(factors, on=['Store', 'Date'], how='left').set_index('index')
+    merged.index.name = None
+    pd.testing.assert_frame_equal(joined, merged[joined.columns], check_dtype=False)
+
+
+def test_as_of_join_takes_latest_earlier_reading():
+    factors = pd.DataFrame({
+        'Store': [1, 2, 1],
+        'Date': pd.to_datetime(['2012-01-06', '2012-01-06', '2012-01-20']),
+        'CPI': [210.0, 190.0, 211.0]
+    })
+    frame = pd.DataFrame({
+        'Store': [1, 1, 2, 1],
+        'Date': pd.to_datetime(['2012-01-27', '2012-01-13', '2012-01-27', '2011-12-30'])
+    }, index=[10, 11, 12, 13])
+    joined = attach_factors(frame, factors, ['CPI'])
+    assert joined.index.tolist() == [10, 11, 12, 13]
+    assert joined['CPI'].tolist()[:3] == [211.0, 210.0, 190.0]
+    assert pd.isna(joined['CPI'].iloc[3])
+
+
+def test_sales_without_a_reading_are_dropped(raw_data):
+    dfs = {name: df.copy() for name, df in raw_data.items()}
+    weeks = sorted(dfs['macro']['Date'].unique())[20:24]
+    missing = (dfs['macro']['Store'] == 3) & dfs['macro']['Date'].isin(weeks)
+    dfs['macro'] = dfs['macro'][~missing]
+
+    df = clean_data(merge_raw_data(dfs), build_macro_factors(dfs['macro']))
+    assert not ((df['Store'] == 3) & df['Date'].isin(pd.to_datetime(weeks))).any()
+    expected = (raw_data['sales']['Store'] != 3) | ~raw_data['sales']['Date'].isin(weeks)
+    assert len(df) == expected.sum()
@@ -0,0 +1,54 @@
+# tests/test_perf.py
+
+import json
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from app.analytics.query import PandasBackend
+from app.utils import perf
+
+PAGE = Path(__file__).resolve().parent.parent / 'app' / 'pages' / '01_Sales_Analysis_and_Forecasting.py'
+
+
+def test_spans_are_free_outside_a_session():
+    assert perf.span("anything") is perf._NO_SPAN
+    perf.cache_miss("anything")  # No recorder: nothing to count, and no error
+
+
+def test_recorder_summary():
+    recorder = perf.RerunRecorder("Test")
+    recorder.add_span("step", 0.0125, None)
+    for _ in range(3):
+        recorder.count(recorder.cache_calls, "get_data")
+    recorder.count(recorder.cache_misses, "get_data")
+    recorder.add_saving("chart.bars", 0.002)
+
+    summary = recorder.summary()
+    assert summary['page'] == "Test"
+    assert summary['spans'] == [{'name': "step", 'ms': 12.5, 'rss_delta_mb': None, 'thread': "MainThread"}]
+    assert summary['cache'] == {"get_data": {'calls': 3, 'hits': 2}}
+    assert summary['saved_ms'] == {"chart.bars": 2.0}
+
+
+def test_debug_panel_logs_each_rerun(master_df, factors, tmp_path, monkeypatch):
+    log_path = tmp_path / "perf_log.jsonl"
+    monkeypatch.setenv(perf.PERF_LOG_ENV, str(log_path))
+    backend = PandasBackend(master_df, factors=factors)
+    options = backend.filter_options()
+    at = AppTest.from_file(str(PAGE), default_timeout=60)
+    at.session_state['selection'] = backend.select(
+        options['min_date'], options['max_date'], options['stores'], options['store_types']
+    )
+    at.session_state[perf.ENABLED_KEY] = True
+
+    at.run()
+    at.run()
+    assert not at.exception
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [record['page'] for record in records] == ["Sales Analysis"] * 2
+    span_names = {span['name'] for span in records[0]['spans']}
+    assert {"prepare_seasonality", "display_seasonality"} <= span_names
+    # The second rerun finds the view's data in the cache
+    assert records[1]['cache'] and all(counts['hits'] == counts['calls'] for counts in records[1]['cache'].values())
+    assert at.sidebar.metric[0].label == "Rerun total"
@@ -0,0 +1,44 @@
+# tests/test_pipeline_profiler.py
+
+import json
+
+import pandas as pd
+
+from data.data_functions.pipeline_profiler import PipelineProfiler, frame_stats
+from data.data_functions.prepare_master_data import PROFILE_FILE, REPORT_FILE, prepare_master_data
+from data.data_functions.synthetic_data import write_raw_files
+
+STEPS = ['load', 'merge', 'clean', 'features', 'save', 'anomalies', 'sample', 'store_summaries', 'publish']
+
+
+def test_frame_stats():
+    stats = frame_stats(pd.DataFrame({'Store': [1, 2, 3], 'Weekly_Sales': [1.0, 2.0, 3.0]}))
+    assert (stats['rows'], stats['columns']) == (3, 2)
+    assert set(stats['memory_by_dtype_mb']) == {'int64', 'float64'}
+
+
+def test_profiler_times_each_step(tmp_path):
+    profiler = PipelineProfiler()
+    with profiler.step('first'):
+        frame = pd.DataFrame({'a': range(1000)})
+    profiler.record_frames('first', frame)
+    report = profiler.finish(tmp_path / REPORT_FILE)
+
+    assert list(report['steps']) == ['first']
+    assert report['steps']['first']['rows'] == 1000
+    assert 'profile' not in report
+    assert json.loads((tmp_path / REPORT_FILE).read_text()) == report
+
+
+def test_pipeline_writes_the_step_report_and_folded_stacks(raw_data, tmp_path, capsys):
+    raw_dir = write_raw_files(raw_data, tmp_path / 'unprocessed_data')
+    processed_dir = tmp_path / 'processed_data'
+    report = prepare_master_data(raw_dir, processed_dir, profile=True)
+
+    assert list(report['steps']) == STEPS
+    assert all(step['seconds'] >= 0 for step in report['steps'].values())
+    assert report['steps']['features']['columns'] == 12
+    assert report['profile']['samples'] > 0
+    stacks = (processed_dir / PROFILE_FILE).read_text().splitlines()
+    assert stacks and all(line.rsplit(' ', 1)[1].isdigit() for line in stacks)
+    assert "Pipeline complete" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+# tests/test_query_backends.py
+
+import datetime as dt
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from app.analytics.query import DuckDBBackend, PandasBackend
+
+
+@pytest.fixture(scope='module')
+def master(master_df):
+    # The layout the pipeline publishes: sorted by store, then date
+    return master_df.sort_values(['Store', 'Date'], kind='stable', ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def backends(master, factors, tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('query_backends')
+    master.to_parquet(data_dir / 'master_data.parquet', index=False)
+    factors.to_parquet(data_dir / 'macro_factors.parquet', index=False)
+    return (
+        PandasBackend(master, version='test', factors=factors),
+        DuckDBBackend(data_dir / 'master_data.parquet', version='test', factors_path=data_dir / 'macro_factors.parquet')
+    )
+
+
+def _filters(options: dict) -> list:
+    """(start, end, stores, types) covering no filter, each filter on its own and all of them together."""
+    start, end, stores, types = options['min_date'], options['max_date'], options['stores'], options['store_types']
+    mid = start + (end - start) / 2
+    return [
+        (start, end, stores, types),
+        (mid, end, stores, types),
+        (start, end, stores[1::2], types),
+        (start, end, stores, types[:1]),
+        (start + dt.timedelta(days=30), mid, stores[:5], types[1:]),
+        (end + dt.timedelta(days=1), end + dt.timedelta(days=30), stores, types),
+    ]
+
+
+def _selections(backends):
+    pandas_backend, duckdb_backend = backends
+    assert pandas_backend.filter_options() == duckdb_backend.filter_options()
+    for filters in _filters(pandas_backend.filter_options()):
+        yield filters, pandas_backend.select(*filters), duckdb_backend.select(*filters)
+
+
+def _assert_rows_equal(left: pd.DataFrame, right: pd.DataFrame):
+    pd.testing.assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True), check_dtype=False)
+
+
+def test_selections_agree_on_rows_and_batches(backends):
+    for filters, frame_selection, duckdb_selection in _selections(backends):
+        assert len(frame_selection) == len(duckdb_selection), filters
+        assert frame_selection.empty == duckdb_selection.empty
+        _assert_rows_equal(frame_selection.rows(), duckdb_selection.rows())
+        _assert_rows_equal(frame_selection.rows(limit=100, offset=50), duckdb_selection.rows(limit=100, offset=50))
+        for selection in (frame_selection, duckdb_selection):
+            batches = list(selection.batches(500))
+            assert all(batch.num_rows <= 500 for batch in batches)
+            streamed = pa.Table.from_batches(batches, schema=selection.batches(500).schema).to_pandas()
+            _assert_rows_equal(streamed, frame_selection.rows())
+
+
+def test_selections_agree_on_aggregates(backends):
+    for filters, frame_selection, duckdb_selection in _selections(backends):
+        for by, aggs in [
+            (['Store', 'Type'], {'Weekly_Sales': ('Weekly_Sales', 'sum'), 'Size': ('Size', 'first')}),
+            (['Date'], {'Weekly_Sales': ('Weekly_Sales', 'mean'), 'IsHoliday': ('IsHoliday', 'max')}),
+            (['Store'], {'CPI': ('CPI', 'mean'), 'Weeks': ('Date', 'nunique')}),  # CPI is joined from the macro table
+            (['Store'], {'Temperature': ('Temperature', 'first')}),  # The store's earliest reading
+            ([], {'Rows': ('Store', 'count'), 'Sales': ('Weekly_Sales', 'sum')}),
+        ]:
+            _assert_rows_equal(frame_selection.agg(by, **aggs), duckdb_selection.agg(by, **aggs))
+        if len(frame_selection) > 1:
+            columns = ['Weekly_Sales', 'Temperature', 'Size']
+            pd.testing.assert_frame_equal(frame_selection.corr(columns), duckdb_selection.corr(columns), check_names=False)
+
+
+def test_samples_are_drawn_without_replacement(backends):
+    for filters, frame_selection, duckdb_selection in _selections(backends):
+        for selection in (frame_selection, duckdb_selection):
+            sample = selection.sample(200, seed=1)
+            assert len(sample) == min(200, len(frame_selection))
+            assert not sample.duplicated(['Store', 'Dept', 'Date']).any()
+            assert sample['Temperature'].notna().all()  # Factors are joined onto the sampled rows
@@ -0,0 +1,47 @@
+# tests/test_sales_analysis_page.py
+
+import importlib
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from app.analytics.query import PandasBackend
+
+PAGE = Path(__file__).resolve().parent.parent / 'app' / 'pages' / '01_Sales_Analysis_and_Forecasting.py'
+UNSELECTED = {
+    "app.data_plotting_modules.economic_analysis": "get_economic_drivers",
+    "app.data_plotting_modules.scenario_analysis": "prepare_scenario_simulator",
+}
+
+
+@pytest.fixture
+def page(master_df, factors):
+    backend = PandasBackend(master_df, factors=factors)
+    options = backend.filter_options()
+    at = AppTest.from_file(str(PAGE), default_timeout=60)
+    at.session_state['selection'] = backend.select(
+        options['min_date'], options['max_date'], options['stores'], options['store_types']
+    )
+    return at
+
+
+def test_only_the_selected_views_are_prepared(page, monkeypatch):
+    calls = []
+    for module_name, prepare_name in UNSELECTED.items():
+        monkeypatch.setattr(importlib.import_module(module_name), prepare_name, lambda df, name=prepare_name: calls.append(name))
+
+    page.run()
+    assert [header.value for header in page.header] == ["1a) Seasonality"]
+    page.button_group(key="sales_analysis_views").set_value(["1a) Holiday Impact", "1b) Forecasting"]).run()
+
+    assert not page.exception
+    assert [header.value for header in page.header] == ["1a) Holiday Impact", "1b) Forecasting"]
+    assert calls == []
+
+
+def test_no_view_selected(page):
+    page.run()
+    page.button_group(key="sales_analysis_views").set_value([]).run()
+    assert [info.value for info in page.info] == ["Select one or more views above to run the analysis."]
+    assert not page.header
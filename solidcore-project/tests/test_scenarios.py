@@ -0,0 +1,76 @@
+# tests/test_scenarios.py
+
+import numpy as np
+import pandas as pd
+
+from app.analytics.economic import ECONOMIC_FACTORS
+from app.analytics.query import PandasBackend
+from app.analytics.scenarios import RIDGE_ALPHA, fit_economic_model, score_scenarios, shock_grid
+
+
+def _selection(master_df, factors):
+    backend = PandasBackend(master_df, factors=factors)
+    options = backend.filter_options()
+    return backend.select(options['min_date'], options['max_date'], options['stores'], options['store_types'])
+
+
+def _store_ridge(store_weeks):
+    """One store's ridge fit, solved on its own as an augmented least-squares problem."""
+    x = store_weeks[ECONOMIC_FACTORS].to_numpy(dtype=float)
+    y = store_weeks['Weekly_Sales'].to_numpy(dtype=float)
+    std = x.std(axis=0)
+    std[std == 0] = 1.0
+    z = (x - x.mean(axis=0)) / std
+    penalty = np.sqrt(RIDGE_ALPHA * len(y)) * np.eye(len(ECONOMIC_FACTORS))
+    betas = np.linalg.lstsq(np.vstack([z, penalty]), np.r_[y - y.mean(), np.zeros(len(ECONOMIC_FACTORS))], rcond=None)[0]
+    return y.mean(), betas / std
+
+
+def test_batched_fit_matches_per_store_fits(master_df, factors):
+    selection = _selection(master_df, factors)
+    model = fit_economic_model(selection)
+    store_weeks = selection.agg(
+        ['Store', 'Date'], Weekly_Sales=('Weekly_Sales', 'sum'), **{factor: (factor, 'first') for factor in ECONOMIC_FACTORS}
+    )
+
+    assert list(model['stores']) == sorted(master_df['Store'].unique())
+    for i, (store, weeks) in enumerate(store_weeks.groupby('Store')):
+        baseline, slopes = _store_ridge(weeks)
+        assert model['n_weeks'][i] == len(weeks)
+        np.testing.assert_allclose(model['baseline_sales'][i], baseline)
+        np.testing.assert_allclose(model['slopes'][i], slopes, rtol=1e-6)
+
+
+def test_slopes_match_least_squares_on_well_conditioned_data():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2010-02-05', periods=150, freq='W-FRI')
+    true_slopes = np.array([120.0, -3000.0, 45.0, -800.0])
+    frames = []
+    for store in (1, 2, 3):
+        x = rng.normal([60.0, 3.5, 200.0, 7.5], [15.0, 0.4, 20.0, 1.0], size=(len(dates), len(ECONOMIC_FACTORS)))
+        frames.append(pd.DataFrame(x, columns=ECONOMIC_FACTORS).assign(
+            Store=store, Dept=1, Date=dates, Weekly_Sales=20000 + x @ (store * true_slopes) + rng.normal(0, 500, len(dates))
+        ))
+    df = pd.concat(frames, ignore_index=True)
+
+    model = fit_economic_model(df)
+    for i, (store, weeks) in enumerate(df.groupby('Store')):
+        x = weeks[ECONOMIC_FACTORS].to_numpy()
+        design = np.column_stack([np.ones(len(x)), x])
+        ols = np.linalg.lstsq(design, weeks['Weekly_Sales'].to_numpy(), rcond=None)[0][1:]
+        np.testing.assert_allclose(model['slopes'][i], ols, rtol=1e-2)
+        np.testing.assert_allclose(model['slopes'][i], store * true_slopes, rtol=0.15)
+
+
+def test_scenarios_are_scored_from_the_slopes(master_df, factors):
+    model = fit_economic_model(_selection(master_df, factors))
+    grid = shock_grid([0, 0, 0, 0], 'Fuel_Price', 'Unemployment', half_width=2)
+    projected = score_scenarios(model, grid)
+
+    assert projected.shape == (len(grid), len(model['stores']))
+    np.testing.assert_allclose(projected[len(grid) // 2], model['baseline_sales'])  # The centre cell is no shock
+    # +10% fuel price and +1 point of unemployment
+    shock = np.array([0.0, 10.0, 0.0, 1.0])
+    expected = (model['baseline_sales'] + 0.1 * model['factor_mean'][:, 1] * model['slopes'][:, 1]
+                + model['slopes'][:, 3])
+    np.testing.assert_allclose(score_scenarios(model, shock)[0], expected)
@@ -0,0 +1,99 @@
+# tests/test_shared_dataset.py
+
+import datetime as dt
+import shutil
+
+import pandas as pd
+import pytest
+
+from app.analytics.filters import filter_master_data
+from app.analytics.query import PandasBackend
+from app.utils.loaders import open_query_backend
+from data.data_functions.data_loader import SHARED_DIR_ENV
+from data.data_functions.dataset_version import current_version, dataset_file, publish_version, stage_unchanged, staging_dir
+from data.data_functions.prepare_master_data import PARQUET_FILE, PUBLISHED_FILES
+from data.data_functions.shared_dataset import (
+    VERSIONS_KEPT, attach_shared_dataset, build_store_index, publish_shared_dataset, shared_version
+)
+
+
+@pytest.fixture(scope='module')
+def master(master_df):
+    return master_df.sort_values(['Store', 'Date'], kind='stable', ignore_index=True)
+
+
+def _filters(options: dict) -> list:
+    start, end, stores, types = options['min_date'], options['max_date'], options['stores'], options['store_types']
+    mid = start + (end - start) / 2
+    return [
+        (start, end, stores, types),
+        (mid, end, stores[1::2], types),
+        (start + dt.timedelta(days=30), mid, stores[:5], types[:1]),
+        (end + dt.timedelta(days=1), end + dt.timedelta(days=30), stores, types),
+    ]
+
+
+def test_store_index_filter_matches_the_query_filter(master):
+    backend = PandasBackend(master, store_index=build_store_index(master))
+    for filters in _filters(backend.filter_options()):
+        indexed = master.take(backend._indexed_rows(*filters))
+        pd.testing.assert_frame_equal(indexed, filter_master_data(master, *filters))
+
+
+def test_store_index_needs_store_order(master):
+    index = build_store_index(master)
+    assert index['Store'].tolist() == sorted(master['Store'].unique())
+    assert (index['Stop'] - index['Start']).tolist() == master.groupby('Store').size().tolist()
+    with pytest.raises(ValueError):
+        build_store_index(master.iloc[::-1])
+
+
+def test_published_dataset_is_mapped_in_place(processed_dir, tmp_path):
+    shared_dir = tmp_path / 'shared'
+    pointer = publish_shared_dataset(processed_dir, shared_dir)
+    assert pointer['version'] == shared_version(shared_dir) == current_version(processed_dir)
+    assert publish_shared_dataset(processed_dir, shared_dir) is None  # Already published
+
+    frames = attach_shared_dataset(shared_dir, pointer['version'])
+    master = frames['master']
+    assert master[['Store', 'Date']].equals(master[['Store', 'Date']].sort_values(['Store', 'Date'], kind='stable'))
+    # Read-only views of the mapped file rather than copies
+    assert not master['Weekly_Sales'].to_numpy().flags.writeable
+    pd.testing.assert_frame_equal(frames['store_index'], build_store_index(master), check_dtype=False)
+    assert attach_shared_dataset(shared_dir, 'unknown') is None
+
+
+def test_shared_backend_matches_the_pandas_backend(processed_dir, tmp_path, monkeypatch):
+    monkeypatch.setenv(SHARED_DIR_ENV, str(tmp_path / 'shared'))
+    publish_shared_dataset(processed_dir, tmp_path / 'shared')
+    shared, in_memory = open_query_backend('shared', processed_dir), open_query_backend('pandas', processed_dir)
+    assert shared.version == in_memory.version
+    for filters in _filters(in_memory.filter_options()):
+        expected, actual = in_memory.select(*filters), shared.select(*filters)
+        assert len(actual) == len(expected)
+        by_store = {'Sales': ('Weekly_Sales', 'sum'), 'CPI': ('CPI', 'mean')}
+        pd.testing.assert_frame_equal(actual.agg(['Store'], **by_store), expected.agg(['Store'], **by_store), check_dtype=False)
+
+
+def test_superseded_versions_are_removed(processed_dir, tmp_path):
+    processed_copy, shared_dir = tmp_path / 'processed_data', tmp_path / 'shared'
+    shutil.copytree(processed_dir, processed_copy)
+    pointers = []
+    for scale in (1, 2, 3):
+        if scale > 1:
+            master = pd.read_parquet(dataset_file(processed_copy, None, PARQUET_FILE))
+            master['Weekly_Sales'] *= scale
+            with staging_dir(processed_copy) as staging:
+                stage_unchanged(processed_copy, None, staging, [name for name in PUBLISHED_FILES if name != PARQUET_FILE])
+                master.to_parquet(staging / PARQUET_FILE, index=False)
+                publish_version(processed_copy, staging, PUBLISHED_FILES)
+        if scale == 3:
+            # Not named by any pointer, though its name ends in a kept version
+            (shared_dir / f"scratch_{pointers[-1]['version']}.arrow").write_bytes(b'')
+        pointers.append(publish_shared_dataset(processed_copy, shared_dir))
+
+    kept = {file_name for pointer in pointers[-VERSIONS_KEPT:] for file_name in pointer['files'].values()}
+    assert {path.name for path in shared_dir.glob('*.arrow')} == kept
+    assert pointers[-1]['history'] == [{'version': p['version'], 'files': p['files']} for p in reversed(pointers[-VERSIONS_KEPT:-1])]
+    assert attach_shared_dataset(shared_dir, pointers[0]['version']) is None
+    assert attach_shared_dataset(shared_dir, pointers[-2]['version']) is not None
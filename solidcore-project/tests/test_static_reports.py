@@ -0,0 +1,31 @@
+# tests/test_static_reports.py
+
+import json
+
+import pytest
+
+from app.utils.static_reports import export_reports
+
+
+@pytest.mark.parametrize('backend_name', ['pandas', 'duckdb'])
+def test_every_filter_combination_is_exported(master_df, processed_dir, tmp_path, backend_name):
+    manifest = export_reports(tmp_path, processed_dir, backend_name, workers=2)
+
+    # All stores, each store format and each calendar year in the data
+    store_types = sorted(master_df['Type'].unique())
+    years = sorted(master_df['Date'].dt.year.unique())
+    slugs = [entry['slug'] for entry in manifest['reports']]
+    assert slugs == ['all'] + [f"type-{store_type}" for store_type in store_types] + [f"year-{year}" for year in years]
+    assert json.loads((tmp_path / 'manifest.json').read_text())['reports'] == manifest['reports']
+    index = (tmp_path / 'index.html').read_text()
+    assert all(f'href="{slug}.html"' in index for slug in slugs)
+
+    totals = {}
+    for entry in manifest['reports']:
+        report = json.loads((tmp_path / f"{entry['slug']}.json").read_text())
+        assert set(report['views']) >= {'executive_summary', 'seasonality', 'holiday_impact', 'forecast'}
+        totals[entry['slug']] = report['views']['executive_summary']['kpis']['total_sales']
+        assert 'vegaEmbed(' in (tmp_path / f"{entry['slug']}.html").read_text()
+    # The store formats and the calendar years each partition the data
+    assert sum(totals[f"type-{store_type}"] for store_type in store_types) == pytest.approx(totals['all'])
+    assert sum(totals[f"year-{year}"] for year in years) == pytest.approx(totals['all'])
@@ -0,0 +1,67 @@
+# tests/test_store_summaries.py
+
+import pytest
+
+from app.analytics.segmentation import assign_cluster_labels, cluster_stores
+from data.data_functions.store_summaries import (
+    HEADER, MAGIC, SEGMENTS, SLOT, SUMMARY_FILE, StoreSummaries, build_store_summaries, write_store_summaries
+)
+
+
+@pytest.fixture(scope='module')
+def summaries(master_df, factors):
+    return build_store_summaries(master_df, factors)
+
+
+def test_summaries_match_the_master_data(master_df, summaries):
+    weekly_totals = master_df.groupby(['Store', 'Date'])['Weekly_Sales'].sum()
+    assert sorted(summaries) == sorted(master_df['Store'].unique())
+    for store, summary in summaries.items():
+        assert summary['total_sales'] == pytest.approx(weekly_totals[store].sum())
+        assert summary['weeks'] == len(weekly_totals[store])
+        assert len(summary['trend']['Date']) == summary['weeks']
+    assert sorted(summary['sales_rank'] for summary in summaries.values()) == list(range(1, len(summaries) + 1))
+
+
+def test_segments_match_the_segmentation_page(master_df, summaries):
+    clustered, centroids = cluster_stores(master_df, SEGMENTS)
+    labels = assign_cluster_labels(centroids)
+    for store, cluster in zip(clustered['Store'], clustered['Cluster']):
+        assert summaries[store]['segment'] == {'Cluster': cluster, 'Segment': labels[cluster]}
+
+
+def test_file_round_trip(summaries, tmp_path):
+    path = write_store_summaries(summaries, tmp_path)
+    assert path == tmp_path / SUMMARY_FILE
+    reader = StoreSummaries(path)
+    try:
+        assert reader.stores() == sorted(summaries)
+        for store, summary in summaries.items():
+            read = reader.get(store)
+            assert read['total_sales'] == pytest.approx(summary['total_sales'])
+            assert read['trend']['Date'] == summary['trend']['Date']
+        assert reader.get(0) is None and reader.get(reader.slots) is None and reader.get(-1) is None
+    finally:
+        reader.close()
+
+
+def test_file_layout(tmp_path):
+    # Stores 2 and 5: slots for IDs 0-5, and store 5's payload right after store 2's
+    path = write_store_summaries({5: {'store': 5}, 2: {'store': 2}}, tmp_path)
+    data = path.read_bytes()
+    assert HEADER.unpack_from(data, 0) == (MAGIC, 6)
+    slot = lambda store: SLOT.unpack_from(data, HEADER.size + SLOT.size * store)
+    assert slot(0) == slot(1) == slot(3) == (0, 0)
+    offset_2, length_2 = slot(2)
+    assert offset_2 == HEADER.size + 6 * SLOT.size
+    assert slot(5)[0] == offset_2 + length_2
+    assert data[offset_2:offset_2 + length_2] == b'{"store": 2}'
+
+
+def test_invalid_files_and_stores(tmp_path):
+    with pytest.raises(ValueError):
+        write_store_summaries({-1: {}}, tmp_path)
+    not_summaries = tmp_path / 'other.bin'
+    not_summaries.write_bytes(b'NOTASUMMARYFILE!' + bytes(16))
+    with pytest.raises(ValueError):
+        StoreSummaries(not_summaries)
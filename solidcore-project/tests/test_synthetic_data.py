@@ -0,0 +1,48 @@
+# tests/test_synthetic_data.py
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from data.data_functions.prepare_master_data import load_raw_data
+from data.data_functions.synthetic_data import WEEKS_PER_YEAR, generate_retail_data, write_raw_files
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+from run_benchmarks import benchmark_scale  # noqa: E402
+
+
+def test_generated_extracts_have_the_delivered_shape(raw_data):
+    n_stores, n_weeks, n_depts = 8, 2 * WEEKS_PER_YEAR, 4
+    assert list(raw_data['sales'].columns) == ['Store', 'Dept', 'Date', 'Weekly_Sales', 'IsHoliday']
+    assert list(raw_data['stores'].columns) == ['Store', 'Type', 'Size']
+    assert list(raw_data['macro'].columns) == ['Store', 'Date', 'Temperature', 'Fuel_Price', 'CPI', 'Unemployment', 'IsHoliday']
+    assert len(raw_data['sales']) == n_stores * n_depts * n_weeks
+    assert len(raw_data['macro']) == n_stores * n_weeks
+    assert not raw_data['sales'].duplicated(['Store', 'Dept', 'Date']).any()
+    # Super Bowl, Labor Day, Thanksgiving and Christmas weeks, in each of the two years
+    assert raw_data['macro'].loc[raw_data['macro']['Store'] == 1, 'IsHoliday'].sum() == 8
+    # The latest CPI and unemployment releases are not published yet
+    assert raw_data['macro']['CPI'].isna().any() and raw_data['macro']['Temperature'].notna().all()
+
+
+def test_generation_is_reproducible(raw_data):
+    again = generate_retail_data(n_stores=8, n_years=2, n_depts=4, seed=3)
+    for name, df in raw_data.items():
+        pd.testing.assert_frame_equal(again[name], df)
+    other = generate_retail_data(n_stores=8, n_years=2, n_depts=4, seed=4)
+    assert not other['sales']['Weekly_Sales'].equals(raw_data['sales']['Weekly_Sales'])
+
+
+def test_written_extracts_load_through_the_pipeline(raw_data, tmp_path):
+    write_raw_files(raw_data, tmp_path)
+    loaded = load_raw_data(tmp_path)
+    for name, df in raw_data.items():
+        pd.testing.assert_frame_equal(loaded[name], df)
+
+
+def test_benchmark_scale_runs_every_stage(tmp_path):
+    stages = {stage: (rows, measurement) for stage, rows, measurement in benchmark_scale(4, 2, 2, 1, False, tmp_path)}
+    assert {'synthetic.generate', 'pipeline.clean', 'view.scenario_model', 'duckdb.view.executive_summary'} <= set(stages)
+    assert stages['synthetic.generate'][0] == 4 * 2 * 2 * WEEKS_PER_YEAR
+    assert all(measurement['seconds_min'] >= 0 for _, measurement in stages.values())